@@ -3,47 +3,128 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from uuid import uuid4
+import hashlib
+import json
 
 from blockchain.chain import Blockchain
+from blockchain.pow import block_work
+from blockchain.store import BlockStore
 from blockchain.transaction import Transaction
+from dqn.batcher import InferenceBatcher
+from dqn.validator import create_validator
+from metrics.metrics import CONTENT_TYPE, REGISTRY
+from metrics.tracing import TRACER
+from miner.jobs import MiningService
 
 # Instantiate the Node
 app = Flask(__name__)
 
+# Page size limits for /chain range queries
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Blocks read per chain lock acquisition while streaming the full chain
+STREAM_CHUNK = 100
+
 # Generate a globally unique address for this node
 node_identifier = str(uuid4()).replace('-', '')
 
-# Instantiate the Blockchain
-blockchain = Blockchain()
-
-
-@app.route('/mine', methods=['GET'])
+# Instantiate the Blockchain, mining on every available core.
+# Clients retry aggressively, so verdicts for repeated payloads are cached.
+# DEADSGOLD_VALIDATOR picks the validator backend (onnx, rules or noop).
+# Set DEADSGOLD_CHAIN_DIR to keep the chain on disk across restarts, and
+# DEADSGOLD_BLOCK_TIME (seconds) to retarget difficulty towards that interval.
+# With DEADSGOLD_BATCH_US set, validations from concurrent request threads
+# are batched into one model call, waiting at most that many microseconds.
+chain_dir = os.environ.get('DEADSGOLD_CHAIN_DIR')
+block_time = os.environ.get('DEADSGOLD_BLOCK_TIME')
+batch_us = os.environ.get('DEADSGOLD_BATCH_US')
+validator = create_validator(cache_size=100000, cache_ttl=600)
+if batch_us:
+    validator = InferenceBatcher(validator, max_delay_us=float(batch_us))
+blockchain = Blockchain(
+    mining_workers=0,
+    validator=validator,
+    store=BlockStore(chain_dir) if chain_dir else None,
+    block_time=float(block_time) if block_time else None
+)
+
+# Mining runs on a background thread; requests only submit and poll jobs.
+mining_service = MiningService(blockchain, node_identifier)
+
+# Node state gauges are computed when /metrics is scraped, not on every change.
+REGISTRY.gauge('deadsgold_chain_height', "Index of the last block in the chain.", lambda: blockchain.last_block.index)
+REGISTRY.gauge('deadsgold_mempool_transactions', "Transactions waiting in the mempool.", lambda: len(blockchain.mempool))
+REGISTRY.gauge('deadsgold_mempool_bytes', "Encoded size of the transactions in the mempool.", lambda: blockchain.mempool.bytes)
+REGISTRY.gauge('deadsgold_mempool_evicted_transactions', "Transactions evicted from the full mempool since start.", lambda: blockchain.mempool.evicted)
+REGISTRY.gauge('deadsgold_next_block_target_work', "Expected hashes needed for the next block.", lambda: block_work(blockchain.next_target()))
+
+
+@app.route('/mine', methods=['POST'])
 def mine():
-    # We run the proof of work algorithm to get the next proof...
-    last_block = blockchain.last_block
-    last_proof = last_block.nonce
-    proof = blockchain.proof_of_work(last_proof)
-
-    # We must receive a reward for finding the proof.
-    # The sender is "0" to signify that this node has mined a new coin.
-    blockchain.new_transaction(
-        Transaction(sender="0", recipient=node_identifier, amount=1)
-    )
-
-    # Forge the new Block by adding it to the chain
-    previous_hash = blockchain.last_block.hash
-    block = blockchain.new_block(proof, previous_hash)
-
+    """
+    Queues a mining job and returns its id without waiting for the proof of work.
+    """
+    job = mining_service.submit()
     response = {
-        'message': "New Block Forged",
-        'index': block.index,
-        'transactions': [tx.__dict__ for tx in block.transactions],
-        'proof': block.nonce,
-        'previous_hash': block.previous_hash,
+        'message': "Mining job queued",
+        'job_id': job.id,
+        'status_url': f'/mine/{job.id}',
     }
-    return jsonify(response), 200
+    return jsonify(response), 202
+
+
+@app.route('/mine/<job_id>', methods=['GET'])
+def mining_job_status(job_id):
+    job = mining_service.get(job_id)
+    if job is None:
+        return 'Unknown mining job', 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/mine/<job_id>', methods=['DELETE'])
+def cancel_mining_job(job_id):
+    if not mining_service.cancel(job_id):
+        return 'Unknown or finished mining job', 404
+    return jsonify(mining_service.get(job_id).to_dict()), 202
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+@app.route('/debug/traces', methods=['GET'])
+def get_traces():
+    """
+    Returns recorded spans, filtered by ?name=, ?outcome=, ?min_ms= and
+    ?limit=. With ?format=chrome the spans are returned as Chrome trace-event
+    JSON, to be saved and opened in chrome://tracing or Perfetto.
+    """
+    try:
+        min_duration = float(request.args.get('min_ms', 0)) / 1000
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return 'Invalid trace parameters', 400
+    spans = TRACER.spans(request.args.get('name'), request.args.get('outcome'), min_duration, limit)
+    if request.args.get('format') == 'chrome':
+        return jsonify(TRACER.chrome_trace(spans)), 200
+    return jsonify({'enabled': TRACER.enabled, 'spans': [span.to_dict() for span in spans]}), 200
+
+
+@app.route('/debug/traces', methods=['POST'])
+def configure_traces():
+    """
+    Turns tracing on or off with {"enabled": bool}; {"clear": true} drops the
+    recorded spans.
+    """
+    values = request.get_json(silent=True) or {}
+    if 'enabled' in values:
+        TRACER.enabled = bool(values['enabled'])
+    if values.get('clear'):
+        TRACER.clear()
+    return jsonify({'enabled': TRACER.enabled}), 200
 
 
 @app.route('/transactions/new', methods=['POST'])
@@ -55,21 +136,101 @@ def new_transaction():
     if not all(k in values for k in required):
         return 'Missing values', 400
 
-    # Create a new Transaction
-    transaction = Transaction(sender=values['sender'], recipient=values['recipient'], amount=values['amount'])
+    # Create a new Transaction; the signature over its fields is hex encoded
+    try:
+        signature = bytes.fromhex(values['signature']) if values.get('signature') else None
+    except (TypeError, ValueError):
+        return 'Invalid signature encoding', 400
+    transaction = Transaction(sender=values['sender'], recipient=values['recipient'], amount=values['amount'], signature=signature)
     blockchain.new_transaction(transaction)
 
     response = {'message': f'Transaction will be added to Block {blockchain.last_block.index + 1}'}
     return jsonify(response), 201
 
 
+def _chain_etag(length, tip, *params):
+    """
+    ETag for a /chain response: the tip hash commits to every block below it
+    through previous_hash, so the height and tip hash identify the content
+    for a given set of parameters, also after a reorganization.
+    """
+    return hashlib.sha256(f"{length}:{tip}:{params}".encode()).hexdigest()[:32]
+
+
+def _stream_chain(length):
+    """
+    Yields the first `length` blocks as JSON, reading STREAM_CHUNK blocks at
+    a time under the chain lock, so memory use does not depend on the chain
+    height. If a reorganization replaces blocks that were not sent yet, the
+    response ends with the blocks already sent, which are still a valid
+    chain, and `length` counts those.
+    """
+    yield '{"chain": ['
+    sent = 0
+    previous_hash = None
+    while sent < length:
+        with blockchain.lock:
+            blocks = blockchain.chain[sent:min(sent + STREAM_CHUNK, length, len(blockchain.chain))]
+        if not blocks or (previous_hash is not None and blocks[0].previous_hash != previous_hash):
+            break
+        for block in blocks:
+            yield (', ' if sent else '') + json.dumps(block.to_dict())
+            sent += 1
+        previous_hash = blocks[-1].hash
+    yield f'], "length": {sent}}}'
+
+
 @app.route('/chain', methods=['GET'])
 def full_chain():
-    response = {
-        'chain': [block.__dict__ for block in blockchain.chain],
-        'length': len(blockchain.chain),
-    }
-    return jsonify(response), 200
+    """
+    Without parameters, streams the full chain. Range queries:
+     - ?from=<index>&limit=<n> returns up to n blocks starting at index
+     - ?since=<index>&limit=<n> returns the blocks after index (incremental sync)
+    Paged responses carry `next` (the following `from`) and `cursor` (the
+    `since` to poll with next). All responses support If-None-Match. Only
+    the tip and the requested blocks are read, so the cost of a request does
+    not depend on the chain height.
+    """
+    try:
+        if 'since' in request.args:
+            start = int(request.args['since']) + 1
+        else:
+            start = int(request.args.get('from', 0))
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return 'Invalid range parameters', 400
+    if start < 0 or limit < 1:
+        return 'Invalid range parameters', 400
+    limit = min(limit, MAX_PAGE_SIZE)
+    paged = 'since' in request.args or 'from' in request.args or 'limit' in request.args
+
+    # The page is read with the tip so that it matches the ETag.
+    with blockchain.lock:
+        length = len(blockchain.chain)
+        tip = blockchain.chain[length - 1].hash
+        etag = _chain_etag(length, tip, start, limit) if paged else _chain_etag(length, tip)
+        not_modified = etag in request.if_none_match
+        end = min(start + limit, length)
+        blocks = blockchain.chain[start:end] if paged and not not_modified else []
+
+    if not_modified:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    if not paged:
+        response = Response(stream_with_context(_stream_chain(length)), mimetype='application/json')
+        response.set_etag(etag)
+        return response
+
+    response = jsonify({
+        'chain': [block.to_dict() for block in blocks],
+        'length': length,
+        'next': end if end < length else None,
+        'cursor': end - 1 if blocks else start - 1,
+    })
+    response.set_etag(etag)
+    return response, 200
 
 
 if __name__ == '__main__':
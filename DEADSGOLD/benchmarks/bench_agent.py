@@ -0,0 +1,92 @@
+"""
+DQN training throughput with a full replay buffer.
+
+Measures train steps per second with the preallocated ring buffer at 1M
+transitions, uniform and prioritized (sum-tree), against the previous deque-of-namedtuples buffer (sampled with
+random.sample and stacked per step) at a smaller capacity, since at 1M it
+needs gigabytes of per-transition objects. States are stored as uint8, like
+the validator's encoded transactions. Run with: python benchmarks/bench_agent.py
+"""
+import sys
+import os
+import random
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+import torch
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dqn.agent import DQNAgent
+from benchmarks.timing import rate
+
+STATE_SIZE = 128
+ACTION_SIZE = 2
+CAPACITY = 1_000_000
+LEGACY_CAPACITY = 100_000
+BATCH_SIZE = 64
+
+Transition = namedtuple('Transition', ('state', 'action', 'reward', 'next_state', 'done'))
+
+
+def fill(agent: DQNAgent, count: int, chunk: int = 100_000) -> None:
+    rng = np.random.default_rng(0)
+    for start in range(0, count, chunk):
+        n = min(chunk, count - start)
+        agent.buffer.add_batch(
+            rng.integers(0, 256, (n, STATE_SIZE), dtype=np.uint8), rng.integers(0, ACTION_SIZE, n),
+            rng.random(n, dtype=np.float32), rng.integers(0, 256, (n, STATE_SIZE), dtype=np.uint8), rng.random(n) < 0.01
+        )
+
+
+def legacy_train_steps(agent: DQNAgent, memory: deque, count: int) -> None:
+    """
+    The sampling and batching of the old ReplayBuffer/DQNAgent.train, followed
+    by the same gradient step.
+    """
+    for _ in range(count):
+        batch = Transition(*zip(*random.sample(memory, BATCH_SIZE)))
+        states = torch.cat(batch.state)
+        actions = torch.tensor(batch.action, dtype=torch.int64).view(-1, 1)
+        rewards = torch.tensor(batch.reward, dtype=torch.float32).view(-1, 1)
+        next_states = torch.cat(batch.next_state)
+        dones = torch.tensor(batch.done, dtype=torch.float32).view(-1, 1)
+        q_values = agent.q_network(states).gather(1, actions)
+        max_next_q_values = agent.target_network(next_states).detach().max(dim=1, keepdim=True).values
+        loss = agent.loss_fn(q_values, rewards + agent.gamma * (1 - dones) * max_next_q_values)
+        agent.optimizer.zero_grad()
+        loss.backward()
+        agent.optimizer.step()
+
+
+def run(steps: int = 500) -> dict:
+    torch.manual_seed(0)
+    results = {}
+
+    agent = DQNAgent(STATE_SIZE, ACTION_SIZE, buffer_size=CAPACITY, batch_size=BATCH_SIZE, state_dtype=np.uint8)
+    start = time.perf_counter()
+    fill(agent, CAPACITY)
+    results['fill_transitions_per_sec'] = CAPACITY / (time.perf_counter() - start)
+    results['sample_batches_per_sec'] = rate(lambda n: [agent.buffer.sample(BATCH_SIZE) for _ in range(n)], steps * 4)
+    results['train_steps_per_sec'] = rate(lambda n: [agent.train() for _ in range(n)], steps)
+    del agent
+
+    agent = DQNAgent(STATE_SIZE, ACTION_SIZE, buffer_size=CAPACITY, batch_size=BATCH_SIZE, state_dtype=np.uint8, prioritized=True)
+    fill(agent, CAPACITY)
+    results['prioritized_sample_batches_per_sec'] = rate(lambda n: [agent.buffer.sample(BATCH_SIZE) for _ in range(n)], steps * 4)
+    results['prioritized_train_steps_per_sec'] = rate(lambda n: [agent.train() for _ in range(n)], steps)
+    del agent
+
+    legacy = DQNAgent(STATE_SIZE, ACTION_SIZE, buffer_size=1, batch_size=BATCH_SIZE)
+    memory = deque(maxlen=LEGACY_CAPACITY)
+    for _ in range(LEGACY_CAPACITY):
+        memory.append(Transition(torch.rand(1, STATE_SIZE), random.randrange(ACTION_SIZE), random.random(), torch.rand(1, STATE_SIZE), False))
+    results['legacy_train_steps_per_sec'] = rate(lambda n: legacy_train_steps(legacy, memory, n), steps // 5)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.2f}")
@@ -0,0 +1,65 @@
+"""
+End-to-end latency of the HTTP API through the Flask test client.
+
+Covers signed transaction submission and full, paged and cached (304)
+/chain reads. Run with: python benchmarks/bench_api.py
+"""
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api import main
+from blockchain.chain import Blockchain
+from blockchain.transaction import Transaction
+from wallet.wallet import Wallet
+from benchmarks.timing import latency
+
+
+def run(chain_length: int = 500, repeat: int = 200) -> dict:
+    blockchain = Blockchain(validator=main.blockchain.validator)
+    for index in range(chain_length):
+        blockchain.mempool.add(Transaction("0", "miner", 1))
+        blockchain.new_block(index)
+    main.blockchain = blockchain
+    client = main.app.test_client()
+
+    wallet = Wallet()
+    amounts = iter(range(10 ** 9))
+
+    def submit():
+        transaction = Transaction(wallet.address, "bob", next(amounts))
+        response = client.post('/transactions/new', json={
+            'sender': transaction.sender,
+            'recipient': transaction.recipient,
+            'amount': transaction.amount,
+            'signature': wallet.sign(transaction.to_bytes()).hex(),
+        })
+        assert response.status_code == 201
+
+    def full_chain():
+        client.get('/chain').get_data()
+
+    def page():
+        client.get('/chain?from=0&limit=100').get_data()
+
+    etag = client.get('/chain').headers['ETag']
+
+    def not_modified():
+        assert client.get('/chain', headers={'If-None-Match': etag}).status_code == 304
+
+    results = {}
+    for name, fn, count in (
+        ('transactions_new', submit, repeat),
+        ('chain_full', full_chain, max(1, repeat // 10)),
+        ('chain_page', page, repeat),
+        ('chain_not_modified', not_modified, repeat),
+    ):
+        results.update({f'{name}_{k}': v for k, v in latency(fn, count).items()})
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.3f}")
@@ -0,0 +1,50 @@
+"""
+Benchmark for balance lookups at several chain sizes.
+
+Measures Blockchain.get_balance on a warm balance index and the one-off cost
+of building the index from the chain. Run with: python benchmarks/bench_balance.py
+"""
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.chain import Blockchain
+from blockchain.transaction import Transaction
+from benchmarks.timing import rate
+from dqn.validator import NoopValidator
+
+CHAIN_SIZES = (100, 1000, 10000)
+TRANSACTIONS_PER_BLOCK = 10
+
+
+def build_chain(blocks: int) -> Blockchain:
+    blockchain = Blockchain(validator=NoopValidator())
+    for index in range(blocks):
+        for i in range(TRANSACTIONS_PER_BLOCK):
+            blockchain.mempool.add(Transaction("0", f"miner{(index + i) % 100}", 1))
+        blockchain.new_block(index)
+    return blockchain
+
+
+def run(chain_sizes=CHAIN_SIZES) -> dict:
+    results = {}
+    for size in chain_sizes:
+        blockchain = build_chain(size)
+        start = time.perf_counter()
+        blockchain.rebuild_balances()
+        results[f'rebuild_ms_{size}_blocks'] = (time.perf_counter() - start) * 1000
+
+        def lookups(count):
+            for i in range(count):
+                blockchain.get_balance(f"miner{i % 100}")
+
+        results[f'get_balance_per_sec_{size}_blocks'] = rate(lookups, 100000)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.2f}")
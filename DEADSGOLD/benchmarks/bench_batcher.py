@@ -0,0 +1,73 @@
+"""
+Concurrent validation throughput with and without the inference batcher.
+
+Several threads call validate_transaction at once, as Flask request threads
+do, either directly on one DQNValidator or through an InferenceBatcher that
+merges their calls into batched model runs. Reports transactions/sec and
+per-call latency. Needs the ONNX model in DQNAgent/Q_Layered_Network.
+Run with: python benchmarks/bench_batcher.py
+"""
+import sys
+import os
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dqn.batcher import InferenceBatcher
+from dqn.validator import DQNValidator
+from benchmarks.bench_validator import make_transactions
+
+
+def hammer(validator, threads: int, per_thread: int) -> dict:
+    transactions = make_transactions(per_thread)
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(samples):
+        barrier.wait()
+        for transaction in transactions:
+            start = time.perf_counter()
+            validator.validate_transaction(transaction)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=worker, args=(samples,)) for samples in latencies]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = sorted(sample for thread_samples in latencies for sample in thread_samples)
+    return {
+        'tx_per_sec': len(samples) / elapsed,
+        'p50_ms': samples[len(samples) // 2],
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def run(threads: int = 16, per_thread: int = 200) -> dict:
+    validator = DQNValidator()
+    validator.validate_batch(make_transactions(1)) # Load the model outside the timings
+    results = {f'direct_{k}': v for k, v in hammer(validator, threads, per_thread).items()}
+    for delay_us in (0, 200):
+        batcher = InferenceBatcher(validator, max_delay_us=delay_us)
+        try:
+            results.update({f'batched_{delay_us}us_{k}': v for k, v in hammer(batcher, threads, per_thread).items()})
+        finally:
+            batcher.close()
+    # A lone caller pays at most the batching delay.
+    batcher = InferenceBatcher(validator, max_delay_us=200)
+    try:
+        results.update({f'single_caller_batched_200us_{k}': v for k, v in hammer(batcher, 1, per_thread).items()})
+    finally:
+        batcher.close()
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.3f}")
@@ -0,0 +1,91 @@
+"""
+Benchmark for block hashing throughput and memory per block.
+
+Compares the original dict/JSON based Block with the slotted Block that hashes
+its canonical binary encoding. Run with: python benchmarks/bench_block.py
+"""
+import sys
+import os
+import functools
+import gc
+import hashlib
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.timing import rate
+from blockchain.block import Block
+from blockchain.transaction import Transaction
+
+SENDER = "7QwEoVG1dRxu3kV9kHn4o5xE1Xw8F2kG7uJWcQ3qXgDZ"
+RECIPIENT = "9yL2mQ8vT3pZrN6bF1cK4hJ7wX5sD8gA2eU6tR9oP1iV"
+
+
+@dataclass
+class LegacyTransaction:
+    sender: str
+    recipient: str
+    amount: float
+    signature: bytes = None
+
+
+class LegacyBlock:
+    def __init__(self, index, transactions, previous_hash, nonce=0, timestamp=None):
+        self.index = index
+        self.timestamp = timestamp or time.time()
+        self.transactions = transactions
+        self.previous_hash = previous_hash
+        self.nonce = nonce
+        self.hash = self.compute_hash()
+
+    def compute_hash(self):
+        block_data = {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "transactions": [t.__dict__ for t in self.transactions],
+            "previous_hash": self.previous_hash,
+            "nonce": self.nonce
+        }
+        block_string = json.dumps(block_data, sort_keys=True)
+        return hashlib.sha256(block_string.encode()).hexdigest()
+
+
+def make_block(block_cls, tx_cls, index, tx_count):
+    transactions = [tx_cls(SENDER, RECIPIENT, i) for i in range(tx_count)]
+    return block_cls(index, transactions, "0" * 64, nonce=index)
+
+
+def hash_block(block, count: int) -> None:
+    for _ in range(count):
+        block.compute_hash()
+
+
+def bytes_per_block(block_cls, tx_cls, blocks: int, tx_count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    chain = [make_block(block_cls, tx_cls, i, tx_count) for i in range(blocks)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del chain
+    return current / blocks
+
+
+def run(tx_count: int = 10, blocks: int = 20000) -> dict:
+    results = {}
+    for name, block_cls, tx_cls in (
+        ('legacy', LegacyBlock, LegacyTransaction),
+        ('compact', Block, Transaction),
+    ):
+        block = make_block(block_cls, tx_cls, 1, tx_count)
+        results[f'{name}_hashes_per_sec'] = rate(functools.partial(hash_block, block), 2000)
+        results[f'{name}_bytes_per_block'] = bytes_per_block(block_cls, tx_cls, blocks, tx_count)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.2f}")
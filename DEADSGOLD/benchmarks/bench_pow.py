@@ -0,0 +1,63 @@
+"""
+Microbenchmark for the proof-of-work inner loop.
+
+Compares the original per-nonce hex-string check with the midstate-reusing
+ProofKernel, and measures Blockchain.valid_proof_attempt, which also derives
+the target for the next block. Run with: python benchmarks/bench_pow.py
+"""
+import sys
+import os
+import hashlib
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.timing import rate
+from blockchain.pow import ProofKernel
+
+LAST_HASH = hashlib.sha256(b"benchmark").hexdigest()
+# No nonce meets this difficulty, so every attempt is a full miss.
+DIFFICULTY = 64
+
+
+def legacy_attempts(count: int) -> None:
+    prefix = "0" * DIFFICULTY
+    for proof in range(count):
+        guess_hash = hashlib.sha256(f'{LAST_HASH}{proof}'.encode()).hexdigest()
+        if guess_hash[:DIFFICULTY] == prefix:
+            return
+
+
+def kernel_attempts(count: int) -> None:
+    ProofKernel(LAST_HASH, DIFFICULTY).search(0, count)
+
+
+def valid_proof_attempts(count: int) -> None:
+    blockchain = _blockchain()
+    for proof in range(count):
+        blockchain.valid_proof_attempt(proof)
+
+
+def _blockchain():
+    from blockchain.chain import Blockchain
+    from dqn.validator import NoopValidator
+
+    blockchain = Blockchain(validator=NoopValidator())
+    blockchain.difficulty = DIFFICULTY
+    return blockchain
+
+
+def run(count: int = 200000) -> dict:
+    legacy = rate(legacy_attempts, count)
+    kernel = rate(kernel_attempts, count)
+    return {
+        'legacy_hashes_per_sec': legacy,
+        'kernel_hashes_per_sec': kernel,
+        'speedup': kernel / legacy,
+        'valid_proof_attempt_per_sec': rate(valid_proof_attempts, count // 10),
+    }
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.2f}")
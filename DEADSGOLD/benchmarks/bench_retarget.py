@@ -0,0 +1,79 @@
+"""
+Simulation of block intervals under changing hashrate.
+
+Block times are drawn from the exponential distribution implied by each
+block's target and the current hashrate, so no hashing is done. Compares a
+fixed difficulty, a controller limited to whole hex-zero steps (16x), and the
+numeric-target Retarget controller. Run with: python benchmarks/bench_retarget.py
+"""
+import sys
+import os
+import random
+import statistics
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.difficulty import Retarget
+from blockchain.pow import block_work, target_for_difficulty
+
+BLOCK_TIME = 10.0
+DIFFICULTY = 4
+# Hashes per second in each phase; the first matches DIFFICULTY at BLOCK_TIME.
+HASHRATE_PHASES = (6553.6, 19660.8, 3276.8, 13107.2)
+BLOCKS_PER_PHASE = 500
+
+
+class HexStepRetarget(Retarget):
+    """
+    The same window controller, but rounded to whole leading-hex-zero
+    difficulties, as a target expressed as a zero count would have to be.
+    """
+
+    def next_target(self, history) -> int:
+        target = super().next_target(history)
+        difficulty = min(range(65), key=lambda d: abs(block_work(target_for_difficulty(d)) - block_work(target)))
+        return target_for_difficulty(difficulty)
+
+
+def simulate(rule: Retarget, seed: int = 0) -> list:
+    """
+    Returns the simulated block intervals, in seconds, under a rule.
+    """
+    rng = random.Random(seed)
+    history = []
+    timestamp = 0.0
+    intervals = []
+    for hashrate in HASHRATE_PHASES:
+        for _ in range(BLOCKS_PER_PHASE):
+            target = rule.next_target(history)
+            interval = rng.expovariate(hashrate / block_work(target))
+            timestamp += interval
+            intervals.append(interval)
+            history = (history + [(timestamp, target)])[-rule.history_size:]
+    return intervals
+
+
+def run(seed: int = 0) -> dict:
+    rules = {
+        'fixed': Retarget(DIFFICULTY),
+        'hex_step': HexStepRetarget(DIFFICULTY, BLOCK_TIME),
+        'retarget': Retarget(DIFFICULTY, BLOCK_TIME),
+    }
+    results = {}
+    for name, rule in rules.items():
+        intervals = simulate(rule, seed)
+        # Per-phase means show how far each phase drifts from BLOCK_TIME.
+        phase_means = [
+            statistics.mean(intervals[i:i + BLOCKS_PER_PHASE])
+            for i in range(0, len(intervals), BLOCKS_PER_PHASE)
+        ]
+        results[f'{name}_mean_interval'] = statistics.mean(intervals)
+        results[f'{name}_interval_variance'] = statistics.pvariance(intervals)
+        results[f'{name}_worst_phase_error'] = max(abs(mean - BLOCK_TIME) for mean in phase_means)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.2f}")
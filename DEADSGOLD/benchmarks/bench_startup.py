@@ -0,0 +1,58 @@
+"""
+Cold-start cost of the node: each measurement runs in a fresh interpreter.
+
+Measures importing blockchain.chain and the API module, constructing a
+Blockchain, and the first validation with each validator backend (for onnx
+this includes loading the model). Run with: python benchmarks/bench_startup.py
+"""
+import sys
+import os
+import json
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Timed in a child process; prints the elapsed seconds of each step as JSON.
+_SCRIPT = '''
+import sys, time, json
+sys.path.append({root!r})
+start = time.perf_counter()
+from blockchain.chain import Blockchain
+imported = time.perf_counter()
+blockchain = Blockchain()
+constructed = time.perf_counter()
+from blockchain.transaction import Transaction
+blockchain.validator.validate_transaction(Transaction("a", "b", 1))
+validated = time.perf_counter()
+api = None
+if {api!r}:
+    from api import main
+    api = time.perf_counter() - validated
+print(json.dumps({{"import": imported - start, "construct": constructed - imported, "first_validation": validated - constructed, "api_import": api}}))
+'''
+
+
+def measure(backend: str, api: bool = False) -> dict:
+    env = dict(os.environ, DEADSGOLD_VALIDATOR=backend)
+    env.pop('DEADSGOLD_CHAIN_DIR', None)
+    output = subprocess.run(
+        [sys.executable, '-c', _SCRIPT.format(root=PROJECT_ROOT, api=api)],
+        capture_output=True, text=True, check=True, env=env, cwd=PROJECT_ROOT
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat: int = 5) -> dict:
+    results = {}
+    for backend in ('noop', 'rules', 'onnx'):
+        runs = [measure(backend) for _ in range(repeat)]
+        for step in ('import', 'construct', 'first_validation'):
+            results[f'{backend}_{step}_ms'] = statistics.median(r[step] for r in runs) * 1000
+    results['api_import_ms'] = statistics.median(measure('noop', api=True)['api_import'] for _ in range(repeat)) * 1000
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.2f}")
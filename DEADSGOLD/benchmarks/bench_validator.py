@@ -0,0 +1,47 @@
+"""
+Benchmark for DQN transaction validation latency.
+
+Compares one inference call per transaction with a single batched call, and
+a batch served from the verdict cache. Needs the ONNX model in
+DQNAgent/Q_Layered_Network. Run with: python benchmarks/bench_validator.py
+"""
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.transaction import Transaction
+from dqn.validator import DQNValidator
+from benchmarks.timing import latency
+
+SENDER = "7QwEoVG1dRxu3kV9kHn4o5xE1Xw8F2kG7uJWcQ3qXgDZ"
+
+
+def make_transactions(count: int) -> list:
+    return [Transaction(SENDER, f"recipient{i}", i, b"\x01" * 64) for i in range(count)]
+
+
+def run(batch_size: int = 256) -> dict:
+    validator = DQNValidator()
+    cached = DQNValidator(cache_size=batch_size)
+    transactions = make_transactions(batch_size)
+
+    results = {f'per_tx_{k}': v for k, v in latency(lambda: validator.validate_transaction(transactions[0])).items()}
+
+    start = time.perf_counter()
+    for transaction in transactions:
+        validator.validate_transaction(transaction)
+    results['sequential_batch_ms'] = (time.perf_counter() - start) * 1000
+
+    results.update({f'batched_{k}': v for k, v in latency(lambda: validator.validate_batch(transactions), 20).items()})
+
+    cached.validate_batch(transactions)
+    results.update({f'cached_batch_{k}': v for k, v in latency(lambda: cached.validate_batch(transactions), 20).items()})
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.3f}")
@@ -0,0 +1,46 @@
+"""
+Benchmark for signature verification throughput.
+
+Measures Wallet.verify with a cold and a warm public key cache, and
+Wallet.verify_many on a process pool. Run with: python benchmarks/bench_wallet.py
+"""
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wallet.wallet import Wallet, _load_public_key
+from benchmarks.timing import rate
+
+DATA = b"benchmark transaction payload"
+
+
+def run(count: int = 2000, wallets: int = 50) -> dict:
+    signers = [Wallet() for _ in range(wallets)]
+    items = [(w.address, w.sign(DATA), DATA) for w in signers]
+    items = [items[i % wallets] for i in range(count)]
+
+    def cold(n):
+        for address, signature, data in items[:n]:
+            _load_public_key.cache_clear()
+            Wallet.verify(address, signature, data)
+
+    def warm(n):
+        for address, signature, data in items[:n]:
+            Wallet.verify(address, signature, data)
+
+    results = {
+        'verify_cold_per_sec': rate(cold, count),
+        'verify_warm_per_sec': rate(warm, count),
+    }
+    with ProcessPoolExecutor() as executor:
+        Wallet.verify_many(items, executor) # Start the workers
+        results['verify_many_pool_per_sec'] = rate(lambda n: Wallet.verify_many(items[:n], executor), count)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in run().items():
+        print(f"{name}: {value:,.2f}")
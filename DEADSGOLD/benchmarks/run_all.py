@@ -0,0 +1,74 @@
+"""
+Runs every benchmark module and writes the results to a JSON file.
+
+    python benchmarks/run_all.py [--output FILE] [--only NAME ...] [--compare OLD_FILE]
+
+The file records the git commit and Python version next to each module's
+metrics so runs from different commits can be compared with --compare,
+which prints the relative change of every metric present in both files.
+"""
+import sys
+import os
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BENCHMARKS = ('pow', 'block', 'balance', 'validator', 'wallet', 'api', 'retarget', 'startup', 'agent', 'batcher')
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names=BENCHMARKS) -> dict:
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'results': {},
+    }
+    for name in names:
+        print(f"Running bench_{name}...")
+        module = importlib.import_module(f'benchmarks.bench_{name}')
+        start = time.perf_counter()
+        report['results'][name] = module.run()
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+    return report
+
+
+def compare(old: dict, new: dict) -> None:
+    print(f"Comparing {old.get('commit')} -> {new.get('commit')}")
+    for name, metrics in new['results'].items():
+        for metric, value in metrics.items():
+            previous = old.get('results', {}).get(name, {}).get(metric)
+            if previous:
+                print(f"{name}.{metric}: {previous:,.3f} -> {value:,.3f} ({(value - previous) / previous:+.1%})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the DEADSGOLD benchmark suite.")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    report = run(args.only)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
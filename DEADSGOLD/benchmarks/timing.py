@@ -0,0 +1,36 @@
+"""
+Timing helpers shared by the benchmark modules.
+"""
+import statistics
+import time
+
+
+def rate(fn, count: int, repeat: int = 3) -> float:
+    """
+    Returns calls per second of fn(count), which performs `count` operations,
+    taking the best of `repeat` runs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(count)
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def latency(fn, repeat: int = 200) -> dict:
+    """
+    Calls fn() `repeat` times and returns its mean, median and 95th
+    percentile latency in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': statistics.mean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
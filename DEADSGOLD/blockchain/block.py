@@ -1,27 +1,178 @@
-
 import hashlib
-import json
+import struct
 from time import time
 
+from .merkle import leaf_hash, merkle_proof, merkle_root, verify_proof
+from .pow import DEFAULT_TARGET
+from .transaction import Transaction
+
+# index, timestamp, nonce, transaction count, previous hash length
+_HEADER = struct.Struct('>QdQIB')
+_MERKLE_ROOT_SIZE = 32
+_TARGET_SIZE = 32
+
 class Block:
-    def __init__(self, index, transactions, previous_hash, nonce=0, timestamp=None):
+    """
+    A block of transactions.
+    The block hash covers only the header, which commits to the transactions
+    through their Merkle root. Both the hash and the root are computed lazily
+    and cached until one of the fields they cover is reassigned. Mutating the
+    transactions list in place does not invalidate the caches; assign a new
+    list instead.
+    """
+
+    __slots__ = ('index', 'timestamp', 'transactions', 'previous_hash', 'nonce', 'target', '_hash', '_merkle_root')
+
+    _HASHED_FIELDS = frozenset(('index', 'timestamp', 'transactions', 'previous_hash', 'nonce', 'target'))
+
+    def __init__(self, index, transactions, previous_hash, nonce=0, timestamp=None, target=DEFAULT_TARGET):
         self.index = index
         self.timestamp = timestamp or time()
         self.transactions = transactions
         self.previous_hash = previous_hash
         self.nonce = nonce
-        self.hash = self.compute_hash()
+        self.target = target # Proof of work target this block had to meet
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in self._HASHED_FIELDS:
+            object.__setattr__(self, '_hash', None)
+            if name == 'transactions':
+                object.__setattr__(self, '_merkle_root', None)
+
+    def _leaves(self) -> list:
+        return [leaf_hash(t.encode()) for t in self.transactions]
+
+    @property
+    def merkle_root(self) -> str:
+        """
+        Returns the cached Merkle root of the transactions, computing it if needed.
+        """
+        if self._merkle_root is None:
+            object.__setattr__(self, '_merkle_root', merkle_root(self._leaves()).hex())
+        return self._merkle_root
+
+    def inclusion_proof(self, tx_index: int) -> list:
+        """
+        Returns a proof that transactions[tx_index] is committed to by the
+        Merkle root, as a list of (sibling hash hex, sibling is on the left).
+        """
+        return [(sibling.hex(), is_left) for sibling, is_left in merkle_proof(self._leaves(), tx_index)]
+
+    @staticmethod
+    def verify_inclusion(transaction: Transaction, proof: list, root: str) -> bool:
+        """
+        Checks an inclusion proof against a Merkle root, e.g. one taken from a
+        block header, without needing the rest of the block.
+        """
+        return verify_proof(
+            leaf_hash(transaction.encode()),
+            [(bytes.fromhex(sibling), is_left) for sibling, is_left in proof],
+            bytes.fromhex(root)
+        )
+
+    @property
+    def hash(self) -> str:
+        """
+        Returns the cached hash of the block, computing it if needed.
+        """
+        if self._hash is None:
+            self.compute_hash()
+        return self._hash
+
+    def encode_header(self) -> bytes:
+        """
+        Returns the canonical binary encoding of the block header: the fixed
+        fields, the previous hash, the Merkle root of the transactions and the
+        proof of work target.
+        """
+        previous_hash = self.previous_hash.encode()
+        return (
+            _HEADER.pack(self.index, self.timestamp, self.nonce, len(self.transactions), len(previous_hash))
+            + previous_hash
+            + bytes.fromhex(self.merkle_root)
+            + self.target.to_bytes(_TARGET_SIZE, 'big')
+        )
+
+    def encode(self) -> bytes:
+        """
+        Returns the canonical binary encoding of the block: the header followed
+        by the encoded transactions.
+        """
+        parts = [self.encode_header()]
+        parts.extend(t.encode() for t in self.transactions)
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, data) -> 'Block':
+        """
+        Decodes a block written by encode().
+        """
+        index, timestamp, nonce, tx_count, hash_length = _HEADER.unpack_from(data, 0)
+        offset = _HEADER.size
+        previous_hash = bytes(data[offset:offset + hash_length]).decode()
+        # The stored Merkle root is recomputed from the transactions rather than trusted.
+        offset += hash_length + _MERKLE_ROOT_SIZE
+        target = int.from_bytes(data[offset:offset + _TARGET_SIZE], 'big')
+        offset += _TARGET_SIZE
+        transactions = []
+        for _ in range(tx_count):
+            transaction, offset = Transaction.decode(data, offset)
+            transactions.append(transaction)
+        return cls(index, transactions, previous_hash, nonce=nonce, timestamp=timestamp, target=target)
 
     def compute_hash(self):
         """
-        Computes the hash of the block.
+        Computes the hash of the block header.
+        """
+        block_hash = hashlib.sha256(self.encode_header()).hexdigest()
+        object.__setattr__(self, '_hash', block_hash)
+        return block_hash
+
+    def to_dict(self) -> dict:
+        """
+        Returns a JSON-serializable representation of the block.
         """
-        block_data = {
+        return {
             "index": self.index,
             "timestamp": self.timestamp,
-            "transactions": [t.__dict__ for t in self.transactions],
+            "transactions": [t.to_dict() for t in self.transactions],
             "previous_hash": self.previous_hash,
-            "nonce": self.nonce
+            "nonce": self.nonce,
+            "merkle_root": self.merkle_root,
+            "target": f"{self.target:064x}",
+            "hash": self.hash
         }
-        block_string = json.dumps(block_data, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+
+
+class BlockHeader:
+    """
+    The part of a block covered by its hash, without the transactions.
+    Headers are enough to check linkage and proof of work, so a syncing node
+    can pick a chain before downloading any block bodies.
+    """
+
+    __slots__ = ('index', 'timestamp', 'nonce', 'tx_count', 'previous_hash', 'merkle_root', 'target', 'hash')
+
+    @staticmethod
+    def size(data) -> int:
+        """
+        Returns the length of the header at the start of an encoded header or block.
+        """
+        return _HEADER.size + _HEADER.unpack_from(data, 0)[4] + _MERKLE_ROOT_SIZE + _TARGET_SIZE
+
+    @classmethod
+    def decode(cls, data) -> 'BlockHeader':
+        """
+        Decodes the header at the start of Block.encode_header() or Block.encode() output.
+        """
+        header = cls()
+        header.index, header.timestamp, header.nonce, header.tx_count, hash_length = _HEADER.unpack_from(data, 0)
+        offset = _HEADER.size
+        header.previous_hash = bytes(data[offset:offset + hash_length]).decode()
+        offset += hash_length
+        header.merkle_root = bytes(data[offset:offset + _MERKLE_ROOT_SIZE]).hex()
+        offset += _MERKLE_ROOT_SIZE
+        header.target = int.from_bytes(data[offset:offset + _TARGET_SIZE], 'big')
+        header.hash = hashlib.sha256(bytes(data[:offset + _TARGET_SIZE])).hexdigest()
+        return header
@@ -1,27 +1,123 @@
 
-import hashlib
-from .block import Block
+import os
+from .block import Block, BlockHeader
+from .difficulty import Retarget
+from .mempool import Mempool
+from .pow import BATCH_SIZE, ProofKernel, block_work
+from .state import BalanceIndex
+from .store import BlockStore, PersistentChain
 from .transaction import Transaction
-from wallet.wallet import Wallet
-from dqn.validator import DQNValidator
-from miner.miner import Miner
+from .validation import ChainValidator
+from dqn.validator import Validator, create_validator
+from miner.miner import Miner, MiningStats, parallel_proof_of_work
+from metrics.metrics import REGISTRY
+from metrics.tracing import TRACER
 import time
 import threading
 
+TRANSACTIONS = REGISTRY.counter('deadsgold_transactions_total', "Transactions submitted for admission, by outcome.", ['outcome'])
+ADMISSION_SECONDS = REGISTRY.histogram('deadsgold_transaction_admission_seconds', "Time to admit or reject a transaction.")
+BLOCKS = REGISTRY.counter('deadsgold_blocks_total', "Blocks appended to the chain, by source.", ['source'])
+REORGS = REGISTRY.counter('deadsgold_reorgs_total', "Reorganizations that replaced at least one block.")
+REORG_DEPTH = REGISTRY.histogram('deadsgold_reorg_depth_blocks', "Blocks replaced per reorganization.", buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+CHAIN_VALIDATION_SECONDS = REGISTRY.histogram('deadsgold_chain_validation_seconds', "Time to validate a chain.")
+
+# Fixed so that every node derives the same genesis block.
+GENESIS_TIMESTAMP = 1700000000.0
+
 class Blockchain:
-    def __init__(self, mining_interrupt_event: threading.Event = None):
-        self.chain = [self.create_genesis_block()]
-        self.pending_transactions = []
-        self.difficulty = 4 # Proof of work difficulty
-        self.validator = DQNValidator()
+    def __init__(self, mining_interrupt_event: threading.Event = None, mining_workers: int = 1, validator: Validator = None, verify_executor=None, store: BlockStore = None, mempool: Mempool = None, validation_workers: int = 1, block_time: float = None):
+        if store is None:
+            self.chain = [self.create_genesis_block()]
+        else:
+            # Blocks are read from disk on demand; the balance index is built on first use.
+            self.chain = PersistentChain(store)
+            if len(self.chain) == 0:
+                self.chain.append(self.create_genesis_block())
+        self.store = store
+        self._balances = None
+        self.chain_validator = ChainValidator(
+            workers=validation_workers,
+            checkpoint_path=os.path.join(store.path, "checkpoint") if store else None
+        )
+        self.mempool = mempool or Mempool()
+        self.max_block_transactions = 5000 # Block template limits
+        self.max_block_bytes = 1024 * 1024
+        self.retarget = Retarget(difficulty=4, block_time=block_time) # Target rule; block_time None keeps it fixed
+        self.validator = validator or create_validator() # Backend from DEADSGOLD_VALIDATOR; models load on first use
         self.miner = Miner(self)
         self.mining_interrupt_event = mining_interrupt_event
+        # Guards the chain and mempool against concurrent mutation (API threads, miner).
+        self.lock = threading.RLock()
+        self.tip_listeners = [] # Called with the new last block whenever the tip changes
+        self.mining_workers = mining_workers # Processes used by proof_of_work; 0 means one per core
+        self.last_mining_stats = None
+        self.verify_executor = verify_executor # Optional pool used for batch signature checks
 
     def create_genesis_block(self):
         """
         Creates the very first block in the chain.
         """
-        return Block(0, [], "0")
+        return Block(0, [], "0", timestamp=GENESIS_TIMESTAMP)
+
+    @property
+    def difficulty(self) -> int:
+        """
+        The initial proof of work difficulty, in leading hex zeros. Without a
+        block time every block uses it.
+        """
+        return self.retarget.difficulty
+
+    @difficulty.setter
+    def difficulty(self, difficulty: int) -> None:
+        self.retarget.difficulty = difficulty
+
+    def target_history(self, height: int) -> list:
+        """
+        Returns the (timestamp, target) pairs the retargeting rule needs for
+        the block after `height`.
+        """
+        start = max(1, height - self.retarget.history_size + 1)
+        return [(block.timestamp, block.target) for block in self.chain[start:height + 1]]
+
+    def next_target(self) -> int:
+        """
+        Returns the proof of work target the next block must meet.
+        """
+        return self.retarget.next_target(self.target_history(len(self.chain) - 1))
+
+    def next_timestamp(self) -> float:
+        """
+        Returns the timestamp for a block on the current tip: the current
+        time, or just past the median of recent blocks if the clock is behind
+        it (e.g. it stepped back, or blocks came less than a millisecond apart).
+        """
+        median = self.retarget.median_time_past(self.target_history(len(self.chain) - 1))
+        now = time.time()
+        return now if median is None else max(now, median + 0.001)
+
+    def work_above(self, height: int) -> int:
+        """
+        Returns the summed proof of work of the blocks above a height.
+        """
+        return sum(block_work(block.target) for block in self.chain[height + 1:])
+
+    @property
+    def balances(self) -> BalanceIndex:
+        """
+        Returns the balance index, building it from the chain on first access.
+        """
+        if self._balances is None:
+            self._balances = BalanceIndex()
+            self._balances.rebuild(self.chain)
+        return self._balances
+
+    @property
+    def pending_transactions(self) -> list:
+        """
+        Returns the transactions waiting in the mempool, oldest first.
+        """
+        return list(self.mempool)
 
     @property
     def last_block(self):
@@ -32,81 +128,355 @@ class Blockchain:
 
     def new_transaction(self, transaction: Transaction) -> bool:
         """
-        Adds a new transaction to the list of pending transactions after verification.
+        Adds a new transaction to the mempool after verification.
         Returns True if the transaction is valid and added, False otherwise.
         """
+        start = time.perf_counter()
+        with TRACER.span("admission", sender=transaction.sender) as span:
+            if span.recording:
+                span.args["txid"] = transaction.txid
+            outcome = span.outcome = self._admit(transaction)
+        TRANSACTIONS.labels(outcome).inc()
+        ADMISSION_SECONDS.observe(time.perf_counter() - start)
+        return outcome == "accepted"
+
+    def _admit(self, transaction: Transaction) -> str:
+        """
+        Runs the admission checks for one transaction and returns the outcome.
+        Each stage is traced as a child of the "admission" span.
+        """
         if transaction.sender == "0":  # Reward transaction
-            self.pending_transactions.append(transaction)
-            return True
+            return self._add_to_mempool(transaction)
+
+        if transaction.txid in self.mempool:
+            print(f"Duplicate transaction from {transaction.sender}")
+            return "duplicate"
 
-        if not Wallet.verify(transaction.sender, transaction.signature, transaction.to_bytes()):
+        from wallet.wallet import Wallet # Deferred with its crypto libraries to the first signed transaction
+
+        with TRACER.span("admission.signature") as span:
+            valid = Wallet.verify(transaction.sender, transaction.signature, transaction.to_bytes())
+            span.outcome = "valid" if valid else "invalid"
+        if not valid:
             print(f"Invalid transaction signature from {transaction.sender}")
-            return False
+            return "invalid_signature"
 
-        if not self.validator.validate_transaction(transaction):
+        with TRACER.span("admission.model") as span:
+            valid = self.validator.validate_transaction(transaction)
+            span.outcome = "valid" if valid else "invalid"
+        if not valid:
             print(f"Transaction from {transaction.sender} failed DQN validation.")
-            return False
+            return "rejected_by_model"
 
-        self.pending_transactions.append(transaction)
-        return True
+        return self._add_to_mempool(transaction)
+
+    def _add_to_mempool(self, transaction: Transaction) -> str:
+        with TRACER.span("admission.mempool") as span, self.lock:
+            outcome = span.outcome = "accepted" if self.mempool.add(transaction) else "mempool_full"
+        return outcome
+
+    def new_transactions(self, transactions: list) -> list:
+        """
+        Admits a batch of transactions, running DQN validation for all of them
+        in a single inference call. Returns one bool per transaction.
+        """
+        start = time.perf_counter()
+        with TRACER.span("admission.batch", transactions=len(transactions)) as span:
+            outcomes = self._admit_batch(transactions)
+            span.outcome = f"{outcomes.count('accepted')}/{len(outcomes)} accepted"
+        for outcome in outcomes:
+            TRANSACTIONS.labels(outcome).inc()
+        if transactions:
+            ADMISSION_SECONDS.observe((time.perf_counter() - start) / len(transactions))
+        return [outcome == "accepted" for outcome in outcomes]
+
+    def _admit_batch(self, transactions: list) -> list:
+        """
+        Runs the admission checks for a batch and returns one outcome each.
+        """
+        # Reward transactions skip verification; so do transactions already in
+        # the mempool, which are rejected.
+        outcomes = [
+            "valid" if transaction.sender == "0" else "duplicate" if transaction.txid in self.mempool else None
+            for transaction in transactions
+        ]
+        signed = [i for i, outcome in enumerate(outcomes) if outcome is None]
+
+        from wallet.wallet import Wallet
+
+        with TRACER.span("admission.signature", transactions=len(signed)) as span:
+            signatures_valid = Wallet.verify_many(
+                [(transactions[i].sender, transactions[i].signature, transactions[i].to_bytes()) for i in signed],
+                self.verify_executor
+            )
+            span.outcome = f"{sum(signatures_valid)}/{len(signed)} valid"
+        candidates = []
+        for i, valid in zip(signed, signatures_valid):
+            if valid:
+                candidates.append(i)
+            else:
+                outcomes[i] = "invalid_signature"
+                print(f"Invalid transaction signature from {transactions[i].sender}")
+
+        with TRACER.span("admission.model", transactions=len(candidates)) as span:
+            verdicts = self.validator.validate_batch([transactions[i] for i in candidates])
+            span.outcome = f"{sum(bool(v) for v in verdicts)}/{len(candidates)} valid"
+        for i, verdict in zip(candidates, verdicts):
+            if verdict:
+                outcomes[i] = "valid"
+            else:
+                outcomes[i] = "rejected_by_model"
+                print(f"Transaction from {transactions[i].sender} failed DQN validation.")
+
+        with TRACER.span("admission.mempool") as span, self.lock:
+            for i, transaction in enumerate(transactions):
+                if outcomes[i] == "valid":
+                    outcomes[i] = "accepted" if self.mempool.add(transaction) else "mempool_full"
+            span.outcome = "mempool_full" if "mempool_full" in outcomes else "accepted"
+        return outcomes
 
     def new_block(self, proof, previous_hash=None):
         """
-        Creates a new block and adds it to the chain.
+        Creates a new block and adds it to the chain. Raises ValueError if
+        proof is None, which proof_of_work returns when it was interrupted.
         """
-        block = Block(
-            index=len(self.chain),
-            transactions=self.pending_transactions,
-            previous_hash=previous_hash or self.last_block.hash,
-            nonce=proof
-        )
+        if proof is None:
+            raise ValueError("Cannot create a block without a proof; was mining interrupted?")
+        with self.lock:
+            history = self.target_history(len(self.chain) - 1)
+            block = Block(
+                index=len(self.chain),
+                transactions=self.mempool.select(self.max_block_transactions, self.max_block_bytes),
+                previous_hash=previous_hash or self.last_block.hash,
+                nonce=proof,
+                timestamp=self.next_timestamp(),
+                target=self.retarget.next_target(history)
+            )
 
-        # Reset the list of pending transactions
-        self.pending_transactions = []
+            # Remove the mined transactions from the mempool
+            self.mempool.remove(block.transactions)
 
-        self.chain.append(block)
+            self.chain.append(block)
+            if self._balances is not None:
+                self._balances.apply_block(block)
+            BLOCKS.labels("local").inc()
+            self._notify_tip()
         return block
 
+    def add_block(self, block: Block) -> bool:
+        """
+        Appends a block produced elsewhere (e.g. received from a peer) if it
+        extends the current tip with a valid proof and valid signatures.
+        Its transactions are removed from the mempool.
+        """
+        with self.lock:
+            last_block = self.last_block
+            if block.index != last_block.index + 1 or block.previous_hash != last_block.hash:
+                return False
+            if not self._valid_branch(last_block, [block]):
+                return False
+            self._append(block, "peer")
+            self._notify_tip()
+        return True
+
+    def _valid_branch(self, parent: Block, blocks: list) -> bool:
+        """
+        Checks that blocks form a valid branch on top of parent: consecutive
+        indices, hash linkage, targets, timestamps, proof of work and
+        transaction signatures.
+        """
+        from wallet.wallet import Wallet
+
+        history = self.target_history(parent.index)
+        previous = parent
+        for block in blocks:
+            if block.index != previous.index + 1 or block.previous_hash != previous.hash:
+                print(f"Block {block.index} does not link to block {previous.index}")
+                return False
+            if block.target != self.retarget.next_target(history):
+                print(f"Block {block.index} has the wrong proof of work target")
+                return False
+            if not self.retarget.valid_timestamp(history, block.timestamp):
+                print(f"Block {block.index} has an invalid timestamp")
+                return False
+            history.append((block.timestamp, block.target))
+            if not ProofKernel(previous.hash, target=block.target).check(block.nonce):
+                print(f"Block {block.index} has an invalid proof of work")
+                return False
+            signed = [t for t in block.transactions if t.sender != "0"]
+            if not all(Wallet.verify_many([(t.sender, t.signature, t.to_bytes()) for t in signed], self.verify_executor)):
+                print(f"Block {block.index} contains an invalid transaction signature")
+                return False
+            previous = block
+        return True
+
+    def _notify_tip(self) -> None:
+        for listener in list(self.tip_listeners):
+            listener(self.last_block)
+
+    def _append(self, block: Block, source: str) -> None:
+        self.chain.append(block)
+        self._applied(block, source)
+
+    def _applied(self, block: Block, source: str) -> None:
+        """
+        Updates the balances, mempool and metrics for a block added to the chain.
+        """
+        if self._balances is not None:
+            self._balances.apply_block(block)
+        self.mempool.remove(block.transactions)
+        BLOCKS.labels(source).inc()
+
+    def reorganize(self, fork_height: int, blocks: list) -> bool:
+        """
+        Replaces the blocks above fork_height with a branch, e.g. a heavier
+        chain fetched by ChainSync. The branch is checked before anything
+        changes, and the suffix is swapped in one step (journaled by a
+        BlockStore), so a crash never leaves a shortened chain. Only the
+        replaced suffix is rolled back: its balance changes are reverted and
+        its transactions not in the branch are admitted again, through the
+        same checks as new ones. Returns False if the branch is invalid.
+        """
+        with self.lock:
+            if not 0 <= fork_height < len(self.chain) or not self._valid_branch(self.chain[fork_height], blocks):
+                return False
+
+            replaced = self.chain[fork_height + 1:]
+            self.chain[fork_height + 1:] = blocks
+            for block in reversed(replaced):
+                if self._balances is not None:
+                    self._balances.revert_block(block)
+            for block in blocks:
+                self._applied(block, "sync")
+            included = {transaction.txid for block in blocks for transaction in block.transactions}
+            returned = [
+                transaction for block in replaced for transaction in block.transactions
+                # Rewards of replaced blocks are void
+                if transaction.sender != "0" and transaction.txid not in included
+            ]
+            if returned:
+                self.new_transactions(returned)
+            if replaced:
+                REORGS.inc()
+                REORG_DEPTH.observe(len(replaced))
+                print(f"Reorganized chain: replaced {len(replaced)} blocks above height {fork_height} with {len(blocks)}")
+            self._notify_tip()
+        return True
+
+    def locator(self) -> list:
+        """
+        Returns [height, hash] pairs that let a peer find the last block it
+        shares with this chain: the last ten blocks, then exponentially
+        sparser ones back to genesis.
+        """
+        heights = []
+        height, step = len(self.chain) - 1, 1
+        while height > 0:
+            heights.append(height)
+            if len(heights) >= 10:
+                step *= 2
+            height -= step
+        heights.append(0)
+        return [[h, self.chain[h].hash] for h in heights]
+
+    def _encoded(self, height: int) -> bytes:
+        if self.store is not None:
+            return self.store.read(height)
+        return self.chain[height].encode()
+
+    def headers_after(self, locator: list, count: int) -> list:
+        """
+        Returns up to `count` encoded headers following the highest locator
+        entry that is on this chain, or [] if none is.
+        """
+        for height, block_hash in locator:
+            if 0 <= height < len(self.chain) and self.chain[height].hash == block_hash:
+                end = min(len(self.chain), height + 1 + count)
+                headers = []
+                for h in range(height + 1, end):
+                    data = self._encoded(h)
+                    headers.append(bytes(data[:BlockHeader.size(data)]))
+                return headers
+        return []
+
+    def encoded_blocks(self, heights) -> list:
+        """
+        Returns the encoded blocks at the given heights, skipping unknown ones.
+        """
+        return [self._encoded(h) for h in heights if 0 <= h < len(self.chain)]
+
     def mine(self):
         """
-        Mines a new block.
+        Mines a new block. Returns None if mining was interrupted.
         """
         proof = self.miner.mine()
+        if proof is None:
+            return None
         return self.new_block(proof)
 
     def get_balance(self, address: str) -> float:
         """
-        Calculates the balance of a given address.
+        Returns the balance of a given address from the balance index.
+        """
+        return self.balances.get(address)
+
+    def rebuild_balances(self) -> None:
+        """
+        Rebuilds the balance index from the chain, e.g. after the chain was replaced.
         """
-        balance = 0
-        for block in self.chain:
-            for tx in block.transactions:
-                if tx.recipient == address:
-                    balance += tx.amount
-                if tx.sender == address:
-                    balance -= tx.amount
-        return balance
+        self.balances.rebuild(self.chain)
 
-    def valid_proof(self, block: Block) -> bool:
+    def validate_chain(self, chain=None) -> bool:
         """
-        Validates the proof: Does the hash of the block contain <difficulty> leading zeros?
+        Validates hash linkage, proof of work and signatures of this chain, or
+        of another chain (e.g. a peer's) if given. For this chain, a store
+        backed Blockchain only re-validates blocks added since the last run.
         """
-        return block.hash[:self.difficulty] == "0" * self.difficulty
+        start = time.perf_counter()
+        if chain is None:
+            valid = self.chain_validator.validate(self.chain, self.retarget)
+        else:
+            valid = self.chain_validator.validate(chain, self.retarget, use_checkpoint=False)
+        CHAIN_VALIDATION_SECONDS.observe(time.perf_counter() - start)
+        return valid
 
-    def proof_of_work(self, last_proof: int) -> int:
+    def proof_of_work(self, last_proof: int, workers: int = None, progress=None) -> int:
         """
         Simple Proof of Work Algorithm:
          - Find a number p' such that hash(last_block_data + p') contains leading 0s equal to difficulty
          - last_block_data is the data of the last block, including its nonce
+        The proof must meet next_target(), which may lie between hex-zero steps.
+        With more than one worker the nonce space is split across a process pool.
+        `workers` defaults to `self.mining_workers`; 0 means one worker per core.
+        `progress`, if given, is called periodically with a MiningStats.
         """
-        proof = 0
-        while self.valid_proof_attempt(proof) is False:
+        if workers is None:
+            workers = self.mining_workers
+        proof = self._search_proof(workers, progress)
+        self.miner.record(self.last_mining_stats, found=proof is not None)
+        return proof
+
+    def _search_proof(self, workers: int, progress):
+        if workers != 1:
+            proof, self.last_mining_stats = parallel_proof_of_work(
+                self.last_block.hash, self.next_target(), workers or None, self.mining_interrupt_event, progress
+            )
+            return proof
+
+        start = time.time()
+        kernel = ProofKernel(self.last_block.hash, target=self.next_target())
+        batch_start = 0
+        while True:
             if self.mining_interrupt_event and self.mining_interrupt_event.is_set():
+                self.last_mining_stats = MiningStats(hashes=batch_start, elapsed=time.time() - start)
                 return None # Indicate that mining was interrupted
-            proof += 1
-        return proof
+            proof = kernel.search(batch_start, BATCH_SIZE)
+            if proof is not None:
+                self.last_mining_stats = MiningStats(hashes=proof + 1, elapsed=time.time() - start)
+                return proof
+            batch_start += BATCH_SIZE
+            if progress:
+                progress(MiningStats(hashes=batch_start, elapsed=time.time() - start))
 
     def valid_proof_attempt(self, proof: int) -> bool:
-        guess = f'{self.last_block.hash}{proof}'.encode()
-        guess_hash = hashlib.sha256(guess).hexdigest()
-        return guess_hash[:self.difficulty] == "0" * self.difficulty
+        return ProofKernel(self.last_block.hash, target=self.next_target()).check(proof)
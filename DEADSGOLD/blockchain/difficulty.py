@@ -0,0 +1,89 @@
+import time
+
+from .pow import MAX_TARGET, target_for_difficulty
+
+# Blocks whose timestamps and targets the retargeting controller averages over.
+DEFAULT_RETARGET_WINDOW = 30
+# Largest factor by which one retarget can scale the window's mean target.
+MAX_ADJUSTMENT = 4.0
+# A block's timestamp must be later than the median of this many previous blocks.
+MEDIAN_TIME_SPAN = 11
+# Furthest a block's timestamp may be ahead of the local clock, in seconds.
+MAX_FUTURE_DRIFT = 2 * 60 * 60
+
+
+class Retarget:
+    """
+    Difficulty rule of a chain: the target each block after genesis must carry.
+    Without a block_time the target stays at the initial difficulty. With one,
+    the next target is the mean target of the last `window` blocks scaled by
+    how long those blocks actually took over how long they should have taken,
+    so a hashrate change is corrected gradually rather than in whole hex-digit
+    (16x) steps. The genesis block's timestamp is fixed, so it is never part
+    of a window.
+
+    Miners choose their timestamps, so they are bounded too: each must be
+    later than the median of the previous MEDIAN_TIME_SPAN blocks and at most
+    max_future_drift seconds ahead of the local clock. The drift defaults to
+    one window's expected timespan (capped at MAX_FUTURE_DRIFT), so post-dating
+    blocks can loosen the target at most once, not on every retarget.
+    """
+
+    def __init__(self, difficulty: int = 4, block_time: float = None, window: int = DEFAULT_RETARGET_WINDOW):
+        self.difficulty = difficulty # Initial difficulty in leading hex zeros
+        self.block_time = block_time # Seconds between blocks to hold; None disables retargeting
+        self.window = window
+        if block_time is not None and block_time <= 0:
+            raise ValueError(f"block_time must be positive, got {block_time}")
+
+    @property
+    def max_future_drift(self) -> float:
+        if self.block_time is None:
+            return MAX_FUTURE_DRIFT
+        return min(MAX_FUTURE_DRIFT, self.block_time * self.window)
+
+    @property
+    def initial_target(self) -> int:
+        return target_for_difficulty(self.difficulty)
+
+    @property
+    def history_size(self) -> int:
+        """
+        Number of most recent blocks next_target() looks at.
+        """
+        return max(self.window + 1, MEDIAN_TIME_SPAN)
+
+    @staticmethod
+    def median_time_past(history) -> float:
+        """
+        Returns the median timestamp of the last MEDIAN_TIME_SPAN entries of
+        `history`, or None if it is empty.
+        """
+        timestamps = sorted(timestamp for timestamp, _ in list(history)[-MEDIAN_TIME_SPAN:])
+        return timestamps[len(timestamps) // 2] if timestamps else None
+
+    def valid_timestamp(self, history, timestamp: float, now: float = None) -> bool:
+        """
+        Checks the timestamp of the block following `history` against the
+        median time past and the local clock.
+        """
+        median = self.median_time_past(history)
+        if median is not None and timestamp <= median:
+            return False
+        return timestamp <= (time.time() if now is None else now) + self.max_future_drift
+
+    def next_target(self, history) -> int:
+        """
+        Returns the target of the block following `history`: (timestamp,
+        target) pairs of the most recent non-genesis blocks, oldest first.
+        """
+        if self.block_time is None or len(history) < 2:
+            return self.initial_target
+        history = list(history)[-(self.window + 1):]
+        intervals = len(history) - 1
+        expected = self.block_time * intervals
+        actual = history[-1][0] - history[0][0]
+        actual = min(max(actual, expected / MAX_ADJUSTMENT), expected * MAX_ADJUSTMENT)
+        mean_target = sum(target for _, target in history[1:]) // intervals
+        # Scale in integer microseconds: targets are far beyond float precision.
+        return max(1, min(MAX_TARGET, mean_target * max(1, round(actual * 1e6)) // max(1, round(expected * 1e6))))
@@ -0,0 +1,116 @@
+import itertools
+from collections import OrderedDict
+
+from .transaction import Transaction
+
+# Transactions from this sender are block rewards; they lead every block template.
+REWARD_SENDER = "0"
+
+
+class Mempool:
+    """
+    Pool of admitted transactions waiting to be mined.
+    Transactions are indexed by id (for O(1) duplicate detection) and by
+    sender. The pool is capped by count and by encoded size; when a cap is
+    exceeded the oldest transactions are evicted first. A single sender may
+    hold at most max_per_sender transactions, so one spamming address cannot
+    push everybody else out. Identical rewards (same recipient and amount)
+    share a txid but are distinct coins, so they are kept under per-entry
+    keys and never deduplicated.
+    """
+
+    def __init__(self, max_count: int = 100000, max_bytes: int = 64 * 1024 * 1024, max_per_sender: int = 1000):
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.max_per_sender = max_per_sender
+        self.bytes = 0
+        self.evicted = 0
+        self._transactions = OrderedDict() # txid -> (transaction, size), in arrival order
+        self._by_sender = {} # sender -> OrderedDict of txid -> None
+        self._reward_keys = itertools.count()
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def __contains__(self, txid: str):
+        return txid in self._transactions
+
+    def __iter__(self):
+        return (transaction for transaction, _ in self._transactions.values())
+
+    def get(self, txid: str) -> Transaction:
+        """
+        Returns the pending transaction with the given id, or None.
+        """
+        entry = self._transactions.get(txid)
+        return entry[0] if entry is not None else None
+
+    def by_sender(self, sender: str) -> list:
+        """
+        Returns the pending transactions of a sender in arrival order.
+        """
+        return [self._transactions[txid][0] for txid in self._by_sender.get(sender, ())]
+
+    def add(self, transaction: Transaction) -> bool:
+        """
+        Adds a transaction. Returns False for duplicates and for senders at
+        their limit; may evict the oldest transactions to stay within the caps.
+        """
+        txid = transaction.txid
+        if transaction.sender == REWARD_SENDER:
+            txid = f"{txid}:{next(self._reward_keys)}"
+        elif txid in self._transactions:
+            return False
+        sender_txids = self._by_sender.get(transaction.sender)
+        if sender_txids is not None and len(sender_txids) >= self.max_per_sender:
+            return False
+
+        size = len(transaction.encode())
+        self._transactions[txid] = (transaction, size)
+        self._by_sender.setdefault(transaction.sender, OrderedDict())[txid] = None
+        self.bytes += size
+
+        while len(self._transactions) > self.max_count or self.bytes > self.max_bytes:
+            self._remove(next(iter(self._transactions)))
+            self.evicted += 1
+        return txid in self._transactions
+
+    def _remove(self, txid: str) -> None:
+        transaction, size = self._transactions.pop(txid)
+        self.bytes -= size
+        sender_txids = self._by_sender[transaction.sender]
+        del sender_txids[txid]
+        if not sender_txids:
+            del self._by_sender[transaction.sender]
+
+    def remove(self, transactions) -> None:
+        """
+        Removes transactions, e.g. once they have been included in a block.
+        """
+        for transaction in transactions:
+            txid = transaction.txid
+            if transaction.sender == REWARD_SENDER:
+                # One pending reward per included one, oldest first.
+                txid = next((key for key in self._by_sender.get(REWARD_SENDER, ()) if key.startswith(txid)), None)
+            if txid in self._transactions:
+                self._remove(txid)
+
+    def select(self, max_count: int, max_bytes: int) -> list:
+        """
+        Returns a block template: reward transactions first, then the oldest
+        transactions, up to max_count transactions and max_bytes encoded bytes.
+        """
+        rewards = self._by_sender.get(REWARD_SENDER, {})
+        candidates = itertools.chain(rewards, (txid for txid in self._transactions if txid not in rewards))
+
+        selected = []
+        total = 0
+        for txid in candidates:
+            if len(selected) >= max_count:
+                break
+            transaction, size = self._transactions[txid]
+            if total + size > max_bytes:
+                continue
+            selected.append(transaction)
+            total += size
+        return selected
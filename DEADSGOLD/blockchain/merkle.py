@@ -0,0 +1,64 @@
+import hashlib
+
+# Domain separation between leaf and interior hashes, so a transaction can
+# never be passed off as an interior node.
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+
+EMPTY_ROOT = bytes(32)
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(_LEAF_PREFIX + data).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def _next_level(level: list) -> list:
+    # An odd node out is promoted unchanged rather than paired with itself.
+    paired = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        paired.append(level[-1])
+    return paired
+
+
+def merkle_root(leaves: list) -> bytes:
+    """
+    Returns the Merkle root of a list of leaf hashes.
+    """
+    if not leaves:
+        return EMPTY_ROOT
+    level = leaves
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_proof(leaves: list, index: int) -> list:
+    """
+    Returns the inclusion proof for leaves[index]: a list of
+    (sibling hash, sibling is on the left) pairs from the leaf up to the root.
+    """
+    if not 0 <= index < len(leaves):
+        raise IndexError(f"leaf index {index} out of range")
+    proof = []
+    level = leaves
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append((level[sibling], sibling < index))
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: list, root: bytes) -> bool:
+    """
+    Checks an inclusion proof produced by merkle_proof.
+    """
+    node = leaf
+    for sibling, sibling_is_left in proof:
+        node = _node_hash(sibling, node) if sibling_is_left else _node_hash(node, sibling)
+    return node == root
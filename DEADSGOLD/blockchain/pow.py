@@ -0,0 +1,74 @@
+import hashlib
+
+# Nonces tried per call to ProofKernel.search before control returns to the
+# caller (to check for interrupts, update counters, ...).
+BATCH_SIZE = 4096
+
+
+# The easiest possible target: every digest meets it.
+MAX_TARGET = (1 << 256) - 1
+
+
+def target_for_difficulty(difficulty: int) -> int:
+    """
+    Returns the target for a difficulty given as a count of leading hex zeros.
+    A digest meets a target iff, read as a big-endian integer, it is <= target.
+    """
+    return (1 << (256 - 4 * difficulty)) - 1
+
+
+def difficulty_target(difficulty: int) -> bytes:
+    """
+    Returns the 32-byte big-endian target for a difficulty given as a count of
+    leading hex zeros. A digest meets the difficulty iff digest <= target.
+    """
+    return target_for_difficulty(difficulty).to_bytes(32, 'big')
+
+
+# Target of blocks created without one; matches the default Blockchain difficulty.
+DEFAULT_TARGET = target_for_difficulty(4)
+
+
+def block_work(target: int) -> int:
+    """
+    Returns the expected number of hashes needed to find a proof for a
+    target. Chains are compared by the sum of this over their blocks.
+    """
+    return (1 << 256) // (target + 1)
+
+
+class ProofKernel:
+    """
+    Nonce-search kernel for proofs over a fixed block hash.
+    The block hash is absorbed into a sha256 midstate once and copied for each
+    attempt, and digests are compared as raw bytes against the target. The
+    target is given either as a hex-zero difficulty or as a number.
+    """
+
+    def __init__(self, last_hash: str, difficulty: int = None, target: int = None):
+        self._base = hashlib.sha256(last_hash.encode())
+        if target is None:
+            target = target_for_difficulty(difficulty)
+        self.target = target.to_bytes(32, 'big')
+
+    def check(self, nonce: int) -> bool:
+        """
+        Returns True if the nonce is a valid proof.
+        """
+        h = self._base.copy()
+        h.update(b'%d' % nonce)
+        return h.digest() <= self.target
+
+    def search(self, start: int, count: int = BATCH_SIZE):
+        """
+        Tries nonces start .. start + count - 1 in order.
+        Returns the first valid proof, or None if the batch has none.
+        """
+        copy = self._base.copy
+        target = self.target
+        for nonce in range(start, start + count):
+            h = copy()
+            h.update(b'%d' % nonce)
+            if h.digest() <= target:
+                return nonce
+        return None
@@ -0,0 +1,44 @@
+from .block import Block
+
+class BalanceIndex:
+    """
+    Account balances maintained incrementally as blocks are added to the chain.
+    """
+
+    def __init__(self):
+        self._balances = {}
+
+    def __len__(self):
+        return len(self._balances)
+
+    def get(self, address: str) -> float:
+        """
+        Returns the balance of an address in O(1).
+        """
+        return self._balances.get(address, 0)
+
+    def apply_block(self, block: Block) -> None:
+        """
+        Applies the transfers of a block appended to the chain.
+        """
+        balances = self._balances
+        for tx in block.transactions:
+            balances[tx.recipient] = balances.get(tx.recipient, 0) + tx.amount
+            balances[tx.sender] = balances.get(tx.sender, 0) - tx.amount
+
+    def revert_block(self, block: Block) -> None:
+        """
+        Undoes the transfers of a block removed from the tip of the chain.
+        """
+        balances = self._balances
+        for tx in reversed(block.transactions):
+            balances[tx.sender] = balances.get(tx.sender, 0) + tx.amount
+            balances[tx.recipient] = balances.get(tx.recipient, 0) - tx.amount
+
+    def rebuild(self, chain) -> None:
+        """
+        Recomputes every balance from scratch by replaying the chain.
+        """
+        self._balances = {}
+        for block in chain:
+            self.apply_block(block)
@@ -0,0 +1,344 @@
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+from .block import Block
+
+# Record framing in a segment file: payload length, crc32 of the payload.
+_RECORD = struct.Struct('>II')
+# Index entry per block height: segment number, record offset, payload length.
+_INDEX_ENTRY = struct.Struct('>IQI')
+# Reorganization journal header: fork height, number of block records that follow.
+_JOURNAL = struct.Struct('>QI')
+
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+
+
+class BlockStore:
+    """
+    Append-only on-disk block log.
+    Encoded blocks are appended to numbered segment files as length/CRC framed
+    records, and an index file maps each height to its record. Opening a store
+    only reads the index and the unindexed tail of the last segment; block
+    bodies are read on demand through memory maps. Replacing a suffix of the
+    chain goes through a journal, so a crash leaves the old or the new chain.
+    """
+
+    def __init__(self, path: str, segment_size: int = DEFAULT_SEGMENT_SIZE, fsync: bool = True):
+        self.path = path
+        self.segment_size = segment_size
+        self.fsync = fsync
+        os.makedirs(path, exist_ok=True)
+
+        self._maps = {} # segment -> mmap
+        self._index_map = None
+        self._mapped_count = 0
+        self._new_entries = []
+        self._recover()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, f"segment-{segment:06d}.log")
+
+    def _journal_path(self) -> str:
+        return os.path.join(self.path, "reorg")
+
+    def _read_index(self) -> list:
+        index_path = os.path.join(self.path, "index")
+        with open(index_path, 'a+b') as f:
+            f.seek(0)
+            data = f.read()
+        count = len(data) // _INDEX_ENTRY.size
+        return [_INDEX_ENTRY.unpack_from(data, i * _INDEX_ENTRY.size) for i in range(count)]
+
+    @staticmethod
+    def _scan_record(f, offset: int):
+        """
+        Returns the payload length of a complete, intact record at `offset`, or None.
+        """
+        f.seek(offset)
+        header = f.read(_RECORD.size)
+        if len(header) < _RECORD.size:
+            return None
+        length, crc = _RECORD.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return None
+        return length
+
+    def _recover(self) -> None:
+        """
+        Brings the index and segments back to a consistent state after a crash:
+        drops index entries whose records are missing or damaged, indexes
+        complete records that were written after the last index entry, and
+        truncates any partially written tail.
+        """
+        entries = self._read_index()
+        rewrite_index = os.path.getsize(os.path.join(self.path, "index")) != len(entries) * _INDEX_ENTRY.size
+
+        # Drop trailing entries that point at missing or damaged records.
+        while entries:
+            segment, offset, length = entries[-1]
+            segment_path = self._segment_path(segment)
+            if os.path.exists(segment_path):
+                with open(segment_path, 'rb') as f:
+                    if self._scan_record(f, offset) == length:
+                        break
+            entries.pop()
+            rewrite_index = True
+
+        # Recover complete records past the last indexed one.
+        if entries:
+            segment, offset, length = entries[-1]
+            position = offset + _RECORD.size + length
+        else:
+            segment, position = 0, 0
+        while os.path.exists(self._segment_path(segment)):
+            with open(self._segment_path(segment), 'r+b') as f:
+                while True:
+                    length = self._scan_record(f, position)
+                    if length is None:
+                        break
+                    entries.append((segment, position, length))
+                    rewrite_index = True
+                    position += _RECORD.size + length
+                damaged = f.seek(0, os.SEEK_END) != position
+                f.truncate(position)
+            if damaged:
+                # Anything in later segments was written after the damaged record.
+                self._remove_segments_from(segment + 1)
+                break
+            if not os.path.exists(self._segment_path(segment + 1)):
+                break
+            segment, position = segment + 1, 0
+
+        index_path = os.path.join(self.path, "index")
+        if rewrite_index:
+            with open(index_path, 'wb') as f:
+                f.write(b''.join(_INDEX_ENTRY.pack(*entry) for entry in entries))
+                f.flush()
+                os.fsync(f.fileno())
+
+        self._segment = segment
+        self._segment_file = open(self._segment_path(segment), 'ab')
+        self._index_file = open(index_path, 'ab')
+        self._mapped_count = len(entries)
+        if entries:
+            with open(index_path, 'rb') as f:
+                self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._replay_journal()
+
+    def _replay_journal(self) -> None:
+        """
+        Finishes a reorganization that was interrupted after its journal was
+        written. A journal that was not completely written is discarded: its
+        rename into place never happened, so the old chain is still whole.
+        """
+        journal_path = self._journal_path()
+        if os.path.exists(journal_path + ".tmp"):
+            os.remove(journal_path + ".tmp")
+        if not os.path.exists(journal_path):
+            return
+        with open(journal_path, 'rb') as f:
+            height, count = _JOURNAL.unpack(f.read(_JOURNAL.size))
+            payloads = []
+            for _ in range(count):
+                length = self._scan_record(f, f.tell())
+                if length is None:
+                    break
+                f.seek(-length, os.SEEK_CUR)
+                payloads.append(f.read(length))
+        if len(payloads) == count:
+            self._replace_records(height, payloads)
+        os.remove(journal_path)
+
+    def _remove_segments_from(self, segment: int) -> None:
+        while os.path.exists(self._segment_path(segment)):
+            os.remove(self._segment_path(segment))
+            segment += 1
+
+    def __len__(self):
+        return self._mapped_count + len(self._new_entries)
+
+    def _entry(self, height: int):
+        if height < self._mapped_count:
+            return _INDEX_ENTRY.unpack_from(self._index_map, height * _INDEX_ENTRY.size)
+        return self._new_entries[height - self._mapped_count]
+
+    def append(self, block: Block) -> None:
+        """
+        Appends a block at the next height. The record is made durable before
+        its index entry is written.
+        """
+        self._append_record(block.encode())
+
+    def _append_record(self, payload: bytes) -> None:
+        position = self._segment_file.tell()
+        if position > 0 and position + _RECORD.size + len(payload) > self.segment_size:
+            self._segment_file.close()
+            self._segment += 1
+            self._segment_file = open(self._segment_path(self._segment), 'ab')
+            position = 0
+
+        self._segment_file.write(_RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._sync(self._segment_file)
+
+        entry = (self._segment, position, len(payload))
+        self._index_file.write(_INDEX_ENTRY.pack(*entry))
+        self._sync(self._index_file)
+        self._new_entries.append(entry)
+
+    def truncate(self, height: int) -> None:
+        """
+        Removes the blocks at `height` and above, e.g. for replace().
+        Segments are cut before the index so
+        that a crash in between leaves index entries that recovery drops,
+        rather than records that recovery would re-index.
+        """
+        if height >= len(self):
+            return
+        segment, offset, _ = self._entry(height)
+        for mapped_segment in [s for s in self._maps if s >= segment]:
+            self._maps.pop(mapped_segment).close()
+        self._segment_file.close()
+        self._remove_segments_from(segment + 1)
+        with open(self._segment_path(segment), 'r+b') as f:
+            f.truncate(offset)
+            self._sync(f)
+        self._segment = segment
+        self._segment_file = open(self._segment_path(segment), 'ab')
+
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        self._index_file.close()
+        index_path = os.path.join(self.path, "index")
+        with open(index_path, 'r+b') as f:
+            f.truncate(height * _INDEX_ENTRY.size)
+            self._sync(f)
+        self._index_file = open(index_path, 'ab')
+        self._new_entries = []
+        self._mapped_count = height
+        if height:
+            with open(index_path, 'rb') as f:
+                self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def replace(self, height: int, blocks: list) -> None:
+        """
+        Replaces the blocks at `height` and above with `blocks`, e.g. in a
+        chain reorganization. The new blocks are written to a journal first
+        and the journal is renamed into place, so a crash before the rename
+        keeps the old chain and a crash after it is finished on reopening.
+        """
+        payloads = [block.encode() for block in blocks]
+        journal_path = self._journal_path()
+        with open(journal_path + ".tmp", 'wb') as f:
+            f.write(_JOURNAL.pack(height, len(payloads)))
+            f.write(b''.join(_RECORD.pack(len(payload), zlib.crc32(payload)) + payload for payload in payloads))
+            self._sync(f)
+        os.replace(journal_path + ".tmp", journal_path)
+        self._replace_records(height, payloads)
+        os.remove(journal_path)
+
+    def _replace_records(self, height: int, payloads: list) -> None:
+        self.truncate(height)
+        for payload in payloads:
+            self._append_record(payload)
+
+    def _sync(self, f) -> None:
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def read(self, height: int) -> bytes:
+        """
+        Returns the encoded block at a height.
+        """
+        if not 0 <= height < len(self):
+            raise IndexError(f"block height {height} out of range")
+        segment, offset, length = self._entry(height)
+        start = offset + _RECORD.size
+        end = start + length
+        segment_map = self._maps.get(segment)
+        if segment_map is None or len(segment_map) < end:
+            if segment_map is not None:
+                segment_map.close()
+            with open(self._segment_path(segment), 'rb') as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = segment_map
+        return segment_map[start:end]
+
+    def get(self, height: int) -> Block:
+        """
+        Returns the decoded block at a height.
+        """
+        return Block.decode(self.read(height))
+
+    def close(self) -> None:
+        for segment_map in self._maps.values():
+            segment_map.close()
+        self._maps = {}
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        self._segment_file.close()
+        self._index_file.close()
+
+
+class PersistentChain:
+    """
+    List-like view of the blocks in a BlockStore, used as Blockchain.chain.
+    Blocks are decoded on access and the most recently used ones are cached.
+    """
+
+    def __init__(self, store: BlockStore, cache_size: int = 1024):
+        self.store = store
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.store)
+
+    def _remember(self, height: int, block: Block) -> None:
+        self._cache[height] = block
+        self._cache.move_to_end(height)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        height = item + len(self) if item < 0 else item
+        block = self._cache.get(height)
+        if block is None:
+            block = self.store.get(height)
+        self._remember(height, block)
+        return block
+
+    def __iter__(self):
+        for height in range(len(self)):
+            block = self._cache.get(height)
+            yield block if block is not None else self.store.get(height)
+
+    def __delitem__(self, item):
+        if not isinstance(item, slice) or item.step not in (None, 1) or item.stop is not None:
+            raise TypeError("only a suffix of the chain (del chain[height:]) can be removed")
+        height = item.indices(len(self))[0]
+        self.store.truncate(height)
+        for cached in [h for h in self._cache if h >= height]:
+            del self._cache[cached]
+
+    def __setitem__(self, item, blocks):
+        if not isinstance(item, slice) or item.step not in (None, 1) or item.stop is not None:
+            raise TypeError("only a suffix of the chain (chain[height:] = blocks) can be replaced")
+        height = item.indices(len(self))[0]
+        self.store.replace(height, blocks)
+        for cached in [h for h in self._cache if h >= height]:
+            del self._cache[cached]
+        for offset, block in enumerate(blocks):
+            self._remember(height + offset, block)
+
+    def append(self, block: Block) -> None:
+        self.store.append(block)
+        self._remember(len(self) - 1, block)
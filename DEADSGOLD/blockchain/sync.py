@@ -0,0 +1,151 @@
+import asyncio
+from collections import deque
+
+from .block import Block, BlockHeader
+from .pow import ProofKernel, block_work
+
+# Headers requested per round trip.
+HEADERS_PER_REQUEST = 2000
+# Block bodies requested per round trip.
+BLOCKS_PER_REQUEST = 16
+# Body requests in flight at once, spread over the peers that have the chain.
+MAX_PARALLEL_REQUESTS = 8
+
+
+async def _call(fn, *args):
+    return fn(*args)
+
+
+class ChainSync:
+    """
+    Headers-first chain synchronization.
+    Peers are asked for the headers past the last block they share with us
+    (found through Blockchain.locator()). Headers are checked for linkage,
+    targets, timestamps and proof of work, and the heaviest valid chain (most summed
+    work, not most blocks) is chosen before any bodies
+    are fetched; bodies are then requested in parallel across the peers that
+    serve that chain and checked against the header hashes.
+
+    Peers need two coroutines: get_headers(locator, count) returning encoded
+    headers, and get_blocks(heights) returning encoded blocks. `run` executes
+    blockchain calls, e.g. on a node's chain thread.
+    """
+
+    def __init__(self, blockchain, run=None):
+        self.blockchain = blockchain
+        self._run = run or _call
+
+    async def download_headers(self, peer):
+        """
+        Returns (fork height, headers) for the peer's chain past the last
+        block we share, or None if the peer sent an invalid header.
+        """
+        blockchain = self.blockchain
+        locator = await self._run(blockchain.locator)
+        retarget = blockchain.retarget
+        fork, headers, previous_hash, history = None, [], None, None
+        while True:
+            batch = [BlockHeader.decode(data) for data in await peer.get_headers(locator, HEADERS_PER_REQUEST)]
+            if not batch:
+                break
+            if fork is None:
+                fork = batch[0].index - 1
+                if not 0 <= fork < len(blockchain.chain):
+                    print(f"Peer sent headers starting at height {fork + 1}, past our chain")
+                    return None
+                previous_hash = await self._run(lambda: blockchain.chain[fork].hash)
+                history = deque(await self._run(blockchain.target_history, fork), maxlen=retarget.history_size)
+            for header in batch:
+                expected_index = fork + 1 + len(headers)
+                if header.index != expected_index or header.previous_hash != previous_hash:
+                    print(f"Peer sent a header at height {header.index} that does not link to height {expected_index - 1}")
+                    return None
+                if header.target != retarget.next_target(history):
+                    print(f"Peer sent a header at height {header.index} with the wrong target")
+                    return None
+                if not retarget.valid_timestamp(history, header.timestamp):
+                    print(f"Peer sent a header at height {header.index} with an invalid timestamp")
+                    return None
+                if not ProofKernel(previous_hash, target=header.target).check(header.nonce):
+                    print(f"Peer sent a header at height {header.index} with an invalid proof of work")
+                    return None
+                history.append((header.timestamp, header.target))
+                headers.append(header)
+                previous_hash = header.hash
+            if len(batch) < HEADERS_PER_REQUEST:
+                break
+            locator = [[headers[-1].index, headers[-1].hash]]
+        return (fork if fork is not None else len(blockchain.chain) - 1), headers
+
+    async def _fetch_blocks(self, sources: list, headers: list) -> list:
+        """
+        Fetches and checks the bodies for consecutive headers, spreading the
+        requests over the sources. Returns None if some body is unavailable.
+        """
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)
+
+        async def fetch(chunk_number, chunk):
+            heights = [header.index for header in chunk]
+            async with semaphore:
+                for attempt in range(len(sources)):
+                    peer = sources[(chunk_number + attempt) % len(sources)]
+                    try:
+                        blocks = [Block.decode(data) for data in await peer.get_blocks(heights)]
+                    except (ConnectionError, asyncio.TimeoutError):
+                        continue
+                    if [block.hash for block in blocks] == [header.hash for header in chunk]:
+                        return blocks
+            print(f"No peer served valid blocks for heights {heights[0]}-{heights[-1]}")
+            return None
+
+        chunks = [headers[i:i + BLOCKS_PER_REQUEST] for i in range(0, len(headers), BLOCKS_PER_REQUEST)]
+        results = await asyncio.gather(*(fetch(n, chunk) for n, chunk in enumerate(chunks)))
+        if any(blocks is None for blocks in results):
+            return None
+        return [block for blocks in results for block in blocks]
+
+    async def sync(self, peers: list) -> bool:
+        """
+        Adopts the heaviest valid chain among this node's and the peers'.
+        Returns True if the local chain changed.
+        """
+        blockchain = self.blockchain
+        candidates = []
+        for peer in peers:
+            result = await self.download_headers(peer)
+            if result is not None and result[1]:
+                fork, headers = result
+                replaced_work = await self._run(blockchain.work_above, fork)
+                gain = sum(block_work(header.target) for header in headers) - replaced_work
+                candidates.append((gain, peer, fork, headers, replaced_work))
+        if not candidates:
+            return False
+
+        gain, best_peer, fork, headers, replaced_work = max(candidates, key=lambda c: c[0])
+        if gain <= 0:
+            return False # Ties keep the chain we already have
+        sources = [best_peer] + [
+            peer for _, peer, _, peer_headers, _ in candidates
+            if peer is not best_peer and peer_headers[-1].hash == headers[-1].hash
+        ]
+
+        # Bodies are fetched and applied in windows. The replaced suffix is
+        # only rolled back once the fetched blocks outweigh it, so a peer that
+        # stops serving bodies cannot leave us on a lighter chain.
+        window = BLOCKS_PER_REQUEST * MAX_PARALLEL_REQUESTS
+        pending, pending_work = [], 0
+        changed = False
+        for start in range(0, len(headers), window):
+            blocks = await self._fetch_blocks(sources, headers[start:start + window])
+            if blocks is None:
+                return changed
+            pending.extend(blocks)
+            pending_work += sum(block_work(block.target) for block in blocks)
+            if not changed and pending_work <= replaced_work:
+                continue
+            base = fork if not changed else pending[0].index - 1
+            if not await self._run(blockchain.reorganize, base, pending):
+                return changed
+            changed = True
+            pending = []
+        return changed
@@ -1,7 +1,21 @@
-
+import hashlib
+import struct
 from dataclasses import dataclass
 
-@dataclass
+# Lengths of sender, recipient, amount and signature, followed by the fields.
+_TX_HEADER = struct.Struct('>HHHH')
+
+def _parse_amount(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+@dataclass(slots=True)
 class Transaction:
     sender: str
     recipient: str
@@ -13,3 +27,46 @@ class Transaction:
         Serializes the transaction to bytes for signing.
         """
         return f'{self.sender}{self.recipient}{self.amount}'.encode()
+
+    def encode(self) -> bytes:
+        """
+        Returns the canonical binary encoding of the transaction, including its signature.
+        """
+        sender = self.sender.encode()
+        recipient = self.recipient.encode()
+        amount = str(self.amount).encode()
+        signature = self.signature or b''
+        return _TX_HEADER.pack(len(sender), len(recipient), len(amount), len(signature)) + sender + recipient + amount + signature
+
+    @property
+    def txid(self) -> str:
+        """
+        Returns the transaction id: the hash of its canonical encoding.
+        """
+        return hashlib.sha256(self.encode()).hexdigest()
+
+    @classmethod
+    def decode(cls, data, offset: int = 0):
+        """
+        Decodes a transaction written by encode() starting at `offset`.
+        Returns the transaction and the offset just past it.
+        """
+        lengths = _TX_HEADER.unpack_from(data, offset)
+        offset += _TX_HEADER.size
+        fields = []
+        for length in lengths:
+            fields.append(bytes(data[offset:offset + length]))
+            offset += length
+        sender, recipient, amount, signature = fields
+        return cls(sender.decode(), recipient.decode(), _parse_amount(amount.decode()), signature or None), offset
+
+    def to_dict(self) -> dict:
+        """
+        Returns a JSON-serializable representation of the transaction.
+        """
+        return {
+            "sender": self.sender,
+            "recipient": self.recipient,
+            "amount": self.amount,
+            "signature": self.signature.hex() if self.signature else None
+        }
@@ -0,0 +1,147 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .block import Block
+from .difficulty import Retarget
+from .pow import ProofKernel
+
+# Blocks checked per task when validation runs on a process pool.
+VALIDATION_CHUNK_SIZE = 256
+
+
+def _check_blocks(encoded_blocks):
+    """
+    Runs the checks that need only the block itself: its hash, proof of work
+    (against the previous hash and target it records) and transaction
+    signatures. Returns (index, hash, previous_hash, timestamp, target,
+    proof ok, signatures ok) per block.
+    """
+    from wallet.wallet import Wallet # Deferred so importing the chain does not load the crypto libraries
+
+    results = []
+    for data in encoded_blocks:
+        block = Block.decode(data)
+        proof_ok = block.index == 0 or ProofKernel(block.previous_hash, target=block.target).check(block.nonce)
+        signed = [t for t in block.transactions if t.sender != "0"]
+        signatures_ok = all(Wallet.verify_many([(t.sender, t.signature, t.to_bytes()) for t in signed]))
+        results.append((block.index, block.hash, block.previous_hash, block.timestamp, block.target, proof_ok, signatures_ok))
+    return results
+
+
+class ChainValidator:
+    """
+    Full-chain validation: hash linkage, targets, timestamps, proof of work
+    and signatures.
+    Per-block checks are independent and can be spread over a process pool;
+    linkage and targets are then checked sequentially on the results. With a checkpoint
+    file, the last validated (height, hash) is recorded so that later runs,
+    including after a restart, only cover blocks added since.
+    """
+
+    def __init__(self, workers: int = 1, checkpoint_path: str = None):
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            data = json.load(f)
+        return data["height"], data["hash"]
+
+    def _save_checkpoint(self, height: int, block_hash: str) -> None:
+        if not self.checkpoint_path:
+            return
+        self.checkpoint = (height, block_hash)
+        temporary_path = self.checkpoint_path + ".tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump({"height": height, "hash": block_hash}, f)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    @staticmethod
+    def _encoded(chain, heights) -> list:
+        store = getattr(chain, 'store', None)
+        if store is not None:
+            return [store.read(h) for h in heights] # Raw records; no decode in this process
+        return [chain[h].encode() for h in heights]
+
+    def _check(self, chain, heights):
+        """
+        Yields the per-block check results in height order. On a pool, a
+        bounded number of chunks is in flight so memory stays flat.
+        """
+        chunks = (
+            self._encoded(chain, heights[i:i + VALIDATION_CHUNK_SIZE])
+            for i in range(0, len(heights), VALIDATION_CHUNK_SIZE)
+        )
+        if self.workers == 1 or len(heights) <= VALIDATION_CHUNK_SIZE:
+            for chunk in chunks:
+                yield from _check_blocks(chunk)
+            return
+
+        workers = self.workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_check_blocks, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def validate(self, chain, retarget, use_checkpoint: bool = True) -> bool:
+        """
+        Validates a chain against a Retarget rule, or a fixed difficulty given
+        as an int. Returns True if every block is valid.
+        """
+        if not isinstance(retarget, Retarget):
+            retarget = Retarget(difficulty=retarget)
+        start, previous_hash = 0, None
+        if use_checkpoint and self.checkpoint is not None:
+            height, checkpoint_hash = self.checkpoint
+            if height < len(chain) and chain[height].compute_hash() == checkpoint_hash:
+                start, previous_hash = height + 1, checkpoint_hash
+        history = deque(
+            ((block.timestamp, block.target) for block in chain[max(1, start - retarget.history_size):start]),
+            maxlen=retarget.history_size
+        )
+
+        heights = range(start, len(chain))
+        now = time.time()
+        checked = self._check(chain, heights)
+        try:
+            for height, (index, block_hash, recorded_previous_hash, timestamp, target, proof_ok, signatures_ok) in zip(heights, checked):
+                if index != height:
+                    print(f"Block {height} has index {index}")
+                    return False
+                if height > 0 and recorded_previous_hash != previous_hash:
+                    print(f"Block {height} does not link to the hash of block {height - 1}")
+                    return False
+                if height > 0:
+                    if target != retarget.next_target(history):
+                        print(f"Block {height} has the wrong proof of work target")
+                        return False
+                    if not retarget.valid_timestamp(history, timestamp, now):
+                        print(f"Block {height} has an invalid timestamp")
+                        return False
+                    history.append((timestamp, target))
+                if not proof_ok:
+                    print(f"Block {height} has an invalid proof of work")
+                    return False
+                if not signatures_ok:
+                    print(f"Block {height} contains an invalid transaction signature")
+                    return False
+                previous_hash = block_hash
+        finally:
+            checked.close()
+
+        if use_checkpoint and heights:
+            self._save_checkpoint(heights[-1], previous_hash)
+        return True
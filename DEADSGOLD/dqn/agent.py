@@ -3,8 +3,9 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
-from collections import namedtuple, deque
-import random
+from collections import namedtuple
+
+from .sumtree import SumTree
 
 class QNetwork(nn.Module):
     def __init__(self, state_size, action_size):
@@ -18,27 +19,139 @@ class QNetwork(nn.Module):
         x = torch.relu(self.fc2(x))
         return self.fc3(x)
 
+# A sampled minibatch, as tensors ready for the loss: states (B, state_size),
+# actions (B, 1) int64, rewards and dones (B, 1) float32. Prioritized replay
+# also returns the buffer indices and (B, 1) importance-sampling weights.
+Batch = namedtuple('Batch', ('states', 'actions', 'rewards', 'next_states', 'dones', 'indices', 'weights'), defaults=(None, None))
+
 class ReplayBuffer:
-    def __init__(self, buffer_size):
+    """
+    Fixed-capacity ring buffer of transitions with one preallocated array per
+    field. Once full, new transitions overwrite the oldest. Sampling gathers
+    a batch of random indices from each array at once, so no per-transition
+    Python work happens after add().
+    """
+
+    def __init__(self, buffer_size, state_size, state_dtype=np.float32, seed=None):
         self.buffer_size = buffer_size
-        self.memory = deque(maxlen=buffer_size)
-        self.Transition = namedtuple('Transition', ('state', 'action', 'reward', 'next_state', 'done'))
+        self.states = np.zeros((buffer_size, state_size), dtype=state_dtype)
+        self.actions = np.zeros((buffer_size, 1), dtype=np.int64)
+        self.rewards = np.zeros((buffer_size, 1), dtype=np.float32)
+        self.next_states = np.zeros((buffer_size, state_size), dtype=state_dtype)
+        self.dones = np.zeros((buffer_size, 1), dtype=np.float32)
+        self.position = 0 # Slot the next transition is written to
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        i = self.position
+        self.states[i] = np.asarray(state).reshape(-1)
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = np.asarray(next_state).reshape(-1)
+        self.dones[i] = done
+        self.position = (i + 1) % self.buffer_size
+        self.size = min(self.size + 1, self.buffer_size)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Adds N transitions given as arrays with a leading dimension of N.
+        Returns the indices they were written to.
+        """
+        count = len(actions)
+        indices = (self.position + np.arange(count)) % self.buffer_size
+        self.states[indices] = np.asarray(states).reshape(count, -1)
+        self.actions[indices, 0] = np.asarray(actions).reshape(-1)
+        self.rewards[indices, 0] = np.asarray(rewards).reshape(-1)
+        self.next_states[indices] = np.asarray(next_states).reshape(count, -1)
+        self.dones[indices, 0] = np.asarray(dones).reshape(-1)
+        self.position = int(indices[-1] + 1) % self.buffer_size if count else self.position
+        self.size = min(self.size + count, self.buffer_size)
+        return indices
+
+    def gather(self, indices):
+        """
+        Returns the transitions at `indices` as a Batch of tensors.
+        """
+        return Batch(
+            torch.from_numpy(self.states[indices].astype(np.float32, copy=False)),
+            torch.from_numpy(self.actions[indices]),
+            torch.from_numpy(self.rewards[indices]),
+            torch.from_numpy(self.next_states[indices].astype(np.float32, copy=False)),
+            torch.from_numpy(self.dones[indices]),
+        )
+
+    def sample(self, batch_size):
+        """
+        Returns batch_size transitions drawn uniformly, with replacement.
+        """
+        return self.gather(self.rng.integers(0, self.size, batch_size))
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer that samples transitions in proportion to priority ** alpha,
+    where the priority is the absolute TD error of the transition's last
+    update (new transitions get the highest priority seen so far). Samples
+    carry importance-sampling weights, (N * P(i)) ** -beta normalized by the
+    batch maximum, which correct the bias of non-uniform sampling as beta
+    approaches 1.
+    """
+
+    def __init__(self, buffer_size, state_size, state_dtype=np.float32, seed=None, alpha=0.6, beta=0.4, epsilon=1e-6):
+        super().__init__(buffer_size, state_size, state_dtype, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon # Keeps zero-error transitions sampleable
+        self.tree = SumTree(buffer_size)
+        self.max_priority = 1.0
 
     def add(self, state, action, reward, next_state, done):
-        transition = self.Transition(state, action, reward, next_state, done)
-        self.memory.append(transition)
+        index = self.position
+        super().add(state, action, reward, next_state, done)
+        self.tree.update([index], self.max_priority ** self.alpha)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        indices = super().add_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(indices, self.max_priority ** self.alpha)
+        return indices
 
     def sample(self, batch_size):
-        batch = random.sample(self.memory, batch_size)
-        return self.Transition(*zip(*batch))
+        """
+        Returns batch_size transitions, one drawn from each of batch_size
+        equal slices of the total priority.
+        """
+        total = self.tree.total
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+        probabilities = np.maximum(self.tree.priorities[indices] / total, np.finfo(np.float64).tiny)
+        weights = (self.size * probabilities) ** -self.beta
+        weights = (weights / weights.max()).astype(np.float32).reshape(-1, 1)
+        return self.gather(indices)._replace(indices=indices, weights=torch.from_numpy(weights))
+
+    def update_priorities(self, indices, td_errors):
+        """
+        Sets the priorities of sampled transitions from their new TD errors.
+        """
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)).reshape(-1) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
 
 class DQNAgent:
-    def __init__(self, state_size, action_size, learning_rate=0.001, gamma=0.99, buffer_size=10000, batch_size=64, epsilon=1.0, min_epsilon=0.01, epsilon_decay=0.995, target_update_frequency=100):
+    def __init__(self, state_size, action_size, learning_rate=0.001, gamma=0.99, buffer_size=10000, batch_size=64, epsilon=1.0, min_epsilon=0.01, epsilon_decay=0.995, target_update_frequency=100, state_dtype=np.float32, prioritized=False, alpha=0.6, beta=0.4, beta_steps=100000, seed=None):
         self.state_size = state_size
         self.action_size = action_size
         self.gamma = gamma
         self.batch_size = batch_size
-        self.buffer = ReplayBuffer(buffer_size)
+        if prioritized:
+            self.buffer = PrioritizedReplayBuffer(buffer_size, state_size, state_dtype, seed, alpha=alpha, beta=beta)
+        else:
+            self.buffer = ReplayBuffer(buffer_size, state_size, state_dtype, seed) # seed makes replay sampling reproducible
+        self.prioritized = prioritized
+        self.initial_beta = beta
+        self.beta_steps = beta_steps # Train steps over which beta is annealed to 1
         self.epsilon = epsilon
         self.min_epsilon = min_epsilon
         self.epsilon_decay = epsilon_decay
@@ -60,26 +173,45 @@ class DQNAgent:
                 q_values = self.q_network(state)
                 return torch.argmax(q_values).item()
 
+    def select_actions(self, states):
+        """
+        Epsilon-greedy actions for a batch of states (one per environment)
+        with a single forward pass. Returns an int64 array.
+        """
+        states = torch.as_tensor(np.asarray(states), dtype=torch.float32)
+        with torch.no_grad():
+            actions = self.q_network(states).argmax(dim=1).numpy()
+        explore = np.random.rand(len(actions)) < self.epsilon
+        actions[explore] = np.random.randint(self.action_size, size=int(explore.sum()))
+        return actions
+
+    def decay_epsilon(self):
+        self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
+
     def train(self):
-        if len(self.buffer.memory) < self.batch_size:
+        """
+        Runs one gradient step on a sampled minibatch and returns its loss,
+        or None while the buffer holds fewer than batch_size transitions.
+        """
+        if len(self.buffer) < self.batch_size:
             return
 
-        transitions = self.buffer.sample(self.batch_size)
-        batch = self.Transition(*zip(*transitions))
+        batch = self.buffer.sample(self.batch_size)
 
-        states = torch.cat(batch.state)
-        actions = torch.tensor(batch.action, dtype=torch.int64).view(-1, 1)
-        rewards = torch.tensor(batch.reward, dtype=torch.float32).view(-1, 1)
-        next_states = torch.cat(batch.next_state)
-        dones = torch.tensor(batch.done, dtype=torch.float32).view(-1, 1)
+        q_values = self.q_network(batch.states).gather(1, batch.actions)
 
-        q_values = self.q_network(states).gather(1, actions)
-
-        next_q_values = self.target_network(next_states).detach()
+        next_q_values = self.target_network(batch.next_states).detach()
         max_next_q_values = torch.max(next_q_values, dim=1, keepdim=True).values
-        td_targets = rewards + self.gamma * (1 - dones) * max_next_q_values
-
-        loss = self.loss_fn(q_values, td_targets)
+        td_targets = batch.rewards + self.gamma * (1 - batch.dones) * max_next_q_values
+
+        if self.prioritized:
+            td_errors = td_targets - q_values
+            loss = (batch.weights * td_errors.pow(2)).mean()
+            self.buffer.update_priorities(batch.indices, td_errors.detach().numpy())
+            progress = min(1.0, (self.total_steps + 1) / self.beta_steps)
+            self.buffer.beta = self.initial_beta + (1.0 - self.initial_beta) * progress
+        else:
+            loss = self.loss_fn(q_values, td_targets)
 
         self.optimizer.zero_grad()
         loss.backward()
@@ -88,6 +220,7 @@ class DQNAgent:
         self.total_steps += 1
         if self.total_steps % self.target_update_frequency == 0:
             self.update_target_network()
+        return loss.item()
 
     def update_target_network(self):
         self.target_network.load_state_dict(self.q_network.state_dict())
@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics.metrics import REGISTRY
+from .validator import Validator
+
+QUEUE_DEPTH = REGISTRY.histogram(
+    'deadsgold_dqn_batcher_queue_depth', "Validation requests waiting when a batch is dispatched, including the batch.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+)
+BATCH_SIZE = REGISTRY.histogram(
+    'deadsgold_dqn_batcher_batch_size', "Transactions per batch dispatched by the inference batcher.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+)
+WAIT_SECONDS = REGISTRY.histogram('deadsgold_dqn_batcher_wait_seconds', "Time a validation request waits before its batch runs.")
+
+
+class InferenceBatcher(Validator):
+    """
+    Collects validation requests from concurrent threads into batches for a
+    wrapped validator, so one batched model call serves many callers. A
+    batch is dispatched when it reaches max_batch_size or max_delay_us after
+    its first request arrived. Requests that queue up while a batch runs
+    are dispatched as soon as it finishes, so a burst is not delayed further.
+    """
+
+    def __init__(self, validator: Validator, max_batch_size: int = 256, max_delay_us: float = 200):
+        self.validator = validator
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_us / 1e6
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._lock = threading.Lock() # Orders submits against close's sentinel
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, transaction) -> Future:
+        """
+        Queues one transaction; the returned future resolves to its verdict.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("InferenceBatcher is closed")
+            self._queue.put((transaction, future, time.perf_counter()))
+        return future
+
+    def validate_batch(self, transactions) -> list:
+        futures = [self.submit(transaction) for transaction in transactions]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """
+        Stops the dispatch thread once the requests already queued are done.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = item[2] + self.max_delay
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    # Past the deadline, still take whatever is already queued.
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            QUEUE_DEPTH.observe(len(batch) + self._queue.qsize())
+            self._dispatch(batch)
+            if stopping:
+                return
+
+    def _dispatch(self, batch: list) -> None:
+        now = time.perf_counter()
+        for _, _, submitted in batch:
+            WAIT_SECONDS.observe(now - submitted)
+        BATCH_SIZE.observe(len(batch))
+        try:
+            verdicts = list(self.validator.validate_batch([transaction for transaction, _, _ in batch]))
+            if len(verdicts) != len(batch):
+                raise RuntimeError(f"Validator returned {len(verdicts)} verdicts for a batch of {len(batch)}")
+        except Exception as exc:
+            for _, future, _ in batch:
+                future.set_exception(exc)
+            return
+        for (_, future, _), verdict in zip(batch, verdicts):
+            future.set_result(verdict)
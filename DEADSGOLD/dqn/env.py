@@ -0,0 +1,179 @@
+import multiprocessing
+import random
+
+import numpy as np
+
+from blockchain.transaction import Transaction
+from .validator import DQNValidator, RuleValidator
+
+# Actions of the validator model.
+REJECT, APPROVE = 0, 1
+
+
+def synthetic_transactions(count: int, seed: int = None):
+    """
+    Returns `count` random transactions and their labels (1 approve, 0
+    reject) from RuleValidator: a mix of valid transfers, non-positive or
+    oversized amounts and transfers to oneself.
+    """
+    rng = random.Random(seed)
+    addresses = [f"address{i}" for i in range(50)]
+    transactions = []
+    for _ in range(count):
+        sender, recipient = rng.sample(addresses, 2)
+        kind = rng.random()
+        if kind < 0.1:
+            recipient = sender
+        if kind < 0.2:
+            amount = rng.choice([0, -rng.randint(1, 1000)])
+        elif kind < 0.3:
+            amount = rng.randint(10001, 10 ** 6)
+        else:
+            amount = rng.choice([rng.randint(1, 10000), round(rng.uniform(0.01, 10000), 2)])
+        transactions.append(Transaction(sender, recipient, amount))
+    labels = RuleValidator(max_amount=10000).validate_batch(transactions)
+    return transactions, [int(label) for label in labels]
+
+
+def encode_states(transactions) -> np.ndarray:
+    """
+    Returns transactions in the validator model's input format, as uint8
+    character codes to keep replay buffers small.
+    """
+    return DQNValidator().encode_transactions(transactions).astype(np.uint8)
+
+
+class TransactionEnv:
+    """
+    Episodes of transactions to approve or reject. The states are the
+    transactions as encoded by encode_states; the reward is +1 for the
+    labelled action and -1 otherwise. An episode ends after episode_length
+    transactions. Environments built over the same arrays share them.
+    """
+
+    def __init__(self, states: np.ndarray, labels, episode_length: int = 32, seed: int = None):
+        self.states = states
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.episode_length = episode_length
+        self.rng = np.random.default_rng(seed)
+        self._current = None
+        self._steps = 0
+
+    @property
+    def state_size(self) -> int:
+        return self.states.shape[1]
+
+    def _draw(self) -> np.ndarray:
+        self._current = int(self.rng.integers(len(self.states)))
+        return self.states[self._current]
+
+    def reset(self) -> np.ndarray:
+        self._steps = 0
+        return self._draw()
+
+    def step(self, action: int):
+        """
+        Returns (next_state, reward, done).
+        """
+        reward = 1.0 if action == self.labels[self._current] else -1.0
+        self._steps += 1
+        return self._draw(), reward, self._steps >= self.episode_length
+
+
+class VectorEnv:
+    """
+    Steps N environments together with batched actions. Finished
+    environments are reset automatically: step() returns the successor
+    states for replay, and `observations` holds the states to act on next.
+    """
+
+    def __init__(self, envs):
+        self.envs = list(envs)
+        self.observations = None
+
+    @property
+    def num_envs(self) -> int:
+        return len(self.envs)
+
+    def reset(self) -> np.ndarray:
+        self.observations = np.stack([env.reset() for env in self.envs])
+        return self.observations
+
+    def step(self, actions):
+        """
+        Returns (next_states, rewards, dones) arrays with one row per
+        environment.
+        """
+        next_states, rewards, dones, observations = [], [], [], []
+        for env, action in zip(self.envs, actions):
+            next_state, reward, done = env.step(int(action))
+            next_states.append(next_state)
+            rewards.append(reward)
+            dones.append(done)
+            observations.append(env.reset() if done else next_state)
+        self.observations = np.stack(observations)
+        return np.stack(next_states), np.array(rewards, dtype=np.float32), np.array(dones)
+
+    def close(self) -> None:
+        pass
+
+
+def _vector_env_worker(connection, env_fns) -> None:
+    env = VectorEnv(fn() for fn in env_fns)
+    while True:
+        command, data = connection.recv()
+        if command == 'reset':
+            connection.send(env.reset())
+        elif command == 'step':
+            connection.send(env.step(data) + (env.observations,))
+        else:
+            connection.close()
+            return
+
+
+class ProcessVectorEnv:
+    """
+    A VectorEnv whose environments are split across worker processes, so
+    stepping them uses every core. env_fns must be picklable callables that
+    each build one environment; workers=0 starts one per core. Each worker
+    receives its env_fns in one message, so data they share is sent once.
+    """
+
+    def __init__(self, env_fns, workers: int = 0):
+        env_fns = list(env_fns)
+        workers = min(workers or multiprocessing.cpu_count(), len(env_fns))
+        ctx = multiprocessing.get_context()
+        self._slices = np.array_split(np.arange(len(env_fns)), workers)
+        self._connections = []
+        self._processes = []
+        for indices in self._slices:
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_vector_env_worker, args=(child, [env_fns[i] for i in indices]), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self.num_envs = len(env_fns)
+        self.observations = None
+
+    def reset(self) -> np.ndarray:
+        for connection in self._connections:
+            connection.send(('reset', None))
+        self.observations = np.concatenate([connection.recv() for connection in self._connections])
+        return self.observations
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        for connection, indices in zip(self._connections, self._slices):
+            connection.send(('step', actions[indices]))
+        results = [connection.recv() for connection in self._connections]
+        next_states, rewards, dones, observations = (np.concatenate(part) for part in zip(*results))
+        self.observations = observations
+        return next_states, rewards, dones
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.send(('close', None))
+            connection.close()
+        for process in self._processes:
+            process.join()
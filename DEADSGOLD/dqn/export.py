@@ -0,0 +1,124 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from dqn.agent import QNetwork
+from dqn.env import APPROVE
+from dqn.validator import DQNValidator
+
+# Input and output names DQNValidator reads from the session, kept as in
+# the shipped dqn_node_model.onnx.
+INPUT_NAME = 'state'
+OUTPUT_NAME = 'q_values'
+OPSET = 17
+
+
+def load_q_network(weights_path: str, state_size: int, action_size: int = APPROVE + 1) -> QNetwork:
+    """
+    Loads a QNetwork from a state_dict saved by dqn/train.py --output.
+    """
+    q_network = QNetwork(state_size, action_size)
+    q_network.load_state_dict(torch.load(weights_path, map_location='cpu'))
+    return q_network.eval()
+
+
+def export_onnx(q_network: QNetwork, path: str, state_size: int) -> str:
+    """
+    Writes q_network as an ONNX model whose batch dimension is dynamic, so
+    DQNValidator can run a whole batch in one call.
+    """
+    q_network.eval()
+    torch.onnx.export(
+        q_network, (torch.zeros(1, state_size),), path,
+        input_names=[INPUT_NAME], output_names=[OUTPUT_NAME],
+        dynamic_axes={INPUT_NAME: {0: 'batch'}, OUTPUT_NAME: {0: 'batch'}},
+        opset_version=OPSET, dynamo=False
+    )
+    return path
+
+
+def quantize(path: str, output_path: str) -> str:
+    """
+    Writes a dynamically quantized copy of an ONNX model: weights stored as
+    int8, activations quantized per call. No calibration data is needed.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        preprocessed = os.path.join(tmpdir, 'preprocessed.onnx')
+        quant_pre_process(path, preprocessed)
+        quantize_dynamic(preprocessed, output_path, weight_type=QuantType.QInt8)
+    return output_path
+
+
+def _latency_ms(fn, items) -> list:
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+def compare(float_path: str, quantized_path: str, transactions, batch_size: int = 256) -> dict:
+    """
+    Validates `transactions` with both models and reports per-transaction
+    latency (one call each, as admission does), batched throughput, and the
+    share of verdicts on which the quantized model agrees with the float one.
+    """
+    report = {'transactions': len(transactions)}
+    verdicts = {}
+    for name, path in (('float', float_path), ('int8', quantized_path)):
+        validator = DQNValidator(path)
+        validator.validate_batch(transactions[:batch_size]) # Load the session and warm up
+        samples = _latency_ms(validator.validate_transaction, transactions)
+        report[f'{name}_per_tx_mean_ms'] = statistics.mean(samples)
+        report[f'{name}_per_tx_p50_ms'] = samples[len(samples) // 2]
+        report[f'{name}_per_tx_p95_ms'] = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+        start = time.perf_counter()
+        verdicts[name] = []
+        for i in range(0, len(transactions), batch_size):
+            verdicts[name].extend(validator.validate_batch(transactions[i:i + batch_size]))
+        report[f'{name}_batched_tx_per_sec'] = len(transactions) / (time.perf_counter() - start)
+        report[f'{name}_model_bytes'] = os.path.getsize(path)
+        report[f'{name}_approve_rate'] = float(np.mean(verdicts[name]))
+    report['agreement_rate'] = float(np.mean(np.array(verdicts['float']) == np.array(verdicts['int8'])))
+    return report
+
+
+def main(args) -> None:
+    from dqn.env import synthetic_transactions
+
+    state_size = DQNValidator().input_size
+    q_network = load_q_network(args.weights, state_size)
+    export_onnx(q_network, args.output, state_size)
+    print(f"Exported float model to {args.output}")
+    if not args.quantize:
+        return
+
+    quantized_path = os.path.splitext(args.output)[0] + '.int8.onnx'
+    quantize(args.output, quantized_path)
+    print(f"Exported int8 model to {quantized_path}")
+    transactions, _ = synthetic_transactions(args.held_out, seed=args.seed)
+    for name, value in compare(args.output, quantized_path, transactions).items():
+        print(f"{name}: {value:,.4f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a trained QNetwork to the ONNX model DQNValidator loads.")
+    parser.add_argument('--weights', required=True, help="QNetwork state_dict, as saved by dqn/train.py --output")
+    parser.add_argument('--output', required=True, help="ONNX file to write, e.g. DQNAgent/Q_Layered_Network/dqn_node_model.onnx")
+    parser.add_argument('--quantize', action='store_true', help="also write an int8 model and compare it with the float one")
+    parser.add_argument('--held-out', type=int, default=2000, help="synthetic transactions, not seen in training, to compare on")
+    parser.add_argument('--seed', type=int, default=12345)
+    main(parser.parse_args())
@@ -0,0 +1,56 @@
+import numpy as np
+
+class SumTree:
+    """
+    Binary tree over `capacity` non-negative priorities, stored in one array,
+    where each node holds the sum of its children. Node 1 is the root and the
+    children of node i are 2i and 2i + 1; leaves start at `offset`. Updates
+    and prefix-sum lookups take O(log n) and are vectorized over a batch.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.offset = 1
+        while self.offset < capacity:
+            self.offset *= 2
+        self.depth = self.offset.bit_length() - 1
+        self.tree = np.zeros(2 * self.offset, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    @property
+    def priorities(self) -> np.ndarray:
+        """
+        The leaf priorities (a view; do not write to it).
+        """
+        return self.tree[self.offset:self.offset + self.capacity]
+
+    def update(self, indices, priorities) -> None:
+        """
+        Sets the priorities of the leaves at `indices` and recomputes their
+        ancestors, one tree level per step. With repeated indices the last
+        priority wins.
+        """
+        nodes = np.asarray(indices, dtype=np.int64) + self.offset
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values) -> np.ndarray:
+        """
+        Returns, for each value in [0, total), the index of the leaf whose
+        prefix-sum interval contains it.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sums = self.tree[left]
+            go_right = values >= left_sums
+            values -= np.where(go_right, left_sums, 0.0)
+            nodes = left + go_right
+        # Rounding can step onto an empty leaf past the last priority.
+        return np.minimum(nodes - self.offset, self.capacity - 1)
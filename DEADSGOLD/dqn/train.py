@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import functools
+import time
+
+import numpy as np
+import torch
+
+from dqn.agent import DQNAgent
+from dqn.env import APPROVE, ProcessVectorEnv, TransactionEnv, VectorEnv, encode_states, synthetic_transactions
+from dqn.validator import DQNValidator
+
+
+def train(agent: DQNAgent, env, steps: int, train_every: int = 1, log_every: int = 0) -> dict:
+    """
+    Runs `steps` vector steps: every environment acts on one forward pass of
+    the agent, the transitions go into replay in one batch, and the agent
+    trains once every `train_every` vector steps. Returns throughput and
+    reward statistics.
+    """
+    observations = env.reset()
+    total_reward = 0.0
+    train_steps = 0
+    env_seconds = 0.0
+    start = time.perf_counter()
+    for step in range(1, steps + 1):
+        actions = agent.select_actions(observations)
+        env_start = time.perf_counter()
+        next_states, rewards, dones = env.step(actions)
+        env_seconds += time.perf_counter() - env_start
+        agent.buffer.add_batch(observations, actions, rewards, next_states, dones)
+        observations = env.observations
+        total_reward += float(rewards.sum())
+        agent.decay_epsilon()
+
+        if step % train_every == 0 and agent.train() is not None:
+            train_steps += 1
+        if log_every and step % log_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"step {step}: {step * env.num_envs / elapsed:,.0f} env steps/s, "
+                  f"mean reward {total_reward / (step * env.num_envs):.3f}, epsilon {agent.epsilon:.3f}")
+    elapsed = time.perf_counter() - start
+    env_steps = steps * env.num_envs
+    return {
+        'env_steps': env_steps,
+        'train_steps': train_steps,
+        'env_steps_per_sec': env_steps / elapsed,
+        'env_only_steps_per_sec': env_steps / env_seconds if env_seconds else float('inf'),
+        'mean_reward': total_reward / env_steps,
+    }
+
+
+def accuracy(agent: DQNAgent, transactions, labels) -> float:
+    """
+    Returns the share of transactions on which the greedy action matches
+    the label.
+    """
+    states = encode_states(transactions)
+    with torch.no_grad():
+        actions = agent.q_network(torch.from_numpy(states.astype(np.float32))).argmax(dim=1).numpy()
+    return float(np.mean(actions == np.asarray(labels)))
+
+
+def make_env(transactions, labels, num_envs: int, workers: int = 1, seed: int = 0):
+    """
+    Builds num_envs TransactionEnvs over the same data, stepped in this
+    process (workers=1) or across worker processes (0 for one per core).
+    The transactions are encoded once and every environment shares the
+    arrays; worker processes get the encoded states, not the transactions.
+    """
+    states, labels = encode_states(transactions), np.asarray(labels, dtype=np.int64)
+    env_fns = [functools.partial(TransactionEnv, states, labels, seed=seed + i) for i in range(num_envs)]
+    if workers == 1:
+        return VectorEnv(fn() for fn in env_fns)
+    return ProcessVectorEnv(env_fns, workers)
+
+
+def main(args) -> None:
+    transactions, labels = synthetic_transactions(args.transactions, seed=args.seed)
+    held_out = synthetic_transactions(args.transactions // 5, seed=args.seed + 1)
+    env = make_env(transactions, labels, args.envs, args.workers, args.seed)
+    torch.manual_seed(args.seed)
+    agent = DQNAgent(
+        DQNValidator().input_size, APPROVE + 1, gamma=args.gamma, buffer_size=args.buffer_size, batch_size=args.batch_size,
+        epsilon_decay=args.epsilon_decay, state_dtype=np.uint8, prioritized=args.prioritized, seed=args.seed
+    )
+    try:
+        stats = train(agent, env, args.steps, args.train_every, args.log_every)
+    finally:
+        env.close()
+    for name, value in stats.items():
+        print(f"{name}: {value:,.3f}")
+    print(f"held_out_accuracy: {accuracy(agent, *held_out):.3f}")
+    if args.output:
+        torch.save(agent.q_network.state_dict(), args.output)
+        print(f"Saved QNetwork weights to {args.output}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the validator's DQN on transaction environments.")
+    parser.add_argument('--envs', type=int, default=64, help="environments stepped together")
+    parser.add_argument('--workers', type=int, default=1, help="processes stepping the environments; 0 for one per core")
+    parser.add_argument('--steps', type=int, default=2000, help="vector steps")
+    parser.add_argument('--train-every', type=int, default=1)
+    parser.add_argument('--transactions', type=int, default=20000, help="synthetic training transactions")
+    parser.add_argument('--buffer-size', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    # Actions do not change the next transaction, so future rewards carry no signal.
+    parser.add_argument('--gamma', type=float, default=0.0)
+    parser.add_argument('--epsilon-decay', type=float, default=0.995)
+    parser.add_argument('--prioritized', action='store_true', help="use prioritized experience replay")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--log-every', type=int, default=500)
+    parser.add_argument('--output', help="file to save the trained QNetwork state_dict to")
+    main(parser.parse_args())
@@ -1,47 +1,252 @@
 
-import onnxruntime
-import numpy as np
 import json
 import os
+import threading
+import time
 
 from blockchain.transaction import Transaction
+from metrics.metrics import REGISTRY
+from .cache import VerdictCache
 
-class DQNValidator:
-    def __init__(self, model_path=None):
+INFERENCE_SECONDS = REGISTRY.histogram('deadsgold_dqn_inference_seconds', "Time per model inference call.")
+INFERENCE_BATCH_SIZE = REGISTRY.histogram(
+    'deadsgold_dqn_inference_batch_size', "Transactions per model inference call.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+)
+CACHE_LOOKUPS = REGISTRY.counter('deadsgold_dqn_cache_lookups_total', "Verdict cache lookups, by result.", ['result'])
+VERDICTS = REGISTRY.counter('deadsgold_dqn_verdicts_total', "Validation verdicts, by verdict.", ['verdict'])
+
+# Validator used when none is configured; see create_validator().
+DEFAULT_BACKEND = 'onnx'
+
+# ONNX sessions by (model path, model file signature), shared by every
+# DQNValidator in the process so each model is loaded once.
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _shared_session(model_path: str, version: tuple):
+    key = (model_path, version)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            import onnxruntime # Deferred: importing it costs more than the rest of the node
+            session = onnxruntime.InferenceSession(model_path)
+            # Drop sessions of earlier versions of the same file.
+            for stale in [k for k in _SESSIONS if k[0] == model_path]:
+                del _SESSIONS[stale]
+            _SESSIONS[key] = session
+        return session
+
+
+class Validator:
+    """
+    Base class of transaction validators: subclasses implement validate_batch.
+    """
+
+    def validate_batch(self, transactions) -> list:
+        """
+        Returns one verdict per transaction, in order.
+        """
+        raise NotImplementedError
+
+    def validate_transaction(self, transaction: Transaction) -> bool:
+        return self.validate_batch([transaction])[0]
+
+    @staticmethod
+    def _count(verdicts: list) -> list:
+        approved = sum(verdicts)
+        VERDICTS.labels("approve").inc(approved)
+        VERDICTS.labels("reject").inc(len(verdicts) - approved)
+        return verdicts
+
+
+class NoopValidator(Validator):
+    """
+    Approves every transaction. For tests, benchmarks and nodes that rely on
+    signature checks alone.
+    """
+
+    def validate_batch(self, transactions) -> list:
+        return self._count([True] * len(transactions))
+
+
+class RuleValidator(Validator):
+    """
+    Rule-based validation without a model: approves transactions with a
+    positive numeric amount, up to max_amount if given, between two distinct
+    addresses.
+    """
+
+    def __init__(self, max_amount: float = None):
+        self.max_amount = max_amount
+
+    def _valid(self, transaction: Transaction) -> bool:
+        amount = transaction.amount
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not amount > 0:
+            return False
+        if self.max_amount is not None and amount > self.max_amount:
+            return False
+        return transaction.sender != transaction.recipient
+
+    def validate_batch(self, transactions) -> list:
+        return self._count([self._valid(transaction) for transaction in transactions])
+
+
+class DQNValidator(Validator):
+    def __init__(self, model_path=None, cache_size=0, cache_ttl=None, model_check_interval=1.0):
+        """
+        cache_size > 0 enables an LRU cache of verdicts keyed on the encoded
+        transaction, with entries expiring after cache_ttl seconds (if given).
+        The model is reloaded (and the cache dropped) when the model file
+        changes; the file is checked at most every model_check_interval seconds.
+        The model is loaded on first use, not here.
+        """
         if model_path is None:
             # Construct path relative to the project root
             project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
             model_path = os.path.join(project_root, "DQNAgent", "Q_Layered_Network", "dqn_node_model.onnx")
 
-        print(f"Attempting to load ONNX model from: {model_path}") # Debug print
-        self.session = onnxruntime.InferenceSession(model_path)
-        self.input_name = self.session.get_inputs()[0].name
-        self.output_name = self.session.get_outputs()[0].name
+        self.model_path = model_path
         self.input_size = 128
+        self.cache = VerdictCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.model_check_interval = model_check_interval
+        self._next_model_check = 0.0
+        self._model_version = None
+        self._session = None
 
-    def validate_transaction(self, transaction: Transaction) -> bool:
+    def _model_signature(self):
+        stat = os.stat(self.model_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_session(self, signature=None) -> None:
+        self._model_version = signature or self._model_signature()
+        session = _shared_session(self.model_path, self._model_version)
+        self.input_name = session.get_inputs()[0].name
+        self.output_name = session.get_outputs()[0].name
+        batch_dim = session.get_inputs()[0].shape[0]
+        self.batch_size = batch_dim if isinstance(batch_dim, int) else None # None: dynamic batch dimension
+        self._session = session
+        if self.cache is not None:
+            self.cache.clear()
+
+    @property
+    def session(self):
         """
-        Validates a transaction using the DQN model.
+        The ONNX session, loaded on first use.
         """
-        transaction_dict = {
-            "sender": transaction.sender,
-            "recipient": transaction.recipient,
-            "amount": transaction.amount
-        }
-        transaction_str = json.dumps(transaction_dict)
+        if self._session is None:
+            self._load_session()
+        return self._session
 
-        # Convert string to numerical vector
-        processed_content = [ord(char) for char in transaction_str]
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None
 
-        # Pad the vector
-        padded_content = np.zeros(self.input_size, dtype=np.float32)
-        padded_content[:len(processed_content)] = processed_content
+    def _check_model_changed(self) -> None:
+        """
+        Reloads the model and invalidates cached verdicts if the model file changed.
+        """
+        now = time.monotonic()
+        if now < self._next_model_check or self._session is None:
+            return
+        self._next_model_check = now + self.model_check_interval
+        try:
+            signature = self._model_signature()
+        except FileNotFoundError:
+            return # Mid atomic replace; keep the loaded model until the new file is there
+        if signature != self._model_version:
+            self._load_session(signature)
 
-        # Run inference
-        input_tensor = padded_content.reshape(1, -1)
-        q_values = self.session.run([self.output_name], {self.input_name: input_tensor})[0]
+    def _encode_rows(self, transactions) -> bytes:
+        size = self.input_size
+        return b''.join(
+            json.dumps({
+                "sender": transaction.sender,
+                "recipient": transaction.recipient,
+                "amount": transaction.amount
+            }).encode()[:size].ljust(size, b'\0')
+            for transaction in transactions
+        )
+
+    def encode_transactions(self, transactions) -> "np.ndarray":
+        """
+        Encodes transactions into an (N, input_size) float32 array.
+        Each row holds the character codes of the transaction's JSON form,
+        zero-padded (or truncated) to the model's input size.
+        """
+        import numpy as np
+        rows = self._encode_rows(transactions)
+        return np.frombuffer(rows, dtype=np.uint8).reshape(-1, self.input_size).astype(np.float32)
+
+    def validate_batch(self, transactions) -> list:
+        """
+        Validates a batch of transactions with a single inference call.
+        Returns one verdict per transaction, in order.
+        """
+        if not transactions:
+            return []
+
+        rows = self._encode_rows(transactions)
+        self._check_model_changed()
+        if self.cache is None:
+            return self._count(self._infer(rows))
+
+        size = self.input_size
+        keys = [rows[i:i + size] for i in range(0, len(rows), size)]
+        verdicts = [self.cache.get(key) for key in keys]
+        missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        CACHE_LOOKUPS.labels("hit").inc(len(keys) - len(missing))
+        if missing:
+            CACHE_LOOKUPS.labels("miss").inc(len(missing))
+            for i, verdict in zip(missing, self._infer(b''.join(keys[i] for i in missing))):
+                verdicts[i] = verdict
+                self.cache.put(keys[i], verdict)
+        return self._count(verdicts)
+
+    def _infer(self, rows: bytes) -> list:
+        start = time.perf_counter()
+        verdicts = self._run_model(rows)
+        INFERENCE_SECONDS.observe(time.perf_counter() - start)
+        INFERENCE_BATCH_SIZE.observe(len(verdicts))
+        return verdicts
+
+    def _run_model(self, rows: bytes) -> list:
+        import numpy as np
+        session = self.session
+        input_tensor = np.frombuffer(rows, dtype=np.uint8).reshape(-1, self.input_size).astype(np.float32)
+        if self.batch_size is None:
+            q_values = session.run([self.output_name], {self.input_name: input_tensor})[0]
+        else:
+            # The model was exported with a fixed batch dimension.
+            q_values = np.concatenate([
+                session.run([self.output_name], {self.input_name: input_tensor[i:i + self.batch_size]})[0]
+                for i in range(0, len(input_tensor), self.batch_size)
+            ])
 
         # The action with the highest Q-value is chosen
-        action = np.argmax(q_values)
+        actions = np.argmax(q_values, axis=1)
+
+        return (actions == 1).tolist() # Assume action 1 is approve
+
+
+# Validator classes by the name used to configure them.
+BACKENDS = {
+    'onnx': DQNValidator,
+    'noop': NoopValidator,
+    'rules': RuleValidator,
+}
+
 
-        return action == 1 # Assume action 1 is approve
+def create_validator(backend: str = None, cache_size: int = 0, cache_ttl: float = None) -> Validator:
+    """
+    Returns a validator of the named backend, by default DEADSGOLD_VALIDATOR
+    or DEFAULT_BACKEND. The cache settings apply to the onnx backend; the
+    others are cheaper than a cache lookup.
+    """
+    backend = backend or os.environ.get('DEADSGOLD_VALIDATOR') or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown validator backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    if BACKENDS[backend] is DQNValidator:
+        return DQNValidator(cache_size=cache_size, cache_ttl=cache_ttl)
+    return BACKENDS[backend]()
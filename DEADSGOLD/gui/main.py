@@ -10,6 +10,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from wallet.wallet import Wallet
 from blockchain.chain import Blockchain
+from blockchain.store import BlockStore
 from blockchain.transaction import Transaction
 from solders.pubkey import Pubkey
 from solana_integration.client import SolanaClient
@@ -22,7 +23,8 @@ class Application(tk.Frame):
 
         # Initialize core components
         self.wallet = None # Will be loaded later
-        self.blockchain = Blockchain()
+        chain_dir = os.environ.get('DEADSGOLD_CHAIN_DIR') # Keep the chain on disk across restarts
+        self.blockchain = Blockchain(mining_workers=0, store=BlockStore(chain_dir) if chain_dir else None)
         self.node_identifier = str(uuid4()).replace('-', '')
         self.solana_client = SolanaClient()
         self.solana_keypair = None
@@ -239,6 +241,10 @@ class Application(tk.Frame):
         last_block = self.blockchain.last_block
         last_proof = last_block.nonce
         proof = self.blockchain.proof_of_work(last_proof)
+        if proof is None: # Interrupted, e.g. by a new tip
+            self.mine_button.config(state=tk.NORMAL, text="Start Mining")
+            messagebox.showinfo("Mining", "Mining was interrupted before a block was found.")
+            return
 
         # Miner gets 1 Deadsgold reward for mining a block
         self.blockchain.new_transaction(
@@ -0,0 +1,226 @@
+import bisect
+import threading
+
+# Latency buckets in seconds, from 50us (a cached signature check) to 10s.
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    A named metric, optionally split by labels. labels() returns the child
+    for one combination of label values; an unlabelled metric is its own child.
+    """
+
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self):
+        """
+        Yields (suffix, label values, extra labels, value) for the exposition.
+        """
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self._samples():
+            labels = list(zip(self.labelnames, values)) + list(extra)
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1) -> None:
+        self._default.inc(amount)
+
+    @property
+    def value(self):
+        return self._default.value
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield '', values, (), child.value
+
+
+class Gauge(_Metric):
+    """
+    A value that can go up and down. With a callback, the value is computed
+    only when the metrics are rendered, so it costs nothing between scrapes.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, callback=None):
+        super().__init__(name, documentation)
+        self.callback = callback
+        self._value = 0
+
+    def set(self, value) -> None:
+        self._value = value
+
+    @property
+    def value(self):
+        return self.callback() if self.callback is not None else self._value
+
+    def _samples(self):
+        yield '', (), (), self.value
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot counts values above every bucket
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """
+    Counts observations (e.g. latencies) in cumulative buckets.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value) -> None:
+        self._default.observe(value)
+
+    @property
+    def count(self) -> int:
+        return sum(self._default.counts)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield '_bucket', values, (('le', _format_value(float(bound))),), cumulative
+            yield '_sum', values, (), total
+            yield '_count', values, (), cumulative
+
+
+class Registry:
+    """
+    The set of metrics exposed together, e.g. by the /metrics endpoint.
+    Creating a metric under a name that is already registered returns the
+    existing one, so modules can declare their metrics at import time.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, callback=None) -> Gauge:
+        gauge = self._register(Gauge, name, documentation)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+# Content type of Registry.render() output.
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# The process-wide registry the node's components report to.
+REGISTRY = Registry()
@@ -0,0 +1,153 @@
+import collections
+import itertools
+import os
+import threading
+import time
+
+# Finished spans kept in memory; older ones are dropped first.
+DEFAULT_CAPACITY = 10000
+
+
+class Span:
+    """
+    One timed stage. `outcome` and `args` may be set while the span is open;
+    they are recorded when it closes.
+    """
+
+    __slots__ = ('tracer', 'name', 'args', 'outcome', 'start', 'duration', 'thread', 'parent', 'id')
+    recording = True
+
+    def __init__(self, tracer, name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.outcome = None
+        self.start = None
+        self.duration = None
+        self.thread = threading.get_ident()
+        self.parent = None
+        self.id = None
+
+    def __enter__(self):
+        self.id = next(self.tracer._ids)
+        stack = self.tracer._stack()
+        self.parent = stack[-1].id if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None and self.outcome is None:
+            self.outcome = f"error:{exc_type.__name__}"
+        self.tracer._stack().pop()
+        self.tracer._spans.append(self)
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "outcome": self.outcome,
+            "start": self.start,
+            "duration": self.duration,
+            "thread": self.thread,
+            "args": self.args,
+        }
+
+
+class _NullSpan:
+    """
+    Returned while tracing is disabled: a shared span that records nothing.
+    """
+
+    __slots__ = ()
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+    @property
+    def args(self) -> dict:
+        return {}
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Collects timed spans in an in-process ring buffer. Spans opened inside
+    another span on the same thread record it as their parent. While
+    disabled, span() returns NULL_SPAN and costs one attribute check.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, enabled: bool = False):
+        self.enabled = enabled
+        self._spans = collections.deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        # perf_counter() has an arbitrary epoch; exports are relative to this.
+        self._epoch = time.perf_counter()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def spans(self, name: str = None, outcome: str = None, min_duration: float = 0.0, limit: int = None) -> list:
+        """
+        Returns finished spans, oldest first, optionally filtered by name,
+        outcome and minimum duration in seconds; limit keeps the most recent.
+        """
+        spans = [
+            span for span in list(self._spans)
+            if (name is None or span.name == name)
+            and (outcome is None or span.outcome == outcome)
+            and span.duration >= min_duration
+        ]
+        return spans[-limit:] if limit else spans
+
+    def chrome_trace(self, spans=None) -> dict:
+        """
+        Returns spans as Chrome trace-event JSON, loadable in chrome://tracing
+        or Perfetto.
+        """
+        spans = self.spans() if spans is None else spans
+        pid = os.getpid()
+        events = []
+        for span in spans:
+            args = dict(span.args)
+            if span.outcome is not None:
+                args["outcome"] = span.outcome
+            events.append({
+                "name": span.name,
+                "cat": span.name.split('.')[0],
+                "ph": "X",
+                "ts": (span.start - self._epoch) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+# The process-wide tracer; set DEADSGOLD_TRACE=1 to record from startup.
+TRACER = Tracer(enabled=os.environ.get('DEADSGOLD_TRACE', '') not in ('', '0'))
@@ -0,0 +1,163 @@
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import time
+from uuid import uuid4
+
+from blockchain.pow import block_work
+from blockchain.transaction import Transaction
+from .miner import MiningStats
+
+# Finished jobs kept for status queries.
+MAX_FINISHED_JOBS = 1000
+
+
+@dataclass
+class MiningJob:
+    id: str
+    status: str = "queued" # queued, running, done, cancelled
+    submitted: float = field(default_factory=time)
+    started: float = None
+    finished: float = None
+    hashes: int = 0
+    hashrate: float = 0.0
+    expected_hashes: int = 0
+    restarts: int = 0
+    block: dict = None
+    cancel_requested: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "hashes": self.hashes,
+            "hashrate": self.hashrate,
+            "progress": min(self.hashes / self.expected_hashes, 1.0) if self.expected_hashes else 0.0,
+            "restarts": self.restarts,
+            "block": self.block
+        }
+
+
+class MiningService:
+    """
+    Runs mining jobs one at a time on a background thread.
+    Cancelling a job or a new tip (the service listens to the blockchain's
+    tip changes) interrupts the running proof of work through the
+    blockchain's mining_interrupt_event; after a new tip the job restarts on
+    top of it.
+    """
+
+    def __init__(self, blockchain, reward_address: str):
+        self.blockchain = blockchain
+        self.reward_address = reward_address
+        self.interrupt_event = threading.Event()
+        blockchain.mining_interrupt_event = self.interrupt_event
+        blockchain.tip_listeners.append(self.notify_new_tip)
+
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._current = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self) -> MiningJob:
+        """
+        Queues a job that mines the next block.
+        """
+        job = MiningJob(id=uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> MiningJob:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued or running job. Returns False if it already finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in ("done", "cancelled"):
+                return False
+            job.cancel_requested = True
+            if job is self._current:
+                self.interrupt_event.set()
+            return True
+
+    def notify_new_tip(self, block=None) -> None:
+        """
+        Interrupts the running job because the chain tip changed; it restarts
+        on top of the new tip.
+        """
+        with self._lock:
+            if self._current is not None:
+                self.interrupt_event.set()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("done", "cancelled")]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _finish(self, job: MiningJob, status: str) -> None:
+        with self._lock:
+            job.status = status
+            job.finished = time()
+            self._current = None
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                if job.cancel_requested:
+                    job.status = "cancelled"
+                    job.finished = time()
+                    continue
+                job.status = "running"
+                job.started = time()
+                self._current = job
+            self._mine(job)
+
+    def _progress(self, job: MiningJob, hashes_before: int, stats: MiningStats) -> None:
+        job.hashes = hashes_before + stats.hashes
+        job.hashrate = stats.hashrate
+
+    def _mine(self, job: MiningJob) -> None:
+        blockchain = self.blockchain
+        hashes_before = 0 # Hashes spent on earlier tips
+        while True:
+            self.interrupt_event.clear()
+            if job.cancel_requested:
+                self._finish(job, "cancelled")
+                return
+
+            last_block = blockchain.last_block
+            job.expected_hashes = block_work(blockchain.next_target())
+            proof = blockchain.proof_of_work(
+                last_block.nonce, progress=lambda stats: self._progress(job, hashes_before, stats)
+            )
+            self._progress(job, hashes_before, blockchain.last_mining_stats)
+            hashes_before = job.hashes
+
+            if proof is None and job.cancel_requested:
+                self._finish(job, "cancelled")
+                return
+            # Hold the chain lock so no other block lands between the tip
+            # check and appending ours.
+            with blockchain.lock:
+                if proof is not None and blockchain.last_block.hash == last_block.hash:
+                    # The sender is "0" to signify that this node has mined a new coin.
+                    blockchain.new_transaction(Transaction(sender="0", recipient=self.reward_address, amount=1))
+                    block = blockchain.new_block(proof, last_block.hash)
+                    job.block = block.to_dict()
+                    self._finish(job, "done")
+                    return
+            job.restarts += 1 # A new tip arrived; mine on top of it
@@ -1,6 +1,10 @@
 
 import hashlib
 import json
+import multiprocessing
+import os
+import queue
+from dataclasses import dataclass
 from time import time
 # import pycuda.autoinit
 # import pycuda.driver as cuda
@@ -8,8 +12,100 @@ from time import time
 # import numpy as np
 
 from blockchain.block import Block
+from blockchain.pow import ProofKernel
+from metrics.metrics import REGISTRY
 
 
+# Number of consecutive nonces a worker tries before checking whether another
+# worker has already found a proof.
+NONCE_CHUNK_SIZE = 20000
+
+HASHES = REGISTRY.counter('deadsgold_mining_hashes_total', "Proof of work attempts.")
+MINING_SECONDS = REGISTRY.counter('deadsgold_mining_seconds_total', "Time spent searching for proofs of work.")
+SEARCHES = REGISTRY.counter('deadsgold_mining_searches_total', "Proof of work searches, by result.", ['result'])
+HASHRATE = REGISTRY.gauge('deadsgold_mining_hashrate', "Hashes per second of the most recent proof of work search.")
+
+
+@dataclass
+class MiningStats:
+    hashes: int = 0
+    elapsed: float = 0.0
+    workers: int = 1
+
+    @property
+    def hashrate(self) -> float:
+        """
+        Returns the aggregate hashes per second over all workers.
+        """
+        return self.hashes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _search_nonces(worker_id, workers, last_hash, target, found, results, hash_counter):
+    """
+    Worker loop for the parallel proof of work. Worker i scans nonce chunks
+    i, i + workers, i + 2 * workers, ... until any worker finds a proof.
+    """
+    kernel = ProofKernel(last_hash, target=target)
+    chunk = worker_id
+    while not found.is_set():
+        start = chunk * NONCE_CHUNK_SIZE
+        proof = kernel.search(start, NONCE_CHUNK_SIZE)
+        if proof is not None:
+            found.set()
+            results.put(proof)
+        with hash_counter.get_lock():
+            hash_counter.value += NONCE_CHUNK_SIZE if proof is None else proof - start + 1
+        chunk += workers
+
+
+def parallel_proof_of_work(last_hash, target, workers=None, interrupt_event=None, progress=None):
+    """
+    Searches for a proof for `last_hash` that meets a numeric target on a pool
+    of worker processes.
+    Every worker stops as soon as one of them finds a valid proof.
+    Returns a (proof, MiningStats) tuple; proof is None if `interrupt_event`
+    was set before a proof was found. `progress`, if given, is called
+    periodically with a MiningStats for the search so far.
+    """
+    workers = workers or os.cpu_count() or 1
+    ctx = multiprocessing.get_context()
+    found = ctx.Event()
+    results = ctx.Queue()
+    hash_counter = ctx.Value('Q', 0)
+
+    processes = [
+        ctx.Process(
+            target=_search_nonces,
+            args=(i, workers, last_hash, target, found, results, hash_counter),
+            daemon=True
+        )
+        for i in range(workers)
+    ]
+
+    start = time()
+    for process in processes:
+        process.start()
+
+    proof = None
+    try:
+        while proof is None:
+            try:
+                proof = results.get(timeout=0.05)
+            except queue.Empty:
+                if progress:
+                    progress(MiningStats(hashes=hash_counter.value, elapsed=time() - start, workers=workers))
+                if interrupt_event and interrupt_event.is_set():
+                    break
+                if not any(process.is_alive() for process in processes):
+                    break
+    finally:
+        found.set()
+        for process in processes:
+            process.join()
+
+    stats = MiningStats(hashes=hash_counter.value, elapsed=time() - start, workers=workers)
+    return proof, stats
+
 
 class Miner:
     def __init__(self, blockchain):
@@ -22,6 +118,23 @@ class Miner:
     def mine_cpu(self):
         return self.blockchain.proof_of_work(self.blockchain.last_block.nonce)
 
+    def record(self, stats: MiningStats, found: bool) -> None:
+        """
+        Adds a finished proof of work search to the mining metrics.
+        """
+        HASHES.inc(stats.hashes)
+        MINING_SECONDS.inc(stats.elapsed)
+        SEARCHES.labels("found" if found else "interrupted").inc()
+        HASHRATE.set(stats.hashrate)
+
+    @property
+    def hashrate(self) -> float:
+        """
+        Returns the aggregate hashrate of the most recent proof of work.
+        """
+        stats = self.blockchain.last_mining_stats
+        return stats.hashrate if stats else 0.0
+
     # def mine_gpu(self):
     #     last_block = self.blockchain.last_block
     #     
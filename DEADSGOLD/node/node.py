@@ -0,0 +1,453 @@
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import json
+import struct
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from blockchain.block import Block
+from blockchain.sync import BLOCKS_PER_REQUEST, HEADERS_PER_REQUEST, ChainSync
+from blockchain.transaction import Transaction
+
+# Frames are a 4-byte big-endian length followed by a JSON message.
+_FRAME = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 8 * 1024 * 1024
+
+# Messages queued per peer before senders have to wait (backpressure).
+OUTBOX_SIZE = 1024
+
+# Inventory ids remembered per node and per peer.
+INVENTORY_SIZE = 100000
+
+# Seconds to wait for the response to a sync request.
+REQUEST_TIMEOUT = 30.0
+
+# Seconds to wait for an object asked for with getdata before asking
+# another peer that announced it.
+GETDATA_TIMEOUT = 5.0
+
+
+class BoundedSet:
+    """
+    Set that forgets its oldest members beyond maxsize.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item) -> None:
+        self._items[item] = None
+        self._items.move_to_end(item)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def discard(self, item) -> None:
+        self._items.pop(item, None)
+
+
+class Peer:
+    """
+    A persistent connection to another node.
+    Outgoing messages go through a bounded queue drained by a writer task
+    that waits for the socket to drain. Replies and relays are queued without
+    waiting (post), so a read loop never blocks on another peer's outbox; a
+    peer whose outbox fills up is not keeping up and is dropped.
+    """
+
+    def __init__(self, node, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.node = node
+        self.reader = reader
+        self.writer = writer
+        self.node_id = None
+        self.listen_address = None
+        self.known = BoundedSet(INVENTORY_SIZE) # Inventory this peer has or was sent
+        self._outbox = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        self._tasks = []
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.ensure_future(self._read_loop()),
+            asyncio.ensure_future(self._write_loop())
+        ]
+
+    async def send(self, message: dict) -> None:
+        await self._outbox.put(message)
+
+    def post(self, message: dict) -> None:
+        """
+        Queues a message without waiting, dropping the peer if its outbox is full.
+        """
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            print(f"Dropping peer {self.node_id}: outbox full")
+            self.close()
+
+    async def get_headers(self, locator: list, count: int) -> list:
+        response = await self.node.request(self, {"type": "getheaders", "locator": locator, "count": count})
+        return [bytes.fromhex(header) for header in response["headers"]]
+
+    async def get_blocks(self, heights: list) -> list:
+        response = await self.node.request(self, {"type": "getblocks", "heights": heights})
+        return [bytes.fromhex(block) for block in response["blocks"]]
+
+    def announce(self, items: list) -> None:
+        """
+        Sends an inventory announcement for the items this peer does not have yet.
+        """
+        unknown = [item for item in items if tuple(item) not in self.known]
+        if not unknown:
+            return
+        for item in unknown:
+            self.known.add(tuple(item))
+        self.post({"type": "inv", "items": unknown})
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                message = await self._outbox.get()
+                payload = json.dumps(message).encode()
+                self.writer.write(_FRAME.pack(len(payload)) + payload)
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.close()
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                header = await self.reader.readexactly(_FRAME.size)
+                (length,) = _FRAME.unpack(header)
+                if length > MAX_MESSAGE_SIZE:
+                    print(f"Dropping peer {self.node_id}: message of {length} bytes")
+                    break
+                payload = await self.reader.readexactly(length)
+                try:
+                    await self.node.handle_message(self, json.loads(payload))
+                except (ValueError, KeyError, TypeError, struct.error) as exc:
+                    print(f"Dropping peer {self.node_id}: malformed message ({exc!r})")
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for task in self._tasks:
+            if task is not asyncio.current_task():
+                task.cancel()
+        self.writer.close()
+        self.node.peer_closed(self)
+
+
+class Node:
+    """
+    Asyncio TCP node that gossips transactions and blocks.
+    New objects are announced to peers by id (inventory); peers request only
+    the ones they have not seen, from one announcer at a time, and no object
+    is announced twice to the same peer. If that announcer answers notfound,
+    disconnects or times out, the object is requested from another one. Blockchain calls run on a single worker thread so that validation
+    does not block the event loop and the chain is never mutated concurrently.
+    """
+
+    def __init__(self, blockchain, host: str = '127.0.0.1', port: int = 0, on_block=None):
+        self.blockchain = blockchain
+        self.host = host
+        self.port = port
+        self.node_id = uuid4().hex
+        self.on_block = on_block # Called with each block accepted from a peer
+        self.peers = {} # node_id -> Peer, after the handshake
+        self._connections = set() # Every open Peer; asyncio only keeps weak references to their tasks
+        self.received = Counter() # Messages received by type
+        self._seen = BoundedSet(INVENTORY_SIZE)
+        self._requested = OrderedDict() # item -> (peer asked, time asked, node ids tried) while in flight
+        self._blocks = OrderedDict() # Recent blocks by hash, for getdata
+        self._chain_executor = ThreadPoolExecutor(max_workers=1)
+        self._server = None
+        self._responses = {} # request id -> (peer, Future)
+        self._sync_lock = asyncio.Lock()
+        self._sync_tasks = set()
+
+    @property
+    def address(self):
+        return (self.host, self.port)
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._accept, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._sync_tasks):
+            task.cancel()
+        for peer in list(self._connections):
+            peer.close()
+        self._chain_executor.shutdown(wait=False)
+
+    async def _run_on_chain(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._chain_executor, fn, *args)
+
+    async def _accept(self, reader, writer) -> None:
+        peer = Peer(self, reader, writer)
+        self._connections.add(peer)
+        peer.start()
+        await peer.send(self._hello())
+
+    def _hello(self) -> dict:
+        return {"type": "hello", "node_id": self.node_id, "host": self.host, "port": self.port}
+
+    async def connect(self, host: str, port: int) -> Peer:
+        """
+        Connects to a node, reusing the existing connection if there is one.
+        """
+        for peer in self.peers.values():
+            if peer.listen_address == (host, port):
+                return peer
+        reader, writer = await asyncio.open_connection(host, port)
+        peer = Peer(self, reader, writer)
+        peer.listen_address = (host, port)
+        self._connections.add(peer)
+        peer.start()
+        await peer.send(self._hello())
+        return peer
+
+    def peer_closed(self, peer: Peer) -> None:
+        self._connections.discard(peer)
+        self._retry([item for item, (asked, _, _) in self._requested.items() if asked is peer], peer)
+        for requested_from, future in self._responses.values():
+            if requested_from is peer and not future.done():
+                future.set_exception(ConnectionError("peer disconnected"))
+        if self.peers.get(peer.node_id) is peer:
+            del self.peers[peer.node_id]
+
+    def _broadcast(self, items: list, exclude: Peer = None) -> None:
+        for peer in list(self.peers.values()):
+            if peer is not exclude:
+                peer.announce(items)
+
+    async def submit_transaction(self, transaction: Transaction) -> bool:
+        """
+        Admits a local transaction and gossips it to the network.
+        """
+        txid = transaction.txid
+        self._seen.add(("tx", txid))
+        if not await self._run_on_chain(self.blockchain.new_transaction, transaction):
+            return False
+        self._broadcast([["tx", txid]])
+        return True
+
+    async def broadcast_block(self, block: Block) -> None:
+        """
+        Gossips a block that was added to the local chain, e.g. after mining it.
+        """
+        self._remember_block(block)
+        self._seen.add(("block", block.hash))
+        self._broadcast([["block", block.hash]])
+
+    def _request(self, peer: Peer, items: list, tried: frozenset = frozenset()) -> None:
+        """
+        Asks a peer for announced items and remembers whom and when, so the
+        request can be retried elsewhere if the peer does not deliver.
+        """
+        loop = asyncio.get_running_loop()
+        for item in items:
+            self._requested[item] = (peer, loop.time(), tried | {peer.node_id})
+            self._requested.move_to_end(item)
+        while len(self._requested) > INVENTORY_SIZE:
+            self._requested.popitem(last=False)
+        peer.post({"type": "getdata", "items": [list(item) for item in items]})
+        loop.call_later(GETDATA_TIMEOUT, self._expire, peer, items)
+
+    def _expire(self, peer: Peer, items: list) -> None:
+        self._retry([item for item in items if self._requested.get(item, (None,))[0] is peer], peer)
+
+    def _retry(self, items: list, failed: Peer) -> None:
+        """
+        Requests items that `failed` did not deliver from another peer that
+        announced them; items no other peer announced are forgotten, so a
+        later announcement requests them again.
+        """
+        for item in items:
+            _, _, tried = self._requested.pop(item)
+            for peer in list(self.peers.values()):
+                if peer is not failed and peer.node_id not in tried and item in peer.known:
+                    self._request(peer, [item], tried)
+                    break
+
+    def _remember_block(self, block: Block) -> None:
+        self._blocks[block.hash] = block
+        while len(self._blocks) > 1000:
+            self._blocks.popitem(last=False)
+
+    async def request(self, peer: Peer, message: dict) -> dict:
+        """
+        Sends a request to a peer and waits for the response carrying its id.
+        """
+        request_id = uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._responses[request_id] = (peer, future)
+        try:
+            await peer.send({**message, "id": request_id})
+            return await asyncio.wait_for(future, REQUEST_TIMEOUT)
+        finally:
+            del self._responses[request_id]
+
+    def _respond(self, message: dict) -> None:
+        _, future = self._responses.get(message.get("id"), (None, None))
+        if future is not None and not future.done():
+            future.set_result(message)
+
+    async def sync(self, peers: list = None) -> bool:
+        """
+        Adopts the heaviest valid chain among this node's and its peers'
+        (headers first, then bodies). Returns True if the local chain changed.
+        """
+        async with self._sync_lock:
+            changed = await ChainSync(self.blockchain, self._run_on_chain).sync(
+                list(self.peers.values()) if peers is None else peers
+            )
+        if changed and self.on_block:
+            self.on_block(self.blockchain.last_block)
+        return changed
+
+    def _schedule_sync(self, peer: Peer) -> None:
+        task = asyncio.ensure_future(self.sync([peer]))
+        self._sync_tasks.add(task)
+        task.add_done_callback(self._sync_tasks.discard)
+
+    async def handle_message(self, peer: Peer, message: dict) -> None:
+        """
+        Dispatches one message to its handler. Malformed messages raise
+        ValueError, KeyError, TypeError or struct.error.
+        """
+        if not isinstance(message, dict):
+            raise TypeError(f"message is a {type(message).__name__}, not an object")
+        kind = message.get("type")
+        self.received[kind] += 1
+        handler = getattr(self, f"_on_{kind}", None)
+        if handler is None:
+            print(f"Ignoring unknown message type {kind!r} from {peer.node_id}")
+            return
+        await handler(peer, message)
+
+    async def _on_hello(self, peer: Peer, message: dict) -> None:
+        existing = self.peers.get(message["node_id"])
+        if message["node_id"] == self.node_id or (existing is not None and existing is not peer):
+            peer.close() # Connected to ourselves, or a second connection to the same node
+            return
+        peer.node_id = message["node_id"]
+        if peer.listen_address is None:
+            peer.listen_address = (message["host"], message["port"])
+        self.peers[peer.node_id] = peer
+        self._schedule_sync(peer) # Catch up if the peer has a heavier chain
+
+    async def _on_inv(self, peer: Peer, message: dict) -> None:
+        wanted = []
+        for item in message["items"]:
+            item = tuple(item)
+            peer.known.add(item)
+            if item not in self._seen and item not in self._requested:
+                wanted.append(item)
+        if wanted:
+            self._request(peer, wanted)
+
+    async def _on_getdata(self, peer: Peer, message: dict) -> None:
+        missing = []
+        for kind, object_id in message["items"]:
+            if kind == "tx":
+                transaction = self.blockchain.mempool.get(object_id)
+                if transaction is not None:
+                    peer.post({"type": "tx", "data": transaction.encode().hex()})
+                    continue
+            elif kind == "block":
+                block = self._blocks.get(object_id)
+                if block is not None:
+                    peer.post({"type": "block", "data": block.encode().hex()})
+                    continue
+            missing.append([kind, object_id])
+        if missing:
+            peer.post({"type": "notfound", "items": missing})
+
+    async def _on_notfound(self, peer: Peer, message: dict) -> None:
+        items = [tuple(item) for item in message["items"]]
+        self._retry([item for item in items if self._requested.get(item, (None,))[0] is peer], peer)
+
+    async def _on_tx(self, peer: Peer, message: dict) -> None:
+        transaction, _ = Transaction.decode(bytes.fromhex(message["data"]))
+        item = ("tx", transaction.txid)
+        peer.known.add(item)
+        self._requested.pop(item, None)
+        if item in self._seen:
+            return
+        self._seen.add(item)
+        if await self._run_on_chain(self.blockchain.new_transaction, transaction):
+            self._broadcast([list(item)], exclude=peer)
+
+    async def _on_block(self, peer: Peer, message: dict) -> None:
+        block = Block.decode(bytes.fromhex(message["data"]))
+        item = ("block", block.hash)
+        peer.known.add(item)
+        self._requested.pop(item, None)
+        if item in self._seen:
+            return
+        self._seen.add(item)
+        if await self._run_on_chain(self.blockchain.add_block, block):
+            self._remember_block(block)
+            if self.on_block:
+                self.on_block(block)
+            self._broadcast([list(item)], exclude=peer)
+        else:
+            last_block = self.blockchain.last_block
+            if block.index > last_block.index + 1 or (block.index > last_block.index and block.previous_hash != last_block.hash):
+                self._schedule_sync(peer) # The block is on a longer branch we do not have
+
+    async def _on_getheaders(self, peer: Peer, message: dict) -> None:
+        count = min(message["count"], HEADERS_PER_REQUEST)
+        headers = await self._run_on_chain(self.blockchain.headers_after, message["locator"], count)
+        peer.post({"type": "headers", "id": message["id"], "headers": [h.hex() for h in headers]})
+
+    async def _on_getblocks(self, peer: Peer, message: dict) -> None:
+        blocks = await self._run_on_chain(self.blockchain.encoded_blocks, message["heights"][:BLOCKS_PER_REQUEST])
+        peer.post({"type": "blocks", "id": message["id"], "blocks": [b.hex() for b in blocks]})
+
+    async def _on_headers(self, peer: Peer, message: dict) -> None:
+        self._respond(message)
+
+    async def _on_blocks(self, peer: Peer, message: dict) -> None:
+        self._respond(message)
+
+
+async def main(args) -> None:
+    from blockchain.chain import Blockchain
+
+    node = Node(Blockchain(), args.host, args.port)
+    await node.start()
+    print(f"Node {node.node_id} listening on {node.host}:{node.port}")
+    for address in args.peer:
+        host, port = address.rsplit(':', 1)
+        await node.connect(host, int(port))
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a DEADSGOLD gossip node.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6000)
+    parser.add_argument('--peer', action='append', default=[], help="host:port of a peer to connect to")
+    asyncio.run(main(parser.parse_args()))
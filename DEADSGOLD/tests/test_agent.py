@@ -0,0 +1,145 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+import torch
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dqn.agent import DQNAgent, PrioritizedReplayBuffer, ReplayBuffer
+from dqn.sumtree import SumTree
+
+class TestReplayBuffer(unittest.TestCase):
+
+    def test_ring_overwrites_oldest(self):
+        """Test that adds wrap around the preallocated arrays, single and batched."""
+        buffer = ReplayBuffer(4, 2)
+        for i in range(3):
+            buffer.add(np.full(2, i), i, float(i), np.full(2, i + 1), False)
+        self.assertEqual(len(buffer), 3)
+
+        indices = buffer.add_batch(np.array([[3, 3], [4, 4]]), [3, 4], [3.0, 4.0], np.array([[4, 4], [5, 5]]), [False, True])
+        self.assertEqual(indices.tolist(), [3, 0])
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.position, 1)
+        self.assertEqual(buffer.actions[:, 0].tolist(), [4, 1, 2, 3])
+        self.assertEqual(buffer.dones[:, 0].tolist(), [1.0, 0.0, 0.0, 0.0])
+
+    def test_sample_returns_batch_tensors(self):
+        """Test that sampling gathers matching rows from every field as tensors."""
+        buffer = ReplayBuffer(100, 3, state_dtype=np.uint8, seed=0)
+        states = np.arange(150).reshape(50, 3).astype(np.uint8)
+        buffer.add_batch(states, np.arange(50) % 2, np.arange(50), states + 1, np.zeros(50))
+
+        batch = buffer.sample(16)
+        self.assertEqual(batch.states.shape, (16, 3))
+        self.assertEqual(batch.states.dtype, torch.float32)
+        self.assertEqual(batch.actions.shape, (16, 1))
+        self.assertEqual(batch.actions.dtype, torch.int64)
+        self.assertEqual(batch.rewards.shape, (16, 1))
+        # Row i holds 3i..3i+2, its reward is i and its next state is one higher.
+        np.testing.assert_array_equal(batch.states[:, 0].numpy(), batch.rewards[:, 0].numpy() * 3)
+        np.testing.assert_array_equal(batch.next_states.numpy(), batch.states.numpy() + 1)
+        self.assertLess(batch.rewards.max().item(), 50)
+
+class TestSumTree(unittest.TestCase):
+
+    def test_find_matches_prefix_sums(self):
+        """Test that tree lookups agree with a search over cumulative sums."""
+        rng = np.random.default_rng(1)
+        tree = SumTree(37)
+        priorities = rng.random(37)
+        priorities[[3, 4, 20]] = 0.0
+        tree.update(np.arange(37), priorities)
+        self.assertAlmostEqual(tree.total, priorities.sum())
+
+        values = rng.random(1000) * tree.total
+        expected = np.searchsorted(np.cumsum(priorities), values, side='right')
+        np.testing.assert_array_equal(tree.find(values), expected)
+
+        tree.update([5, 5, 36], [10.0, 2.0, 0.5])
+        priorities[[5, 36]] = [2.0, 0.5]
+        np.testing.assert_allclose(tree.priorities, priorities)
+        self.assertAlmostEqual(tree.total, priorities.sum())
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = PrioritizedReplayBuffer(8, 1, seed=0, alpha=1.0, beta=1.0, epsilon=0.0)
+        self.buffer.add_batch(np.arange(8).reshape(8, 1), np.zeros(8), np.zeros(8), np.zeros((8, 1)), np.zeros(8))
+
+    def test_sampling_follows_priorities(self):
+        """Test that transitions are drawn in proportion to their TD errors."""
+        errors = np.array([1, 1, 1, 1, 1, 1, 1, 9], dtype=np.float64)
+        self.buffer.update_priorities(np.arange(8), errors)
+
+        counts = np.zeros(8)
+        for _ in range(200):
+            counts += np.bincount(self.buffer.sample(16).indices, minlength=8)
+        np.testing.assert_allclose(counts / counts.sum(), errors / errors.sum(), atol=0.02)
+
+    def test_importance_weights(self):
+        """Test that frequently drawn transitions get proportionally smaller weights."""
+        self.buffer.update_priorities(np.arange(8), [1, 1, 1, 1, 1, 1, 1, 9])
+        batch = self.buffer.sample(64)
+        weights = batch.weights[:, 0].numpy()
+        self.assertEqual(batch.weights.shape, (64, 1))
+        np.testing.assert_allclose(weights[batch.indices == 7], 1 / 9, rtol=1e-6)
+        np.testing.assert_allclose(weights[batch.indices != 7], 1.0)
+        # New transitions get the largest priority seen so far.
+        self.buffer.add([0], 0, 0.0, [0], False)
+        self.assertEqual(self.buffer.tree.priorities[0], 9.0)
+
+class TestDQNAgent(unittest.TestCase):
+
+    def test_train_learns_rewards(self):
+        """Test that training on a one-step task learns which action pays."""
+        torch.manual_seed(0)
+        agent = DQNAgent(4, 2, learning_rate=0.01, buffer_size=1000, batch_size=32, target_update_frequency=10)
+        self.assertIsNone(agent.train())
+
+        rng = np.random.default_rng(0)
+        states = rng.random((500, 4), dtype=np.float32)
+        actions = rng.integers(0, 2, 500)
+        agent.buffer.add_batch(states, actions, (actions == 1).astype(np.float32), states, np.ones(500))
+        losses = [agent.train() for _ in range(300)]
+
+        self.assertLess(np.mean(losses[-20:]), np.mean(losses[:20]))
+        with torch.no_grad():
+            q_values = agent.q_network(torch.from_numpy(states[:50]))
+        self.assertTrue((q_values.argmax(dim=1) == 1).all())
+
+    def test_prioritized_training(self):
+        """Test that prioritized training updates priorities and anneals beta."""
+        torch.manual_seed(0)
+        agent = DQNAgent(4, 2, learning_rate=0.01, buffer_size=1000, batch_size=32, prioritized=True, beta=0.4, beta_steps=100)
+        rng = np.random.default_rng(0)
+        states = rng.random((500, 4), dtype=np.float32)
+        actions = rng.integers(0, 2, 500)
+        agent.buffer.add_batch(states, actions, (actions == 1).astype(np.float32), states, np.ones(500))
+
+        losses = [agent.train() for _ in range(200)]
+        self.assertLess(np.mean(losses[-20:]), np.mean(losses[:20]))
+        self.assertEqual(agent.buffer.beta, 1.0)
+        # Priorities now reflect TD errors rather than the initial maximum.
+        self.assertGreater(len(np.unique(agent.buffer.tree.priorities[:500])), 100)
+
+    def test_seed_makes_training_reproducible(self):
+        """Test that seeding torch, NumPy and the agent reproduces the same losses, also with prioritized replay."""
+        rng = np.random.default_rng(0)
+        states = rng.random((500, 4), dtype=np.float32)
+        actions = rng.integers(0, 2, 500)
+
+        def losses(prioritized):
+            torch.manual_seed(0)
+            agent = DQNAgent(4, 2, buffer_size=1000, batch_size=32, prioritized=prioritized, seed=1)
+            agent.buffer.add_batch(states, actions, (actions == 1).astype(np.float32), states, np.ones(500))
+            return [agent.train() for _ in range(20)]
+
+        for prioritized in (False, True):
+            self.assertEqual(losses(prioritized), losses(prioritized))
+
+if __name__ == '__main__':
+    unittest.main()
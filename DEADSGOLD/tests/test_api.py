@@ -0,0 +1,172 @@
+import sys
+import os
+import unittest
+import json
+import time
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api import main
+from blockchain.chain import Blockchain
+from blockchain.transaction import Transaction
+from miner.jobs import MiningService
+
+class TestChainEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        main.blockchain = Blockchain(validator=main.blockchain.validator)
+        for amount in range(1, 8):
+            main.blockchain.new_transaction(Transaction("0", "miner", amount))
+            main.blockchain.new_block(12345)
+        self.client = main.app.test_client()
+
+    def test_full_chain_stream(self):
+        """Test that the unparameterized endpoint streams the whole chain as JSON."""
+        response = self.client.get('/chain')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+
+        data = json.loads(response.get_data())
+        self.assertEqual(data['length'], 8)
+        self.assertEqual([block['hash'] for block in data['chain']], [block.hash for block in main.blockchain.chain])
+
+    def test_stream_survives_reorg(self):
+        """Test that a reorganization while the chain streams ends the response with a valid prefix."""
+        old = [block.hash for block in main.blockchain.chain]
+        with mock.patch.object(main, 'STREAM_CHUNK', 2):
+            response = self.client.get('/chain', buffered=False)
+            chunks = iter(response.response)
+            sent = [next(chunks) for _ in range(4)] # The opening and blocks 0-2; blocks 2-3 were read
+
+            # Another branch replaces the blocks from height 3 mid-stream.
+            del main.blockchain.chain[3:]
+            main.blockchain.new_block(54321)
+            main.blockchain.new_block(54322)
+
+            data = json.loads(b''.join(sent) + b''.join(chunks))
+            response.close()
+        self.assertEqual([block['hash'] for block in data['chain']], old[:4])
+        self.assertEqual(data['length'], 4)
+
+    def test_requests_read_only_needed_blocks(self):
+        """Test that paged and revalidated requests read the tip and the requested blocks only."""
+        reads = []
+
+        class CountingChain(list):
+            def __getitem__(self, item):
+                reads.append(len(range(*item.indices(len(self)))) if isinstance(item, slice) else 1)
+                return super().__getitem__(item)
+
+            def __iter__(self):
+                raise AssertionError("the whole chain was read")
+
+        main.blockchain.chain = CountingChain(list.__iter__(main.blockchain.chain))
+        data = self.client.get('/chain?since=4&limit=2').get_json()
+        self.assertEqual([block['index'] for block in data['chain']], [5, 6])
+        self.assertEqual(sum(reads), 3) # The tip and two blocks
+
+        reads.clear()
+        etag = self.client.get('/chain').headers['ETag']
+        reads.clear()
+        self.assertEqual(self.client.get('/chain', headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(sum(reads), 1)
+
+    def test_range_query(self):
+        """Test paging through the chain with from/limit."""
+        data = self.client.get('/chain?from=2&limit=3').get_json()
+        self.assertEqual([block['index'] for block in data['chain']], [2, 3, 4])
+        self.assertEqual(data['next'], 5)
+
+        data = self.client.get(f"/chain?from={data['next']}&limit=10").get_json()
+        self.assertEqual([block['index'] for block in data['chain']], [5, 6, 7])
+        self.assertIsNone(data['next'])
+
+        self.assertEqual(self.client.get('/chain?from=-1').status_code, 400)
+        self.assertEqual(self.client.get('/chain?limit=abc').status_code, 400)
+
+    def test_since_cursor(self):
+        """Test incremental sync: polling with the returned cursor only yields new blocks."""
+        data = self.client.get('/chain?since=5').get_json()
+        self.assertEqual([block['index'] for block in data['chain']], [6, 7])
+        cursor = data['cursor']
+
+        self.assertEqual(self.client.get(f'/chain?since={cursor}').get_json()['chain'], [])
+        main.blockchain.new_block(12345)
+        data = self.client.get(f'/chain?since={cursor}').get_json()
+        self.assertEqual([block['index'] for block in data['chain']], [8])
+        self.assertEqual(data['cursor'], 8)
+
+    def test_etag(self):
+        """Test that an unchanged chain answers If-None-Match with 304."""
+        response = self.client.get('/chain?from=0&limit=2')
+        etag = response.headers['ETag']
+
+        cached = self.client.get('/chain?from=0&limit=2', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.get_data(), b'')
+
+        main.blockchain.new_block(12345)
+        self.assertEqual(self.client.get('/chain?from=0&limit=2', headers={'If-None-Match': etag}).status_code, 200)
+
+        etag = self.client.get('/chain').headers['ETag']
+        self.assertEqual(self.client.get('/chain', headers={'If-None-Match': etag}).status_code, 304)
+
+class TestMiningEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        main.blockchain = Blockchain(validator=main.blockchain.validator)
+        main.mining_service = MiningService(main.blockchain, "node")
+        self.client = main.app.test_client()
+
+    def wait_for(self, job_id, statuses, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.client.get(f'/mine/{job_id}').get_json()
+            if job['status'] in statuses:
+                return job
+            time.sleep(0.01)
+        self.fail(f"job {job_id} did not reach {statuses}")
+
+    def test_mine_job(self):
+        """Test that POST /mine returns at once and the job status reports the mined block."""
+        main.blockchain.difficulty = 2
+        response = self.client.post('/mine')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+
+        job = self.wait_for(job_id, ('done',))
+        self.assertEqual(job['block']['index'], 1)
+        self.assertGreater(job['hashes'], 0)
+        self.assertGreater(job['progress'], 0)
+        self.assertEqual(main.blockchain.get_balance("node"), 1)
+        self.assertEqual(self.client.get('/mine/unknown').status_code, 404)
+
+    def test_cancel_job(self):
+        """Test that DELETE /mine/<id> interrupts a running job."""
+        main.blockchain.difficulty = 64
+        job_id = self.client.post('/mine').get_json()['job_id']
+        self.wait_for(job_id, ('running',))
+
+        self.assertEqual(self.client.delete(f'/mine/{job_id}').status_code, 202)
+        job = self.wait_for(job_id, ('cancelled',))
+        self.assertIsNone(job['block'])
+        self.assertEqual(len(main.blockchain.chain), 1)
+        self.assertEqual(self.client.delete(f'/mine/{job_id}').status_code, 404)
+
+class TestTransactionEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        main.blockchain = Blockchain(validator=main.blockchain.validator)
+        self.client = main.app.test_client()
+
+    def test_invalid_signature_encoding(self):
+        """Test that a signature that is not hex is rejected with 400."""
+        for signature in ('not hex', 12345):
+            response = self.client.post('/transactions/new', json={'sender': 'a', 'recipient': 'b', 'amount': 5, 'signature': signature})
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(main.blockchain.mempool), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import sys
+import os
+import threading
+import time
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.chain import Blockchain
+from blockchain.transaction import Transaction
+from dqn.batcher import BATCH_SIZE, InferenceBatcher
+from dqn.validator import RuleValidator, Validator
+
+class RecordingValidator(Validator):
+    """Approves even amounts and records the size of every batch it runs."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def validate_batch(self, transactions):
+        self.batches.append(len(transactions))
+        time.sleep(self.delay)
+        if any(transaction.amount < 0 for transaction in transactions):
+            raise ValueError("negative amount")
+        return [transaction.amount % 2 == 0 for transaction in transactions]
+
+class TestInferenceBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = RecordingValidator(delay=0.005)
+        self.batcher = InferenceBatcher(self.validator, max_batch_size=8, max_delay_us=20000)
+
+    def tearDown(self):
+        self.batcher.close()
+
+    def test_concurrent_calls_share_batches(self):
+        """Test that concurrent callers are served by a few batched calls with their own verdicts."""
+        results = {}
+        dispatched = BATCH_SIZE.count
+
+        def call(amount):
+            results[amount] = self.batcher.validate_transaction(Transaction("a", "b", amount))
+
+        threads = [threading.Thread(target=call, args=(amount,)) for amount in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {amount: amount % 2 == 0 for amount in range(20)})
+        self.assertEqual(sum(self.validator.batches), 20)
+        self.assertLessEqual(max(self.validator.batches), 8)
+        self.assertLess(len(self.validator.batches), 20)
+        self.assertEqual(BATCH_SIZE.count - dispatched, len(self.validator.batches))
+
+    def test_batch_size_and_delay_bound(self):
+        """Test that a full batch goes out at once and a partial one after the delay."""
+        futures = [self.batcher.submit(Transaction("a", "b", amount)) for amount in range(10)]
+        self.assertEqual([future.result(timeout=1) for future in futures], [a % 2 == 0 for a in range(10)])
+        self.assertEqual(self.validator.batches, [8, 2])
+
+        start = time.perf_counter()
+        self.assertTrue(self.batcher.validate_transaction(Transaction("a", "b", 2)))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(self.validator.batches[-1], 1)
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failing batch raises in each of its callers, and later batches still run."""
+        futures = [self.batcher.submit(Transaction("a", "b", amount)) for amount in (2, -1)]
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result(timeout=1)
+        self.assertTrue(self.batcher.validate_transaction(Transaction("a", "b", 4)))
+
+    def test_close_drains_queue(self):
+        """Test that closing finishes queued requests and refuses new ones."""
+        futures = [self.batcher.submit(Transaction("a", "b", amount)) for amount in range(3)]
+        self.batcher.close()
+        self.assertTrue(all(future.done() for future in futures))
+        with self.assertRaises(RuntimeError):
+            self.batcher.submit(Transaction("a", "b", 1))
+
+    def test_short_verdicts_fail_every_caller(self):
+        """Test that a validator returning too few verdicts fails the whole batch instead of leaving futures pending."""
+        class ShortValidator(Validator):
+            def validate_batch(self, transactions):
+                return [True] * (len(transactions) - 1)
+
+        batcher = InferenceBatcher(ShortValidator(), max_batch_size=4, max_delay_us=20000)
+        try:
+            futures = [batcher.submit(Transaction("a", "b", amount)) for amount in range(4)]
+            for future in futures:
+                with self.assertRaises(RuntimeError):
+                    future.result(timeout=1)
+        finally:
+            batcher.close()
+
+    def test_submit_racing_close(self):
+        """Test that every submit racing close is either refused or resolved."""
+        futures = []
+
+        def submit():
+            for amount in range(200):
+                try:
+                    futures.append(self.batcher.submit(Transaction("a", "b", amount)))
+                except RuntimeError:
+                    return
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+        self.batcher.close()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(future.done() for future in futures))
+
+    def test_blockchain_admission(self):
+        """Test that a Blockchain admits transactions through the batcher."""
+        batcher = InferenceBatcher(RuleValidator(), max_delay_us=0)
+        try:
+            blockchain = Blockchain(validator=batcher)
+            self.assertEqual(blockchain.new_transactions([Transaction("0", "miner", 1)]), [True])
+            self.assertEqual(batcher.validate_batch([Transaction("a", "b", 5), Transaction("a", "a", 5)]), [True, False])
+        finally:
+            batcher.close()
+
+if __name__ == '__main__':
+    unittest.main()
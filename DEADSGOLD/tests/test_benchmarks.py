@@ -0,0 +1,28 @@
+import sys
+import os
+import io
+import unittest
+from contextlib import redirect_stdout
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import run_all
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def test_run_and_compare(self):
+        """Test that the runner records metadata and compares metrics between runs."""
+        with redirect_stdout(io.StringIO()):
+            report = run_all.run(['retarget'])
+        self.assertIn('retarget_interval_variance', report['results']['retarget'])
+        self.assertEqual(set(report) - {'results'}, {'commit', 'python', 'platform', 'timestamp'})
+
+        older = {'commit': 'old', 'results': {'retarget': {'retarget_mean_interval': 5.0}}}
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_all.compare(older, report)
+        self.assertIn('retarget.retarget_mean_interval: 5.000 ->', output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
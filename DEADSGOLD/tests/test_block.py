@@ -0,0 +1,58 @@
+import sys
+import os
+import unittest
+import pickle
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.block import Block
+from blockchain.transaction import Transaction
+
+class TestBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [Transaction("alice", "bob", 5, b"sig"), Transaction("0", "alice", 1)]
+        self.block = Block(1, self.transactions, "0" * 64, nonce=7, timestamp=1700000000.0)
+
+    def test_hash_is_deterministic(self):
+        """Test that equal blocks encode and hash identically."""
+        other = Block(1, list(self.transactions), "0" * 64, nonce=7, timestamp=1700000000.0)
+        self.assertEqual(self.block.encode(), other.encode())
+        self.assertEqual(self.block.hash, other.hash)
+        self.assertEqual(self.block.hash, self.block.compute_hash())
+
+    def test_hash_invalidated_on_change(self):
+        """Test that reassigning a hashed field invalidates the cached hash."""
+        original = self.block.hash
+        self.block.nonce = 8
+        self.assertNotEqual(self.block.hash, original)
+
+        self.block.nonce = 7
+        self.assertEqual(self.block.hash, original)
+
+        self.block.transactions = [Transaction("alice", "bob", 500, b"sig")]
+        self.assertNotEqual(self.block.hash, original)
+
+    def test_fields_are_distinguished(self):
+        """Test that the length-prefixed encoding does not alias adjacent fields."""
+        a = Block(1, [Transaction("ab", "c", 1)], "0", timestamp=1.0)
+        b = Block(1, [Transaction("a", "bc", 1)], "0", timestamp=1.0)
+        self.assertNotEqual(a.hash, b.hash)
+
+    def test_slots(self):
+        """Test that blocks and transactions do not carry a per-instance dict."""
+        self.assertFalse(hasattr(self.block, "__dict__"))
+        self.assertFalse(hasattr(self.transactions[0], "__dict__"))
+
+    def test_to_dict_and_pickle(self):
+        """Test the JSON representation and that blocks survive pickling."""
+        data = self.block.to_dict()
+        self.assertEqual(data["hash"], self.block.hash)
+        self.assertEqual(data["transactions"][0]["signature"], b"sig".hex())
+
+        copy = pickle.loads(pickle.dumps(self.block))
+        self.assertEqual(copy.hash, self.block.hash)
+
+if __name__ == '__main__':
+    unittest.main()
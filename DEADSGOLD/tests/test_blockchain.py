@@ -34,6 +34,12 @@ class TestBlockchain(unittest.TestCase):
         self.assertEqual(new_block.previous_hash, last_block.hash)
         self.assertIsNotNone(new_block.hash)
 
+    def test_new_block_without_proof(self):
+        """Test that an interrupted search (proof None) cannot become a block."""
+        with self.assertRaises(ValueError):
+            self.blockchain.new_block(None)
+        self.assertEqual(len(self.blockchain.chain), 1)
+
     def test_new_transaction(self):
         """Test the creation of a new transaction."""
         self.blockchain.new_transaction(Transaction("sender1", "recipient1", 10))
@@ -42,14 +48,15 @@ class TestBlockchain(unittest.TestCase):
 
     def test_proof_of_work(self):
         """Test the proof of work algorithm."""
+        self.blockchain.difficulty = 2
         last_proof = self.blockchain.last_block.nonce
         proof = self.blockchain.proof_of_work(last_proof)
         
-        self.assertTrue(self.blockchain.valid_proof(last_proof, proof))
+        self.assertTrue(self.blockchain.valid_proof_attempt(proof))
         
         # Test with an invalid proof
-        invalid_proof = 999999
-        self.assertFalse(self.blockchain.valid_proof(last_proof, invalid_proof))
+        invalid_proof = next(p for p in range(10 ** 6) if not self.blockchain.valid_proof_attempt(p))
+        self.assertFalse(self.blockchain.valid_proof_attempt(invalid_proof))
 
     def test_chain_validity(self):
         """Test the validity of the blockchain."""
@@ -64,36 +71,13 @@ class TestBlockchain(unittest.TestCase):
         self.blockchain.new_block(proof)
 
         # The chain should be valid
-        self.assertTrue(self.is_chain_valid(self.blockchain.chain))
+        self.assertTrue(self.blockchain.validate_chain())
 
         # Tamper with a block
         self.blockchain.chain[1].transactions = [Transaction("a", "b", 100)]
         
         # The chain should now be invalid
-        self.assertFalse(self.is_chain_valid(self.blockchain.chain))
-
-    def is_chain_valid(self, chain):
-        """
-        Helper function to determine if a given blockchain is valid.
-        """
-        last_block = chain[0]
-        current_index = 1
-
-        while current_index < len(chain):
-            block = chain[current_index]
-            
-            # Check that the hash of the block is correct
-            if block.previous_hash != last_block.compute_hash():
-                return False
-
-            # Check that the Proof of Work is correct
-            if not self.blockchain.valid_proof(last_block.nonce, block.nonce):
-                 return False
-            
-            last_block = block
-            current_index += 1
-
-        return True
+        self.assertFalse(self.blockchain.validate_chain())
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,139 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.block import Block
+from blockchain.chain import Blockchain
+import asyncio
+import time
+
+from blockchain.difficulty import MAX_ADJUSTMENT, MAX_FUTURE_DRIFT, MEDIAN_TIME_SPAN, Retarget
+from blockchain.sync import ChainSync
+from blockchain.pow import ProofKernel, target_for_difficulty
+from benchmarks import bench_retarget
+
+def history(intervals, target):
+    timestamps = [1000.0]
+    for interval in intervals:
+        timestamps.append(timestamps[-1] + interval)
+    return [(timestamp, target) for timestamp in timestamps]
+
+class TestRetarget(unittest.TestCase):
+
+    def setUp(self):
+        self.target = target_for_difficulty(3)
+        self.rule = Retarget(difficulty=3, block_time=10.0, window=10)
+
+    def test_fixed_without_block_time(self):
+        """Test that without a block time every block gets the initial target."""
+        rule = Retarget(difficulty=3)
+        self.assertEqual(rule.next_target(history([1.0] * 10, self.target // 7)), self.target)
+
+    def test_adjusts_towards_block_time(self):
+        """Test that fast blocks lower the target and slow blocks raise it proportionally."""
+        self.assertEqual(self.rule.next_target(history([10.0] * 10, self.target)), self.target)
+        self.assertEqual(self.rule.next_target(history([5.0] * 10, self.target)), self.target // 2)
+        self.assertEqual(self.rule.next_target(history([15.0] * 10, self.target)), self.target * 3 // 2)
+        # Only the last window counts.
+        self.assertEqual(self.rule.next_target(history([1.0] * 5 + [10.0] * 10, self.target)), self.target)
+
+    def test_adjustment_is_clamped(self):
+        """Test that one retarget changes the target by at most MAX_ADJUSTMENT."""
+        self.assertEqual(self.rule.next_target(history([0.0] * 10, self.target)), self.target // int(MAX_ADJUSTMENT))
+        self.assertEqual(self.rule.next_target(history([1000.0] * 10, self.target)), self.target * int(MAX_ADJUSTMENT))
+
+    def test_tiny_block_time(self):
+        """Test that sub-millisecond block times neither divide by zero nor are accepted when not positive."""
+        rule = Retarget(difficulty=3, block_time=0.0001, window=10)
+        self.assertEqual(rule.next_target(history([0.0001] * 10, self.target)), self.target)
+        with self.assertRaises(ValueError):
+            Retarget(difficulty=3, block_time=0)
+
+    def test_timestamp_rules(self):
+        """Test the median-time-past and future-drift bounds on block timestamps."""
+        past = history([10.0] * 20, self.target)
+        median = self.rule.median_time_past(past)
+        self.assertEqual(median, past[-1 - MEDIAN_TIME_SPAN // 2][0])
+        self.assertFalse(self.rule.valid_timestamp(past, median, now=median))
+        self.assertTrue(self.rule.valid_timestamp(past, median + 0.5, now=median))
+        # The drift allowed is one window's expected timespan.
+        now = past[-1][0]
+        self.assertTrue(self.rule.valid_timestamp(past, now + 100.0, now=now))
+        self.assertFalse(self.rule.valid_timestamp(past, now + 101.0, now=now))
+        self.assertEqual(Retarget(3).max_future_drift, MAX_FUTURE_DRIFT)
+
+    def test_simulation_holds_block_time(self):
+        """Test that in simulation the controller tracks hashrate changes and beats a fixed difficulty."""
+        results = bench_retarget.run()
+        self.assertLess(results['retarget_worst_phase_error'], 0.2 * bench_retarget.BLOCK_TIME)
+        self.assertLess(results['retarget_interval_variance'], results['fixed_interval_variance'])
+
+class TestBlockchainRetarget(unittest.TestCase):
+
+    def test_blocks_carry_and_validate_targets(self):
+        """Test that mined blocks carry the controller's target and a wrong target is rejected."""
+        blockchain = Blockchain(block_time=60.0)
+        blockchain.difficulty = 2
+        blockchain.retarget.window = 4
+        for _ in range(6):
+            blockchain.new_block(blockchain.proof_of_work(blockchain.last_block.nonce))
+
+        # Blocks came far faster than one a minute, so the target has tightened.
+        self.assertLess(blockchain.last_block.target, target_for_difficulty(2))
+        self.assertTrue(blockchain.validate_chain())
+
+        last_block = blockchain.last_block
+        forged = Block(last_block.index + 1, [], last_block.hash, timestamp=blockchain.next_timestamp(), target=target_for_difficulty(2))
+        forged.nonce = ProofKernel(last_block.hash, target=forged.target).search(0, 10 ** 6)
+        self.assertFalse(blockchain.add_block(forged))
+
+        honest = Block(last_block.index + 1, [], last_block.hash, timestamp=blockchain.next_timestamp(), target=blockchain.next_target())
+        honest.nonce = ProofKernel(last_block.hash, target=honest.target).search(0, 10 ** 7)
+        self.assertTrue(blockchain.add_block(honest))
+
+        blockchain.chain[3].target = target_for_difficulty(2)
+        self.assertFalse(blockchain.validate_chain())
+
+    def mined_on(self, blockchain, timestamp):
+        last_block = blockchain.last_block
+        block = Block(last_block.index + 1, [], last_block.hash, timestamp=timestamp, target=blockchain.next_target())
+        block.nonce = ProofKernel(last_block.hash, target=block.target).search(0, 10 ** 7)
+        return block
+
+    def test_timestamps_checked_on_every_path(self):
+        """Test that post-dated and back-dated blocks are rejected by add_block, validate_chain and header sync."""
+        blockchain = Blockchain(block_time=60.0)
+        blockchain.difficulty = 2
+        for _ in range(MEDIAN_TIME_SPAN):
+            blockchain.new_block(blockchain.proof_of_work(blockchain.last_block.nonce))
+
+        post_dated = self.mined_on(blockchain, time.time() + MAX_FUTURE_DRIFT + 60)
+        back_dated = self.mined_on(blockchain, blockchain.chain[1].timestamp)
+        self.assertFalse(blockchain.add_block(post_dated))
+        self.assertFalse(blockchain.add_block(back_dated))
+
+        # The same blocks appended without checks fail full validation.
+        for block in (post_dated, back_dated):
+            forged = Blockchain(block_time=60.0)
+            forged.difficulty = 2
+            forged.chain = blockchain.chain[:] + [block]
+            self.assertFalse(forged.validate_chain())
+
+            class Peer:
+                async def get_headers(self, locator, count):
+                    return forged.headers_after(locator, count)
+
+                async def get_blocks(self, heights):
+                    return forged.encoded_blocks(heights)
+
+            self.assertFalse(asyncio.run(ChainSync(blockchain).sync([Peer()])))
+
+        honest = self.mined_on(blockchain, blockchain.next_timestamp())
+        self.assertTrue(blockchain.add_block(honest))
+        self.assertTrue(blockchain.validate_chain())
+
+if __name__ == '__main__':
+    unittest.main()
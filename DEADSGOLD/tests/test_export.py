@@ -0,0 +1,67 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dqn.agent import QNetwork
+from dqn.env import synthetic_transactions
+from dqn.export import compare, export_onnx, load_q_network, quantize
+from dqn.validator import DQNValidator
+
+STATE_SIZE = 128
+
+class TestExport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        torch.manual_seed(0)
+        cls.q_network = QNetwork(STATE_SIZE, 2).eval()
+        cls.float_path = export_onnx(cls.q_network, os.path.join(cls.tmpdir, "model.onnx"), STATE_SIZE)
+        cls.transactions, _ = synthetic_transactions(300, seed=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_validator_runs_exported_model(self):
+        """Test that DQNValidator loads the export with a dynamic batch and matches PyTorch."""
+        validator = DQNValidator(self.float_path)
+        self.assertEqual(validator.session.get_inputs()[0].shape, ['batch', STATE_SIZE])
+        self.assertIsNone(validator.batch_size)
+
+        states = validator.encode_transactions(self.transactions)
+        with torch.no_grad():
+            expected = (self.q_network(torch.from_numpy(states)).argmax(dim=1) == 1).tolist()
+        self.assertEqual(validator.validate_batch(self.transactions), expected)
+
+    def test_load_weights(self):
+        """Test that weights saved by the training driver load into an equal network."""
+        path = os.path.join(self.tmpdir, "weights.pt")
+        torch.save(self.q_network.state_dict(), path)
+        loaded = load_q_network(path, STATE_SIZE)
+        states = torch.rand(8, STATE_SIZE) * 255
+        with torch.no_grad():
+            np.testing.assert_array_equal(loaded(states).numpy(), self.q_network(states).numpy())
+
+    def test_quantized_report(self):
+        """Test the int8 variant and the latency and agreement report against the float model."""
+        quantized_path = quantize(self.float_path, os.path.join(self.tmpdir, "model.int8.onnx"))
+        self.assertLess(os.path.getsize(quantized_path), os.path.getsize(self.float_path))
+
+        report = compare(self.float_path, quantized_path, self.transactions, batch_size=64)
+        self.assertEqual(report['transactions'], 300)
+        for name in ('float', 'int8'):
+            self.assertGreater(report[f'{name}_per_tx_p50_ms'], 0)
+            self.assertGreater(report[f'{name}_batched_tx_per_sec'], 0)
+        self.assertGreaterEqual(report['agreement_rate'], 0.9)
+
+if __name__ == '__main__':
+    unittest.main()
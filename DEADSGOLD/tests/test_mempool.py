@@ -0,0 +1,97 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.chain import Blockchain
+from blockchain.mempool import Mempool
+from blockchain.transaction import Transaction
+
+def tx(sender, amount, recipient="bob"):
+    return Transaction(sender, recipient, amount, b"s" * 64)
+
+class TestMempool(unittest.TestCase):
+
+    def test_dedupe_and_sender_index(self):
+        """Test duplicate detection by transaction id and the per-sender index."""
+        mempool = Mempool()
+        self.assertTrue(mempool.add(tx("alice", 1)))
+        self.assertFalse(mempool.add(tx("alice", 1)))
+        self.assertTrue(mempool.add(tx("alice", 2)))
+        self.assertTrue(mempool.add(tx("carol", 3)))
+
+        self.assertEqual(len(mempool), 3)
+        self.assertIn(tx("alice", 2).txid, mempool)
+        self.assertEqual([t.amount for t in mempool.by_sender("alice")], [1, 2])
+
+        mempool.remove([tx("alice", 1)])
+        self.assertEqual([t.amount for t in mempool.by_sender("alice")], [2])
+        self.assertEqual(mempool.by_sender("nobody"), [])
+
+    def test_count_cap_evicts_oldest(self):
+        """Test that exceeding the count cap evicts the oldest transactions."""
+        mempool = Mempool(max_count=3)
+        for amount in range(5):
+            mempool.add(tx(f"sender{amount}", amount))
+
+        self.assertEqual([t.amount for t in mempool], [2, 3, 4])
+        self.assertEqual(mempool.evicted, 2)
+        self.assertEqual(mempool.by_sender("sender0"), [])
+
+    def test_byte_cap_and_sender_limit(self):
+        """Test the memory cap and the per-sender limit."""
+        size = len(tx("a", 1).encode())
+        mempool = Mempool(max_bytes=size * 2, max_per_sender=2)
+        mempool.add(tx("a", 1))
+        mempool.add(tx("a", 2))
+        self.assertFalse(mempool.add(tx("a", 3)))
+        self.assertTrue(mempool.add(tx("b", 4)))
+
+        self.assertLessEqual(mempool.bytes, size * 2)
+        self.assertEqual([t.amount for t in mempool], [2, 4])
+
+    def test_select_block_template(self):
+        """Test that templates put rewards first and respect count and size limits."""
+        mempool = Mempool()
+        for amount in range(5):
+            mempool.add(tx("alice", amount))
+        mempool.add(Transaction("0", "miner", 1))
+        size = len(tx("alice", 0).encode())
+
+        template = mempool.select(max_count=3, max_bytes=10 ** 6)
+        self.assertEqual([t.sender for t in template], ["0", "alice", "alice"])
+        self.assertEqual(len(mempool.select(max_count=100, max_bytes=size * 2)), 2)
+
+    def test_identical_rewards_not_deduplicated(self):
+        """Test that two identical rewards both stay pending and leave one at a time."""
+        mempool = Mempool()
+        self.assertTrue(mempool.add(Transaction("0", "miner", 1)))
+        self.assertTrue(mempool.add(Transaction("0", "miner", 1)))
+        self.assertEqual(len(mempool.by_sender("0")), 2)
+
+        mempool.remove([Transaction("0", "miner", 1)])
+        self.assertEqual(len(mempool), 1)
+        mempool.remove([Transaction("0", "miner", 1)])
+        self.assertEqual(len(mempool), 0)
+
+        blockchain = Blockchain()
+        blockchain.new_transaction(Transaction("0", "miner", 1))
+        blockchain.new_transaction(Transaction("0", "miner", 1))
+        blockchain.new_block(12345)
+        self.assertEqual(blockchain.get_balance("miner"), 2)
+
+    def test_blockchain_uses_mempool(self):
+        """Test that new_block mines a bounded template and leaves the rest pending."""
+        blockchain = Blockchain()
+        blockchain.max_block_transactions = 2
+        for amount in (1, 2, 3):
+            self.assertTrue(blockchain.new_transaction(Transaction("0", "miner", amount)))
+
+        block = blockchain.new_block(12345)
+        self.assertEqual([t.amount for t in block.transactions], [1, 2])
+        self.assertEqual([t.amount for t in blockchain.pending_transactions], [3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.block import Block
+from blockchain.merkle import EMPTY_ROOT, leaf_hash, merkle_proof, merkle_root, verify_proof
+from blockchain.transaction import Transaction
+
+class TestMerkle(unittest.TestCase):
+
+    def test_proofs_for_every_leaf(self):
+        """Test that every leaf of trees of various sizes has a valid proof."""
+        for size in range(1, 18):
+            leaves = [leaf_hash(bytes([i])) for i in range(size)]
+            root = merkle_root(leaves)
+            for index in range(size):
+                proof = merkle_proof(leaves, index)
+                self.assertTrue(verify_proof(leaves[index], proof, root))
+                self.assertFalse(verify_proof(leaf_hash(b"other"), proof, root))
+
+    def test_root_edge_cases(self):
+        """Test the empty tree and that leaf order matters."""
+        a, b = leaf_hash(b"a"), leaf_hash(b"b")
+        self.assertEqual(merkle_root([]), EMPTY_ROOT)
+        self.assertEqual(merkle_root([a]), a)
+        self.assertNotEqual(merkle_root([a, b]), merkle_root([b, a]))
+        with self.assertRaises(IndexError):
+            merkle_proof([a], 1)
+
+class TestBlockMerkleRoot(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [Transaction(f"sender{i}", "bob", i, b"sig") for i in range(7)]
+        self.block = Block(1, self.transactions, "0" * 64, nonce=3, timestamp=1.0)
+
+    def test_header_is_constant_size(self):
+        """Test that the hashed header does not grow with the number of transactions."""
+        large = Block(1, self.transactions * 50, "0" * 64, nonce=3, timestamp=1.0)
+        self.assertEqual(len(self.block.encode_header()), len(large.encode_header()))
+        self.assertNotEqual(self.block.hash, large.hash)
+
+    def test_inclusion_proof(self):
+        """Test proving a single payment against the block's Merkle root."""
+        root = self.block.merkle_root
+        proof = self.block.inclusion_proof(4)
+
+        self.assertTrue(Block.verify_inclusion(self.transactions[4], proof, root))
+        self.assertFalse(Block.verify_inclusion(self.transactions[3], proof, root))
+        self.assertFalse(Block.verify_inclusion(Transaction("sender4", "bob", 400, b"sig"), proof, root))
+
+    def test_root_cached_and_invalidated(self):
+        """Test that reassigning the transactions changes the root and the hash."""
+        root, block_hash = self.block.merkle_root, self.block.hash
+        self.block.nonce = 4
+        self.assertEqual(self.block.merkle_root, root)
+
+        self.block.transactions = self.transactions[:3]
+        self.assertNotEqual(self.block.merkle_root, root)
+        self.assertNotEqual(self.block.hash, block_hash)
+
+        decoded = Block.decode(self.block.encode())
+        self.assertEqual((decoded.merkle_root, decoded.hash), (self.block.merkle_root, self.block.hash))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api import main
+from blockchain.chain import Blockchain
+from blockchain.transaction import Transaction
+from dqn.validator import NoopValidator
+from metrics.metrics import CONTENT_TYPE, Registry
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_labels(self):
+        """Test that labelled counters render one sample per label combination."""
+        counter = self.registry.counter('requests_total', "Requests served.", ('code',))
+        counter.labels(200).inc()
+        counter.labels(200).inc()
+        counter.labels(404).inc()
+        self.assertIs(self.registry.counter('requests_total', "Requests served.", ('code',)), counter)
+
+        text = self.registry.render()
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('requests_total{code="200"} 2', text)
+        self.assertIn('requests_total{code="404"} 1', text)
+        with self.assertRaises(ValueError):
+            self.registry.gauge('requests_total', "Not a gauge.")
+
+    def test_histogram_buckets(self):
+        """Test that histogram buckets are cumulative and end with +Inf."""
+        histogram = self.registry.histogram('latency_seconds', "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 3', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_sum 6.05', text)
+        self.assertIn('latency_seconds_count 4', text)
+        self.assertEqual(histogram.count, 4)
+
+    def test_gauge_callback_runs_at_scrape(self):
+        """Test that a callback gauge is evaluated only when rendered."""
+        calls = []
+        self.registry.gauge('queue_depth', "Queued items.", lambda: calls.append(1) or len(calls))
+        self.assertEqual(calls, [])
+        self.assertIn('queue_depth 1', self.registry.render())
+        self.assertIn('queue_depth 2', self.registry.render())
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        main.blockchain = Blockchain(validator=NoopValidator())
+        self.client = main.app.test_client()
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics exposes chain counters and live node state."""
+        main.blockchain.new_transaction(Transaction("0", "miner", 1))
+        main.blockchain.new_block(12345)
+        main.blockchain.new_transaction(Transaction("0", "miner", 2))
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, CONTENT_TYPE)
+        text = response.get_data(as_text=True)
+        self.assertIn('deadsgold_transactions_total{outcome="accepted"}', text)
+        self.assertIn('deadsgold_blocks_total{source="local"}', text)
+        self.assertIn('deadsgold_transaction_admission_seconds_bucket', text)
+        self.assertIn('deadsgold_chain_height 1\n', text)
+        self.assertIn('deadsgold_mempool_transactions 1\n', text)
+
+if __name__ == '__main__':
+    unittest.main()
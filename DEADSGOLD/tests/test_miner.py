@@ -0,0 +1,72 @@
+import sys
+import os
+import unittest
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.chain import Blockchain
+from miner.jobs import MiningService
+from miner.miner import parallel_proof_of_work
+
+class TestParallelMining(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a new blockchain for each test."""
+        self.blockchain = Blockchain()
+        self.blockchain.difficulty = 3
+
+    def test_parallel_proof_of_work(self):
+        """Test that the parallel search returns a valid proof and reports hashrate."""
+        proof = self.blockchain.proof_of_work(self.blockchain.last_block.nonce, workers=2)
+
+        self.assertIsNotNone(proof)
+        self.assertTrue(self.blockchain.valid_proof_attempt(proof))
+        self.assertEqual(self.blockchain.last_mining_stats.workers, 2)
+        self.assertGreater(self.blockchain.last_mining_stats.hashes, 0)
+        self.assertGreater(self.blockchain.miner.hashrate, 0)
+
+    def test_sequential_proof_of_work_stats(self):
+        """Test that the single worker search also records mining stats."""
+        proof = self.blockchain.proof_of_work(self.blockchain.last_block.nonce, workers=1)
+
+        self.assertTrue(self.blockchain.valid_proof_attempt(proof))
+        self.assertEqual(self.blockchain.last_mining_stats.hashes, proof + 1)
+
+    def test_parallel_proof_of_work_interrupted(self):
+        """Test that the mining interrupt event cancels every worker."""
+        interrupt = threading.Event()
+        interrupt.set()
+
+        # An unreachable target: only the interrupt can end the search.
+        proof, stats = parallel_proof_of_work(self.blockchain.last_block.hash, 0, 2, interrupt)
+
+        self.assertIsNone(proof)
+        self.assertEqual(stats.workers, 2)
+
+class TestMiningService(unittest.TestCase):
+
+    def test_new_tip_restarts_job(self):
+        """Test that a new tip interrupts the running job, which then mines on top of it."""
+        blockchain = Blockchain()
+        blockchain.difficulty = 64
+        service = MiningService(blockchain, "node")
+        job = service.submit()
+        while job.status != "running":
+            time.sleep(0.01)
+
+        # Another node's block arrives; the blockchain tells the service,
+        # and mining must restart on top of it.
+        blockchain.difficulty = 2
+        blockchain.new_block(12345)
+        while job.status != "done":
+            time.sleep(0.01)
+
+        self.assertGreaterEqual(job.restarts, 1)
+        self.assertEqual(job.block["index"], 2)
+        self.assertEqual(job.block["previous_hash"], blockchain.chain[1].hash)
+
+if __name__ == '__main__':
+    unittest.main()
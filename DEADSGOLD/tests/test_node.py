@@ -0,0 +1,203 @@
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.block import Block
+from blockchain.chain import Blockchain
+from blockchain.pow import ProofKernel, target_for_difficulty
+from blockchain.transaction import Transaction
+from dqn.validator import NoopValidator
+from node import node as node_module
+from node.node import OUTBOX_SIZE, Node
+from wallet.wallet import Wallet
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise AssertionError("timed out waiting for propagation")
+        await asyncio.sleep(0.001)
+
+class TestGossip(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.nodes = []
+        for _ in range(4):
+            blockchain = Blockchain(validator=NoopValidator())
+            blockchain.difficulty = 2
+            node = Node(blockchain)
+            await node.start()
+            self.nodes.append(node)
+        self.wallet = Wallet()
+
+    async def asyncTearDown(self):
+        for node in self.nodes:
+            await node.stop()
+
+    async def connect(self, edges):
+        for a, b in edges:
+            await self.nodes[a].connect(*self.nodes[b].address)
+        await wait_for(lambda: all(
+            self.nodes[b].node_id in self.nodes[a].peers and self.nodes[a].node_id in self.nodes[b].peers
+            for a, b in edges
+        ))
+
+    def signed_transaction(self, amount):
+        transaction = Transaction(self.wallet.address, "bob", amount)
+        transaction.signature = self.wallet.sign(transaction.to_bytes())
+        return transaction
+
+    async def test_transaction_propagation_latency(self):
+        """Test that a transaction reaches the far end of a line of nodes."""
+        await self.connect([(0, 1), (1, 2), (2, 3)])
+        transaction = self.signed_transaction(5)
+
+        start = time.perf_counter()
+        self.assertTrue(await self.nodes[0].submit_transaction(transaction))
+        await wait_for(lambda: transaction.txid in self.nodes[3].blockchain.mempool)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+        for node in self.nodes:
+            self.assertIn(transaction.txid, node.blockchain.mempool)
+
+    async def test_block_propagation(self):
+        """Test that a mined block is accepted by every node and clears their mempools."""
+        await self.connect([(0, 1), (1, 2), (2, 3)])
+        transaction = self.signed_transaction(7)
+        await self.nodes[0].submit_transaction(transaction)
+        await wait_for(lambda: transaction.txid in self.nodes[3].blockchain.mempool)
+
+        miner = self.nodes[0].blockchain
+        last_block = miner.last_block
+        block = miner.new_block(ProofKernel(last_block.hash, miner.difficulty).search(0, 10 ** 6), last_block.hash)
+        accepted = []
+        self.nodes[3].on_block = accepted.append
+
+        start = time.perf_counter()
+        await self.nodes[0].broadcast_block(block)
+        await wait_for(lambda: accepted)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+        for node in self.nodes:
+            self.assertEqual(node.blockchain.last_block.hash, block.hash)
+            self.assertNotIn(transaction.txid, node.blockchain.mempool)
+        self.assertEqual([b.hash for b in accepted], [block.hash])
+
+    async def test_invalid_block_not_relayed(self):
+        """Test that a block with a bad proof is rejected and not gossiped further."""
+        await self.connect([(0, 1), (1, 2)])
+        last_block = self.nodes[0].blockchain.last_block
+        block = Block(1, [], last_block.hash, nonce=0, target=target_for_difficulty(2))
+        while ProofKernel(last_block.hash, 2).check(block.nonce):
+            block.nonce += 1
+
+        await self.nodes[0].broadcast_block(block)
+        await wait_for(lambda: self.nodes[1].received["block"] == 1)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(len(self.nodes[1].blockchain.chain), 1)
+        self.assertEqual(self.nodes[2].received["block"], 0)
+
+    async def test_malformed_message_drops_peer(self):
+        """Test that a malformed message disconnects its sender without stopping the node."""
+        await self.connect([(0, 1), (1, 2)])
+        peer = self.nodes[0].peers[self.nodes[1].node_id]
+        peer.post({"type": "tx", "data": "not hex"})
+        await wait_for(lambda: self.nodes[0].node_id not in self.nodes[1].peers)
+
+        transaction = self.signed_transaction(3)
+        self.assertTrue(await self.nodes[1].submit_transaction(transaction))
+        await wait_for(lambda: transaction.txid in self.nodes[2].blockchain.mempool)
+
+    async def test_reply_to_full_outbox_does_not_block(self):
+        """Test that a handler replying to a peer with a full outbox returns at once and drops that peer."""
+        await self.connect([(0, 1)])
+        peer = self.nodes[1].peers[self.nodes[0].node_id]
+
+        async def fill_and_reply():
+            # No await before the reply, so the writer cannot make room first.
+            for _ in range(OUTBOX_SIZE - peer._outbox.qsize()):
+                peer._outbox.put_nowait({"type": "ping"})
+            await self.nodes[1].handle_message(peer, {"type": "inv", "items": [["tx", "ab" * 32]]})
+
+        await asyncio.wait_for(fill_and_reply(), 1.0)
+        self.assertNotIn(self.nodes[0].node_id, self.nodes[1].peers)
+
+    async def test_unserved_announcement_retried_elsewhere(self):
+        """Test that an item the first announcer cannot serve is fetched from another announcer."""
+        await self.connect([(0, 2), (1, 2)])
+        transaction = self.signed_transaction(11)
+        item = ["tx", transaction.txid]
+
+        # Node 0 announces a transaction it does not have.
+        self.nodes[0].peers[self.nodes[2].node_id].announce([item])
+        await wait_for(lambda: self.nodes[0].received["getdata"] == 1)
+        self.assertTrue(await self.nodes[1].submit_transaction(transaction))
+
+        await wait_for(lambda: transaction.txid in self.nodes[2].blockchain.mempool)
+        self.assertEqual(self.nodes[2].received["notfound"], 1)
+        self.assertNotIn(tuple(item), self.nodes[2]._requested)
+
+    async def test_silent_or_dropped_announcer_retried(self):
+        """Test that a request is retried elsewhere when the announcer times out or disconnects."""
+        await self.connect([(0, 3), (1, 3), (2, 3)])
+        asked = []
+
+        async def silent(peer, message):
+            asked.append(0)
+
+        async def hang_up(peer, message):
+            asked.append(1)
+            peer.close()
+
+        self.nodes[0]._on_getdata = silent
+        self.nodes[1]._on_getdata = hang_up
+        transaction = self.signed_transaction(13)
+        item = ["tx", transaction.txid]
+        with mock.patch.object(node_module, 'GETDATA_TIMEOUT', 0.05):
+            self.nodes[0].peers[self.nodes[3].node_id].announce([item])
+            await wait_for(lambda: asked == [0])
+            self.nodes[1].peers[self.nodes[3].node_id].announce([item])
+            self.assertTrue(await self.nodes[2].submit_transaction(transaction))
+            await wait_for(lambda: transaction.txid in self.nodes[3].blockchain.mempool)
+
+        self.assertEqual(asked, [0, 1])
+
+    async def test_payload_sent_once_per_node(self):
+        """Test that in a fully connected network each node downloads a transaction only once."""
+        await self.connect([(0, 1), (0, 2), (1, 2), (2, 3), (1, 3)])
+        # A second connect reuses the existing connection.
+        peer = await self.nodes[0].connect(*self.nodes[1].address)
+        self.assertIs(peer, self.nodes[0].peers[self.nodes[1].node_id])
+
+        transaction = self.signed_transaction(9)
+        await self.nodes[0].submit_transaction(transaction)
+        await wait_for(lambda: all(transaction.txid in node.blockchain.mempool for node in self.nodes))
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.nodes[0].received["tx"], 0)
+        for node in self.nodes[1:]:
+            self.assertEqual(node.received["tx"], 1)
+
+    async def test_new_node_catches_up(self):
+        """Test that a node joining late syncs the chain from its peer, headers first."""
+        miner = self.nodes[0].blockchain
+        for _ in range(5):
+            last_block = miner.last_block
+            miner.new_block(ProofKernel(last_block.hash, miner.difficulty).search(0, 10 ** 6), last_block.hash)
+
+        await self.connect([(3, 0)])
+        await wait_for(lambda: len(self.nodes[3].blockchain.chain) == 6)
+
+        self.assertEqual(self.nodes[3].blockchain.last_block.hash, miner.last_block.hash)
+        self.assertGreaterEqual(self.nodes[0].received["getheaders"], 1)
+        self.assertEqual(self.nodes[0].received["getblocks"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import os
+import unittest
+import hashlib
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.pow import ProofKernel, block_work, difficulty_target, target_for_difficulty
+
+LAST_HASH = hashlib.sha256(b"genesis").hexdigest()
+
+def legacy_valid_proof(last_hash, proof, difficulty):
+    guess_hash = hashlib.sha256(f'{last_hash}{proof}'.encode()).hexdigest()
+    return guess_hash[:difficulty] == "0" * difficulty
+
+class TestProofKernel(unittest.TestCase):
+
+    def test_matches_hex_prefix_check(self):
+        """Test that the kernel agrees with the hex-string check for every nonce."""
+        for difficulty in (0, 1, 2):
+            kernel = ProofKernel(LAST_HASH, difficulty)
+            for proof in range(2000):
+                self.assertEqual(kernel.check(proof), legacy_valid_proof(LAST_HASH, proof, difficulty))
+
+    def test_search_returns_first_valid_proof(self):
+        """Test that a batch search finds the lowest valid nonce."""
+        kernel = ProofKernel(LAST_HASH, 3)
+        expected = next(p for p in range(10 ** 6) if legacy_valid_proof(LAST_HASH, p, 3))
+
+        self.assertIsNone(kernel.search(0, expected))
+        self.assertEqual(kernel.search(0, expected + 1), expected)
+        self.assertEqual(kernel.search(expected, 10), expected)
+
+    def test_difficulty_target(self):
+        """Test the target boundaries for hex-zero difficulties."""
+        self.assertEqual(difficulty_target(0), b"\xff" * 32)
+        self.assertEqual(difficulty_target(2), b"\x00" + b"\xff" * 31)
+        self.assertEqual(difficulty_target(3), b"\x00\x0f" + b"\xff" * 30)
+
+    def test_numeric_target(self):
+        """Test that numeric targets between hex-zero steps are checked exactly."""
+        target = target_for_difficulty(2) // 3
+        kernel = ProofKernel(LAST_HASH, target=target)
+        for proof in range(2000):
+            digest = hashlib.sha256(f'{LAST_HASH}{proof}'.encode()).digest()
+            self.assertEqual(kernel.check(proof), int.from_bytes(digest, 'big') <= target)
+        self.assertEqual(block_work(target_for_difficulty(3)), 16 ** 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import unittest
+import random
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.chain import Blockchain
+from blockchain.block import Block
+from blockchain.state import BalanceIndex
+from blockchain.transaction import Transaction
+
+ADDRESSES = ["alice", "bob", "carol", "dave", "0"]
+
+def scan_balance(chain, address):
+    """Brute-force balance over every transaction in the chain."""
+    balance = 0
+    for block in chain:
+        for tx in block.transactions:
+            if tx.recipient == address:
+                balance += tx.amount
+            if tx.sender == address:
+                balance -= tx.amount
+    return balance
+
+def random_chain(length, rng):
+    chain = [Block(0, [], "0")]
+    for index in range(1, length):
+        transactions = [
+            Transaction(rng.choice(ADDRESSES), rng.choice(ADDRESSES), rng.randint(1, 50))
+            for _ in range(rng.randint(0, 5))
+        ]
+        chain.append(Block(index, transactions, chain[-1].hash))
+    return chain
+
+class TestBalanceIndex(unittest.TestCase):
+
+    def test_incremental_matches_scan(self):
+        """Test that applying blocks one at a time matches the brute-force scan."""
+        chain = random_chain(200, random.Random(1))
+        index = BalanceIndex()
+        for block in chain:
+            index.apply_block(block)
+
+        for address in ADDRESSES + ["nobody"]:
+            self.assertEqual(index.get(address), scan_balance(chain, address))
+
+    def test_revert_block(self):
+        """Test that reverting the tip restores the previous balances."""
+        chain = random_chain(50, random.Random(2))
+        index = BalanceIndex()
+        index.rebuild(chain)
+        index.revert_block(chain[-1])
+
+        for address in ADDRESSES:
+            self.assertEqual(index.get(address), scan_balance(chain[:-1], address))
+
+    def test_blockchain_balances(self):
+        """Test that Blockchain.get_balance follows new blocks and survives a rebuild."""
+        blockchain = Blockchain()
+        for amount in (1, 2, 3):
+            blockchain.new_transaction(Transaction("0", "miner", amount))
+            blockchain.new_block(12345)
+
+        self.assertEqual(blockchain.get_balance("miner"), 6)
+        self.assertEqual(blockchain.get_balance("miner"), scan_balance(blockchain.chain, "miner"))
+
+        blockchain.chain[1].transactions = [Transaction("0", "other", 10)]
+        blockchain.rebuild_balances()
+        self.assertEqual(blockchain.get_balance("miner"), scan_balance(blockchain.chain, "miner"))
+        self.assertEqual(blockchain.get_balance("other"), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import sys
+import os
+import unittest
+import shutil
+import tempfile
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.block import Block
+from blockchain.chain import Blockchain
+from blockchain.store import BlockStore
+from blockchain.transaction import Transaction
+
+def make_blocks(count):
+    blocks = [Block(0, [], "0", timestamp=1.0)]
+    for index in range(1, count):
+        transactions = [Transaction("0", f"miner{index % 3}", index, b"sig" * (index % 4))]
+        blocks.append(Block(index, transactions, blocks[-1].hash, nonce=index, timestamp=float(index)))
+    return blocks
+
+class TestBlockStore(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.blocks = make_blocks(20)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write(self, blocks, **kwargs):
+        store = BlockStore(self.path, fsync=False, **kwargs)
+        for block in blocks:
+            store.append(block)
+        store.close()
+
+    def assert_recovered(self, count, **kwargs):
+        store = BlockStore(self.path, fsync=False, **kwargs)
+        self.assertEqual(len(store), count)
+        self.assertEqual([store.get(h).hash for h in range(count)], [b.hash for b in self.blocks[:count]])
+        # The store accepts appends after recovery.
+        store.append(self.blocks[count])
+        self.assertEqual(store.get(count).hash, self.blocks[count].hash)
+        store.close()
+
+    def segment(self, number=0):
+        return os.path.join(self.path, f"segment-{number:06d}.log")
+
+    def test_reopen(self):
+        """Test that blocks read back identically after reopening."""
+        self.write(self.blocks[:10])
+        self.assert_recovered(10)
+
+    def test_truncated_record(self):
+        """Test recovery from a crash in the middle of writing the last record."""
+        self.write(self.blocks[:10])
+        size = os.path.getsize(self.segment())
+        with open(self.segment(), 'r+b') as f:
+            f.truncate(size - 5)
+        self.assert_recovered(9)
+
+    def test_truncated_index_entry(self):
+        """Test recovery when the index is missing entries or ends in a partial entry."""
+        self.write(self.blocks[:10])
+        index = os.path.join(self.path, "index")
+        with open(index, 'r+b') as f:
+            f.truncate(os.path.getsize(index) - 16 * 3 - 7)
+        self.assert_recovered(10)
+
+    def test_corrupt_tail_record(self):
+        """Test that a record failing its checksum is discarded."""
+        self.write(self.blocks[:10])
+        with open(self.segment(), 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xff]))
+        self.assert_recovered(9)
+
+    def test_segment_rollover(self):
+        """Test that records spread over several segments, including a damaged last one."""
+        self.write(self.blocks[:15], segment_size=300)
+        self.assertTrue(os.path.exists(self.segment(2)))
+        self.assert_recovered(15, segment_size=300)
+
+        last = max(n for n in range(100) if os.path.exists(self.segment(n)))
+        with open(self.segment(last), 'r+b') as f:
+            f.truncate(os.path.getsize(self.segment(last)) - 1)
+        store = BlockStore(self.path, segment_size=300, fsync=False)
+        self.assertEqual(len(store), 15)
+        store.close()
+
+    def test_truncate(self):
+        """Test that truncating across segments drops the suffix, also after reopening."""
+        store = BlockStore(self.path, segment_size=300, fsync=False)
+        for block in self.blocks[:15]:
+            store.append(block)
+        store.read(14) # Map the last segment before it is cut
+        store.truncate(6)
+        self.assertEqual(len(store), 6)
+        store.append(self.blocks[6])
+        self.assertEqual(store.get(6).hash, self.blocks[6].hash)
+        store.close()
+        self.assert_recovered(7, segment_size=300)
+
+    def test_replace_survives_crash(self):
+        """Test that a crash while replacing a suffix leaves the old or the new chain, never a shorter one."""
+        fork = make_blocks(12)[:5] + [Block(index, [], "fork", nonce=index, timestamp=float(index)) for index in range(5, 12)]
+        self.write(self.blocks[:10])
+
+        # Crash before the journal is in place: the old chain stays.
+        with open(os.path.join(self.path, "reorg.tmp"), 'wb') as f:
+            f.write(b"partial")
+        self.assert_recovered(10)
+        self.assertFalse(os.path.exists(os.path.join(self.path, "reorg.tmp")))
+
+        # Crash after the journal is in place, halfway through the appends.
+        store = BlockStore(self.path, fsync=False)
+        appended = []
+
+        def crashing_append(payload):
+            if len(appended) == 3:
+                raise OSError("simulated crash")
+            appended.append(payload)
+            BlockStore._append_record(store, payload)
+
+        store._append_record = crashing_append
+        with self.assertRaises(OSError):
+            store.replace(5, fork[5:])
+        self.assertEqual(len(store), 8)
+        store.close()
+
+        reopened = BlockStore(self.path, fsync=False)
+        self.assertEqual([reopened.get(h).hash for h in range(len(reopened))], [b.hash for b in fork])
+        self.assertFalse(os.path.exists(os.path.join(self.path, "reorg")))
+        reopened.close()
+
+    def test_blockchain_restart(self):
+        """Test that a store-backed Blockchain keeps its chain and balances across restarts."""
+        blockchain = Blockchain(store=BlockStore(self.path, fsync=False))
+        for amount in (1, 2):
+            blockchain.new_transaction(Transaction("0", "miner", amount))
+            blockchain.new_block(12345)
+        hashes = [block.hash for block in blockchain.chain]
+        blockchain.store.close()
+
+        restarted = Blockchain(store=BlockStore(self.path, fsync=False))
+        self.assertEqual([block.hash for block in restarted.chain], hashes)
+        self.assertEqual(restarted.last_block.hash, hashes[-1])
+        self.assertEqual(restarted.get_balance("miner"), 3)
+        restarted.store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.chain import Blockchain
+from blockchain.pow import ProofKernel
+from blockchain.store import BlockStore
+from blockchain.sync import ChainSync
+from blockchain.transaction import Transaction
+from dqn.validator import NoopValidator, RuleValidator
+from wallet.wallet import Wallet
+
+DIFFICULTY = 2
+
+class LocalPeer:
+    """Serves another Blockchain in-process and records what was asked of it."""
+
+    def __init__(self, blockchain):
+        self.blockchain = blockchain
+        self.header_requests = 0
+        self.requested_heights = []
+
+    async def get_headers(self, locator, count):
+        self.header_requests += 1
+        return self.blockchain.headers_after(locator, count)
+
+    async def get_blocks(self, heights):
+        self.requested_heights.extend(heights)
+        return self.blockchain.encoded_blocks(heights)
+
+def new_blockchain(**kwargs):
+    blockchain = Blockchain(validator=NoopValidator(), **kwargs)
+    blockchain.difficulty = DIFFICULTY
+    return blockchain
+
+def mine(blockchain, transactions=(), miner="miner"):
+    for transaction in transactions:
+        blockchain.new_transaction(transaction)
+    blockchain.new_transaction(Transaction("0", miner, 1))
+    last_block = blockchain.last_block
+    return blockchain.new_block(ProofKernel(last_block.hash, DIFFICULTY).search(0, 10 ** 6), last_block.hash)
+
+def copy_chain(source, target, height):
+    for block in source.chain[1:height + 1]:
+        assert target.add_block(block)
+
+class TestChainSync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.wallet = Wallet()
+
+    def signed(self, amount):
+        transaction = Transaction(self.wallet.address, "bob", amount)
+        transaction.signature = self.wallet.sign(transaction.to_bytes())
+        return transaction
+
+    async def test_fresh_node_sync(self):
+        """Test that a fresh node downloads headers in batches and every body once."""
+        source = new_blockchain()
+        for _ in range(300):
+            mine(source)
+        peers = [LocalPeer(source), LocalPeer(source)]
+
+        fresh = new_blockchain()
+        self.assertTrue(await ChainSync(fresh).sync(peers))
+
+        self.assertEqual([b.hash for b in fresh.chain], [b.hash for b in source.chain])
+        self.assertEqual(fresh.get_balance("miner"), 300)
+        requested = sorted(peers[0].requested_heights + peers[1].requested_heights)
+        self.assertEqual(requested, list(range(1, 301)))
+        # Bodies were spread over both peers serving the chain.
+        self.assertTrue(peers[0].requested_heights and peers[1].requested_heights)
+
+    async def test_reorg_rolls_back_suffix(self):
+        """Test that a heavier fork replaces only the diverging blocks and their derived state."""
+        ours = new_blockchain()
+        theirs = new_blockchain()
+        for _ in range(5):
+            mine(ours)
+        copy_chain(ours, theirs, 5)
+
+        orphaned = self.signed(3)
+        mine(ours, [orphaned], miner="us")
+        mine(ours, miner="us")
+        included = self.signed(4)
+        mine(theirs, [included], miner="them")
+        for _ in range(3):
+            mine(theirs, miner="them")
+        ours.new_transaction(included) # Pending here, mined on their branch
+        shared = ours.chain[5]
+        self.assertEqual(ours.get_balance("us"), 2)
+
+        self.assertTrue(await ChainSync(ours).sync([LocalPeer(theirs)]))
+
+        self.assertEqual([b.hash for b in ours.chain], [b.hash for b in theirs.chain])
+        self.assertIs(ours.chain[5], shared)
+        self.assertEqual(ours.get_balance("us"), 0)
+        self.assertEqual(ours.get_balance("them"), 4)
+        self.assertEqual(ours.get_balance("bob"), 4)
+        self.assertIn(orphaned.txid, ours.mempool)
+        self.assertNotIn(included.txid, ours.mempool)
+        self.assertEqual(len([t for t in ours.mempool if t.sender == "0"]), 0)
+
+    async def test_reorg_revalidates_returned_transactions(self):
+        """Test that transactions of replaced blocks pass admission again before returning to the mempool."""
+        ours = new_blockchain()
+        theirs = new_blockchain()
+        mine(ours)
+        copy_chain(ours, theirs, 1)
+        kept, rejected = self.signed(2), self.signed(50)
+        mine(ours, [kept, rejected], miner="us")
+        for _ in range(2):
+            mine(theirs, miner="them")
+
+        ours.validator = RuleValidator(max_amount=10)
+        self.assertTrue(await ChainSync(ours).sync([LocalPeer(theirs)]))
+
+        self.assertIn(kept.txid, ours.mempool)
+        self.assertNotIn(rejected.txid, ours.mempool)
+
+    async def test_lighter_or_invalid_chain_ignored(self):
+        """Test that shorter, equal and invalid chains leave the local chain untouched."""
+        ours = new_blockchain()
+        theirs = new_blockchain()
+        for _ in range(3):
+            mine(ours)
+        mine(theirs)
+        hashes = [b.hash for b in ours.chain]
+        self.assertFalse(await ChainSync(ours).sync([LocalPeer(theirs)]))
+
+        mine(theirs)
+        mine(theirs)
+        self.assertFalse(await ChainSync(ours).sync([LocalPeer(theirs)]))
+
+        mine(theirs)
+        forged = theirs.chain[-1]
+        while ProofKernel(forged.previous_hash, DIFFICULTY).check(forged.nonce):
+            forged.nonce += 1
+        peer = LocalPeer(theirs)
+        self.assertFalse(await ChainSync(ours).sync([peer]))
+        self.assertEqual([b.hash for b in ours.chain], hashes)
+        self.assertEqual(peer.requested_heights, []) # Rejected from headers alone
+
+    async def test_store_backed_reorg(self):
+        """Test that a reorg on a store-backed chain persists across a restart."""
+        path = tempfile.mkdtemp()
+        try:
+            ours = new_blockchain(store=BlockStore(path, fsync=False))
+            theirs = new_blockchain()
+            for _ in range(3):
+                mine(ours, miner="us")
+            mine(theirs)
+            for _ in range(4):
+                mine(theirs)
+
+            self.assertTrue(await ChainSync(ours).sync([LocalPeer(theirs)]))
+            ours.store.close()
+
+            restarted = new_blockchain(store=BlockStore(path, fsync=False))
+            self.assertEqual([b.hash for b in restarted.chain], [b.hash for b in theirs.chain])
+            self.assertEqual(restarted.get_balance("us"), 0)
+            restarted.store.close()
+        finally:
+            shutil.rmtree(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api import main
+from blockchain.chain import Blockchain
+from blockchain.transaction import Transaction
+from dqn.validator import NoopValidator
+from metrics.tracing import NULL_SPAN, TRACER, Tracer
+from wallet.wallet import Wallet
+
+class TestTracer(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        """Test that a disabled tracer hands out the shared null span."""
+        tracer = Tracer()
+        with tracer.span("stage", key="value") as span:
+            span.outcome = "ignored"
+        self.assertIs(span, NULL_SPAN)
+        self.assertEqual(tracer.spans(), [])
+
+    def test_nesting_and_ring_buffer(self):
+        """Test that nested spans record their parent and old spans are dropped."""
+        tracer = Tracer(capacity=3, enabled=True)
+        with tracer.span("outer") as outer:
+            with tracer.span("inner") as inner:
+                inner.outcome = "ok"
+        self.assertEqual(inner.parent, outer.id)
+        self.assertIsNone(outer.parent)
+        self.assertEqual([span.name for span in tracer.spans()], ["inner", "outer"])
+
+        with self.assertRaises(KeyError):
+            with tracer.span("failing"):
+                raise KeyError("missing")
+        with tracer.span("last"):
+            pass
+        self.assertEqual([span.name for span in tracer.spans()], ["outer", "failing", "last"])
+        self.assertEqual(tracer.spans(name="failing")[0].outcome, "error:KeyError")
+        self.assertEqual([span.name for span in tracer.spans(limit=1)], ["last"])
+
+    def test_chrome_trace(self):
+        """Test the Chrome trace-event export of complete events."""
+        tracer = Tracer(enabled=True)
+        with tracer.span("admission.model", transactions=4) as span:
+            span.outcome = "valid"
+        event, = tracer.chrome_trace()["traceEvents"]
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["name"], "admission.model")
+        self.assertEqual(event["cat"], "admission")
+        self.assertEqual(event["args"], {"transactions": 4, "outcome": "valid"})
+        self.assertGreaterEqual(event["dur"], 0)
+
+class TestAdmissionTracing(unittest.TestCase):
+
+    def setUp(self):
+        TRACER.enabled = True
+        TRACER.clear()
+        self.wallet = Wallet()
+
+    def tearDown(self):
+        TRACER.enabled = False
+        TRACER.clear()
+
+    def signed(self, amount, wallet=None):
+        wallet = wallet or self.wallet
+        transaction = Transaction(wallet.address, "bob", amount)
+        transaction.signature = wallet.sign(transaction.to_bytes())
+        return transaction
+
+    def test_stages_traced(self):
+        """Test that each admission stage is a child span with its outcome."""
+        blockchain = Blockchain(validator=NoopValidator())
+        transaction = self.signed(5)
+        self.assertTrue(blockchain.new_transaction(transaction))
+
+        admission, = TRACER.spans(name="admission")
+        self.assertEqual(admission.outcome, "accepted")
+        self.assertEqual(admission.args["txid"], transaction.txid)
+        stages = [span for span in TRACER.spans() if span.parent == admission.id]
+        self.assertEqual([(span.name, span.outcome) for span in stages], [
+            ("admission.signature", "valid"),
+            ("admission.model", "valid"),
+            ("admission.mempool", "accepted"),
+        ])
+
+        forged = self.signed(6)
+        forged.amount = 7
+        self.assertFalse(blockchain.new_transaction(forged))
+        self.assertEqual(TRACER.spans(name="admission")[-1].outcome, "invalid_signature")
+        self.assertEqual(len(TRACER.spans(name="admission.model")), 1)
+
+    def test_batch_traced(self):
+        """Test that batch admission traces the batched stages once."""
+        blockchain = Blockchain(validator=NoopValidator())
+        blockchain.new_transactions([self.signed(amount) for amount in range(1, 4)])
+        batch, = TRACER.spans(name="admission.batch")
+        self.assertEqual(batch.outcome, "3/3 accepted")
+        self.assertEqual(TRACER.spans(name="admission.model")[0].args, {"transactions": 3})
+
+    def test_debug_endpoint(self):
+        """Test toggling tracing and reading spans through /debug/traces."""
+        main.blockchain = Blockchain(validator=NoopValidator())
+        client = main.app.test_client()
+        self.assertFalse(client.post('/debug/traces', json={'enabled': False}).get_json()['enabled'])
+        client.post('/transactions/new', json={'sender': '0', 'recipient': 'miner', 'amount': 1})
+        self.assertEqual(client.get('/debug/traces').get_json()['spans'], [])
+
+        client.post('/debug/traces', json={'enabled': True})
+        transaction = self.signed(2)
+        client.post('/transactions/new', json={
+            'sender': transaction.sender, 'recipient': transaction.recipient,
+            'amount': transaction.amount, 'signature': transaction.signature.hex()
+        })
+        spans = client.get('/debug/traces?name=admission').get_json()['spans']
+        self.assertEqual([span['outcome'] for span in spans], ["accepted"])
+
+        events = client.get('/debug/traces?format=chrome').get_json()['traceEvents']
+        self.assertEqual([event['name'] for event in events][-1], "admission")
+        self.assertEqual(client.get('/debug/traces?min_ms=abc').status_code, 400)
+
+        client.post('/debug/traces', json={'clear': True})
+        self.assertEqual(client.get('/debug/traces').get_json()['spans'], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import os
+import functools
+import unittest
+
+import numpy as np
+import torch
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dqn.agent import DQNAgent
+from dqn.env import APPROVE, REJECT, ProcessVectorEnv, TransactionEnv, VectorEnv, encode_states, synthetic_transactions
+from dqn.train import accuracy, make_env, train
+
+class TestEnvironments(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.transactions, cls.labels = synthetic_transactions(200, seed=0)
+        cls.states = encode_states(cls.transactions)
+
+    def test_transaction_env(self):
+        """Test rewards for the labelled action and episode length."""
+        env = TransactionEnv(self.states, self.labels, episode_length=3, seed=0)
+        state = env.reset()
+        self.assertEqual(state.shape, (128,))
+        self.assertEqual(state.dtype, np.uint8)
+
+        label = env.labels[env._current]
+        _, reward, done = env.step(label)
+        self.assertEqual((reward, done), (1.0, False))
+        _, reward, done = env.step(APPROVE if env.labels[env._current] == REJECT else REJECT)
+        self.assertEqual((reward, done), (-1.0, False))
+        self.assertTrue(env.step(APPROVE)[2])
+
+    def test_vector_env_resets_finished_envs(self):
+        """Test that finished environments restart while returning their last state."""
+        env = VectorEnv(TransactionEnv(self.states, self.labels, episode_length=2, seed=i) for i in range(3))
+        self.assertEqual(env.reset().shape, (3, 128))
+        next_states, rewards, dones = env.step([APPROVE] * 3)
+        self.assertEqual(dones.tolist(), [False] * 3)
+        np.testing.assert_array_equal(env.observations, next_states)
+
+        next_states, rewards, dones = env.step([APPROVE] * 3)
+        self.assertEqual(dones.tolist(), [True] * 3)
+        self.assertEqual([e._steps for e in env.envs], [0] * 3)
+
+    def test_process_vector_env_matches_in_process(self):
+        """Test that stepping environments in worker processes gives the same results."""
+        env_fns = [functools.partial(TransactionEnv, self.states, self.labels, seed=i) for i in range(5)]
+        local = VectorEnv(fn() for fn in env_fns)
+        remote = ProcessVectorEnv(env_fns, workers=2)
+        try:
+            np.testing.assert_array_equal(local.reset(), remote.reset())
+            for actions in ([0, 1, 0, 1, 0], [1, 1, 1, 1, 1]):
+                for ours, theirs in zip(local.step(actions), remote.step(actions)):
+                    np.testing.assert_array_equal(ours, theirs)
+                np.testing.assert_array_equal(local.observations, remote.observations)
+        finally:
+            remote.close()
+
+class TestTraining(unittest.TestCase):
+
+    def test_select_actions(self):
+        """Test batched epsilon-greedy action selection."""
+        agent = DQNAgent(4, 2)
+        states = np.random.rand(32, 4).astype(np.float32)
+        agent.epsilon = 0.0
+        with torch.no_grad():
+            greedy = agent.q_network(torch.from_numpy(states)).argmax(dim=1).numpy()
+        np.testing.assert_array_equal(agent.select_actions(states), greedy)
+
+        agent.epsilon = 1.0
+        np.random.seed(0)
+        actions = agent.select_actions(np.repeat(states[:1], 1000, axis=0))
+        self.assertEqual(set(actions.tolist()), {0, 1})
+
+    def test_training_loop(self):
+        """Test that the vector training loop fills replay and learns the labels."""
+        torch.manual_seed(0)
+        np.random.seed(0)
+        transactions, labels = synthetic_transactions(2000, seed=1)
+        env = make_env(transactions, labels, num_envs=16)
+        # The environments share one encoding of the transactions.
+        self.assertTrue(all(e.states is env.envs[0].states for e in env.envs))
+        agent = DQNAgent(128, 2, gamma=0.0, buffer_size=10000, batch_size=128, epsilon_decay=0.99, state_dtype=np.uint8, seed=0)
+        stats = train(agent, env, steps=400)
+
+        self.assertEqual(stats['env_steps'], 6400)
+        self.assertEqual(len(agent.buffer), 6400)
+        self.assertGreater(stats['env_steps_per_sec'], 0)
+        held_out, held_out_labels = synthetic_transactions(500, seed=2)
+        # Better than approving everything.
+        self.assertGreater(accuracy(agent, held_out, held_out_labels), np.mean(held_out_labels) + 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
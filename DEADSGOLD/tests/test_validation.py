@@ -0,0 +1,90 @@
+import sys
+import os
+import unittest
+import shutil
+import tempfile
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain import validation
+from blockchain.block import Block
+from blockchain.chain import Blockchain
+from blockchain.pow import ProofKernel, target_for_difficulty
+from blockchain.store import BlockStore
+from blockchain.transaction import Transaction
+from blockchain.validation import ChainValidator
+from wallet.wallet import Wallet
+
+DIFFICULTY = 2
+TARGET = target_for_difficulty(DIFFICULTY)
+
+def mine_block(previous, transactions):
+    block = Block(previous.index + 1, transactions, previous.hash, timestamp=float(previous.index + 1), target=TARGET)
+    block.nonce = ProofKernel(previous.hash, DIFFICULTY).search(0, 10 ** 6)
+    return block
+
+def build_chain(length, wallet):
+    chain = [Block(0, [], "0", timestamp=1.0)]
+    for index in range(1, length):
+        transaction = Transaction(wallet.address, "bob", index)
+        transaction.signature = wallet.sign(transaction.to_bytes())
+        chain.append(mine_block(chain[-1], [Transaction("0", "miner", 1), transaction]))
+    return chain
+
+class TestChainValidator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.wallet = Wallet()
+        cls.chain = build_chain(600, cls.wallet)
+
+    def test_valid_chain_sequential_and_parallel(self):
+        """Test that a valid chain passes with and without a process pool."""
+        self.assertTrue(ChainValidator().validate(self.chain, DIFFICULTY))
+        self.assertTrue(ChainValidator(workers=2).validate(self.chain, DIFFICULTY))
+
+    def test_detects_invalid_blocks(self):
+        """Test that a bad signature, proof or link anywhere is reported, also on a pool."""
+        forged = list(self.chain)
+        transaction = Transaction(self.wallet.address, "mallory", 1000, signature=b"0" * 64)
+        forged[500] = mine_block(forged[499], [transaction])
+        forged[501] = mine_block(forged[500], [])
+        self.assertFalse(ChainValidator(workers=2).validate(forged, DIFFICULTY))
+
+        bad_proof = list(self.chain)
+        bad_proof[-1] = Block(599, [], self.chain[598].hash, nonce=0, timestamp=1.0, target=TARGET)
+        while ProofKernel(self.chain[598].hash, DIFFICULTY).check(bad_proof[-1].nonce):
+            bad_proof[-1].nonce += 1
+        self.assertFalse(ChainValidator().validate(bad_proof, DIFFICULTY))
+
+        unlinked = list(self.chain[:100])
+        unlinked[50] = mine_block(self.chain[48], [])
+        unlinked[50].index = 50
+        self.assertFalse(ChainValidator().validate(unlinked, DIFFICULTY))
+
+    def test_checkpoint_limits_revalidation(self):
+        """Test that after a restart only blocks added since the last validation are checked."""
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        store = BlockStore(path, fsync=False)
+        for block in self.chain[:300]:
+            store.append(block)
+        blockchain = Blockchain(store=store)
+        blockchain.difficulty = DIFFICULTY
+        self.assertTrue(blockchain.validate_chain())
+        blockchain.chain.append(self.chain[300])
+        store.close()
+
+        restarted = Blockchain(store=BlockStore(path, fsync=False))
+        restarted.difficulty = DIFFICULTY
+        self.assertEqual(restarted.chain_validator.checkpoint, (299, self.chain[299].hash))
+        with mock.patch.object(validation, "_check_blocks", wraps=validation._check_blocks) as check:
+            self.assertTrue(restarted.validate_chain())
+        self.assertEqual(sum(len(call.args[0]) for call in check.call_args_list), 1)
+        self.assertEqual(restarted.chain_validator.checkpoint, (300, self.chain[300].hash))
+        restarted.store.close()
+
+if __name__ == '__main__':
+    unittest.main()
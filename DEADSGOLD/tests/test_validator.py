@@ -0,0 +1,213 @@
+import sys
+import os
+import unittest
+import json
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain.chain import Blockchain
+from blockchain.transaction import Transaction
+from dqn.cache import VerdictCache
+from dqn.validator import DQNValidator, NoopValidator, RuleValidator, create_validator
+from wallet.wallet import Wallet
+
+def legacy_encode(transaction, input_size=128):
+    """The original per-transaction encoding of DQNValidator, truncated to the input size."""
+    transaction_str = json.dumps({
+        "sender": transaction.sender,
+        "recipient": transaction.recipient,
+        "amount": transaction.amount
+    })[:input_size]
+    padded_content = np.zeros(input_size, dtype=np.float32)
+    padded_content[:len(transaction_str)] = [ord(char) for char in transaction_str]
+    return padded_content
+
+class TestDQNValidator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.blockchain = Blockchain()
+        cls.validator = cls.blockchain.validator
+        cls.wallets = [Wallet() for _ in range(4)]
+
+    def signed(self, sender, recipient, amount):
+        transaction = Transaction(sender.address, recipient.address, amount)
+        transaction.signature = sender.sign(transaction.to_bytes())
+        return transaction
+
+    def test_encode_matches_per_transaction_encoding(self):
+        """Test that the vectorized encoding matches the original one row by row."""
+        transactions = [Transaction("a", "b", 1), Transaction("sender", "recipient", 12.5), Transaction("s" * 100, "r" * 100, 1)]
+        encoded = self.validator.encode_transactions(transactions)
+
+        self.assertEqual(encoded.shape, (3, 128))
+        self.assertEqual(encoded.dtype, np.float32)
+        for row, transaction in zip(encoded, transactions):
+            np.testing.assert_array_equal(row, legacy_encode(transaction))
+
+    def test_validate_batch_matches_single_inference(self):
+        """Test that one batched call returns the same verdicts as per-transaction inference."""
+        transactions = [
+            self.signed(self.wallets[i % 4], self.wallets[(i + 1) % 4], amount)
+            for i, amount in enumerate([1, 5, 10, 0.5, 1000, 3])
+        ]
+        session = self.validator.session
+        expected = []
+        for transaction in transactions:
+            q_values = session.run(
+                [self.validator.output_name],
+                {self.validator.input_name: legacy_encode(transaction).reshape(1, -1)}
+            )[0]
+            expected.append(bool(np.argmax(q_values) == 1))
+
+        self.assertEqual(self.validator.validate_batch(transactions), expected)
+        self.assertEqual(self.validator.validate_batch([]), [])
+
+    def test_blockchain_new_transactions(self):
+        """Test admitting a batch of pending transactions through the validator."""
+        blockchain = Blockchain()
+        good = self.signed(self.wallets[0], self.wallets[1], 5)
+        forged = Transaction(self.wallets[2].address, self.wallets[1].address, 5, signature=b"0" * 64)
+        reward = Transaction("0", self.wallets[3].address, 1)
+
+        results = blockchain.new_transactions([good, forged, reward])
+
+        self.assertEqual(results, [blockchain.validator.validate_transaction(good), False, True])
+        self.assertEqual(
+            blockchain.pending_transactions,
+            [t for t, accepted in zip([good, forged, reward], results) if accepted]
+        )
+
+class TestVerdictCache(unittest.TestCase):
+
+    def test_lru_eviction_and_counters(self):
+        """Test that the least recently used verdict is evicted and hits/misses are counted."""
+        cache = VerdictCache(maxsize=2)
+        cache.put(b"a", True)
+        cache.put(b"b", False)
+        self.assertTrue(cache.get(b"a"))
+        cache.put(b"c", True)
+
+        self.assertIsNone(cache.get(b"b"))
+        self.assertIsNotNone(cache.get(b"c"))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl_expiry(self):
+        """Test that expired verdicts are treated as misses."""
+        cache = VerdictCache(maxsize=10, ttl=0)
+        cache.put(b"a", True)
+        self.assertIsNone(cache.get(b"a"))
+        self.assertEqual(len(cache), 0)
+
+class TestValidatorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.tmpdir, "model.onnx")
+        shutil.copy(DQNValidator().model_path, self.model_path)
+        self.validator = DQNValidator(self.model_path, cache_size=100, model_check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_repeated_payloads_hit_cache(self):
+        """Test that resubmitted transactions are answered from the cache."""
+        transactions = [Transaction("a", "b", 1), Transaction("a", "b", 2)]
+        first = self.validator.validate_batch(transactions)
+        second = self.validator.validate_batch(transactions + [Transaction("a", "b", 1, b"retry")])
+
+        self.assertEqual(second, first + first[:1])
+        self.assertEqual(self.validator.cache.misses, 2)
+        self.assertEqual(self.validator.cache.hits, 3)
+
+    def test_model_change_invalidates_cache(self):
+        """Test that rewriting the model file drops the cached verdicts."""
+        self.validator.validate_transaction(Transaction("a", "b", 1))
+        self.assertEqual(len(self.validator.cache), 1)
+
+        stat = os.stat(self.model_path)
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.validator.validate_transaction(Transaction("a", "b", 1))
+
+        self.assertEqual(self.validator.cache.misses, 2)
+        self.assertEqual(self.validator.cache.hits, 0)
+
+    def test_model_change_reloads_without_cache(self):
+        """Test that an uncached validator reloads a changed model and tolerates a missing file."""
+        validator = DQNValidator(self.model_path, model_check_interval=0)
+        validator.validate_transaction(Transaction("a", "b", 1))
+        version = validator._model_version
+
+        stat = os.stat(self.model_path)
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        validator.validate_transaction(Transaction("a", "b", 1))
+        self.assertNotEqual(validator._model_version, version)
+
+        # An atomic replace briefly leaves no file at the path.
+        verdict = self.validator.validate_transaction(Transaction("a", "b", 2))
+        os.rename(self.model_path, self.model_path + ".old")
+        self.assertIn(validator.validate_transaction(Transaction("a", "b", 1)), (True, False))
+        self.assertEqual(self.validator.validate_transaction(Transaction("a", "b", 2)), verdict)
+
+class TestValidatorBackends(unittest.TestCase):
+
+    def test_model_loads_lazily_and_is_shared(self):
+        """Test that the ONNX session is loaded on first use and shared between validators."""
+        first = DQNValidator()
+        second = DQNValidator(cache_size=10)
+        self.assertFalse(first.loaded)
+        first.validate_transaction(Transaction("a", "b", 1))
+        self.assertTrue(first.loaded)
+        self.assertFalse(second.loaded)
+        second.validate_transaction(Transaction("a", "b", 1))
+        self.assertIs(first.session, second.session)
+
+    def test_create_validator(self):
+        """Test choosing the backend by name and by DEADSGOLD_VALIDATOR."""
+        self.assertIsInstance(create_validator('noop'), NoopValidator)
+        self.assertIsInstance(create_validator('rules'), RuleValidator)
+        self.assertEqual(create_validator('onnx', cache_size=5).cache.maxsize, 5)
+        with self.assertRaises(ValueError):
+            create_validator('gpu')
+
+        previous = os.environ.get('DEADSGOLD_VALIDATOR')
+        os.environ['DEADSGOLD_VALIDATOR'] = 'rules'
+        try:
+            self.assertIsInstance(Blockchain().validator, RuleValidator)
+        finally:
+            if previous is None:
+                del os.environ['DEADSGOLD_VALIDATOR']
+            else:
+                os.environ['DEADSGOLD_VALIDATOR'] = previous
+
+    def test_rule_validator(self):
+        """Test the rule-based verdicts."""
+        validator = RuleValidator(max_amount=100)
+        transactions = [
+            Transaction("a", "b", 5), Transaction("a", "b", 0), Transaction("a", "b", -1),
+            Transaction("a", "a", 5), Transaction("a", "b", 101), Transaction("a", "b", "five"),
+        ]
+        self.assertEqual(validator.validate_batch(transactions), [True, False, False, False, False, False])
+        self.assertTrue(NoopValidator().validate_transaction(Transaction("a", "a", -1)))
+
+    def test_chain_import_skips_heavy_modules(self):
+        """Test that importing and constructing a Blockchain loads neither onnxruntime nor the wallet."""
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        script = (
+            f"import sys; sys.path.append({project_root!r})\n"
+            "from blockchain.chain import Blockchain\n"
+            "Blockchain()\n"
+            "print(sorted(m for m in ('onnxruntime', 'wallet.wallet', 'solders') if m in sys.modules))"
+        )
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wallet.wallet import Wallet, _load_public_key
+
+class TestWalletVerify(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        wallets = [Wallet() for _ in range(5)]
+        cls.items = []
+        for i in range(600):
+            wallet = wallets[i % len(wallets)]
+            data = f"payload {i}".encode()
+            signature = wallet.sign(data)
+            if i % 7 == 0:
+                data += b" tampered"
+            cls.items.append((wallet.address, signature, data))
+        cls.items.append(("not-base58!", b"0" * 64, b"data"))
+        cls.expected = [Wallet.verify(*item) for item in cls.items]
+
+    def test_verify_many_sequential(self):
+        """Test that verify_many matches verify for valid, tampered and malformed inputs."""
+        self.assertEqual(Wallet.verify_many(self.items), self.expected)
+        self.assertIn(False, self.expected)
+        self.assertIn(True, self.expected)
+
+    def test_verify_many_on_pools(self):
+        """Test verify_many spread over thread and process pools."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(Wallet.verify_many(self.items, executor), self.expected)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(Wallet.verify_many(self.items, executor), self.expected)
+
+    def test_public_key_cache(self):
+        """Test that hot senders reuse their parsed public key."""
+        address = self.items[0][0]
+        _load_public_key.cache_clear()
+        Wallet.verify(*self.items[0])
+        Wallet.verify(*self.items[5])
+
+        info = _load_public_key.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        self.assertIs(_load_public_key(address), _load_public_key(address))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,9 +6,49 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
 from cryptography.fernet import Fernet
 import base64
+import functools
 import os
+import time
 import base58
-from solders.keypair import Keypair
+from metrics.metrics import REGISTRY
+
+# Number of parsed public keys kept for hot senders.
+PUBLIC_KEY_CACHE_SIZE = 4096
+
+# Signatures verified per task when verify_many runs on an executor.
+VERIFY_CHUNK_SIZE = 256
+
+VERIFICATIONS = REGISTRY.counter('deadsgold_signature_verifications_total', "Signature checks, by result.", ['result'])
+VERIFY_SECONDS = REGISTRY.histogram('deadsgold_signature_verify_seconds', "Time per Wallet.verify call.")
+VERIFY_MANY_SECONDS = REGISTRY.histogram('deadsgold_signature_verify_many_seconds', "Time per Wallet.verify_many call.")
+
+
+@functools.lru_cache(maxsize=PUBLIC_KEY_CACHE_SIZE)
+def _load_public_key(public_key_b58: str) -> ed25519.Ed25519PublicKey:
+    """
+    Decodes a base58 address into a public key object. Results are cached.
+    """
+    return ed25519.Ed25519PublicKey.from_public_bytes(base58.b58decode(public_key_b58))
+
+
+def _verify(public_key_b58: str, signature: bytes, data: bytes) -> bool:
+    try:
+        _load_public_key(public_key_b58).verify(signature, data)
+        return True
+    except Exception:
+        return False
+
+
+def _verify_chunk(items) -> list:
+    # Runs in pool workers too, so metrics are recorded by the caller.
+    return [_verify(public_key_b58, signature, data) for public_key_b58, signature, data in items]
+
+
+def _record(results: list) -> None:
+    valid = sum(results)
+    VERIFICATIONS.labels("valid").inc(valid)
+    VERIFICATIONS.labels("invalid").inc(len(results) - valid)
+
 
 class Wallet:
     """
@@ -53,6 +93,8 @@ class Wallet:
 
     @classmethod
     def from_mnemonic(cls, mnemonic_phrase: str):
+        from solders.keypair import Keypair # Deferred: only mnemonic wallets need solders
+
         # Derive Solana Keypair from mnemonic
         solana_keypair = Keypair.from_seed_phrase_and_passphrase(mnemonic_phrase, "") # No passphrase for simplicity
         
@@ -135,10 +177,26 @@ class Wallet:
         """
         Verifies the signature of the given data using the public key.
         """
-        try:
-            public_key_bytes = base58.b58decode(public_key_b58)
-            public_key = ed25519.Ed25519PublicKey.from_public_bytes(public_key_bytes)
-            public_key.verify(signature, data)
-            return True
-        except Exception:
-            return False
+        start = time.perf_counter()
+        valid = _verify(public_key_b58, signature, data)
+        VERIFY_SECONDS.observe(time.perf_counter() - start)
+        VERIFICATIONS.labels("valid" if valid else "invalid").inc()
+        return valid
+
+    @staticmethod
+    def verify_many(items, executor=None) -> list:
+        """
+        Verifies a list of (public_key_b58, signature, data) tuples.
+        Returns one bool per tuple, in order. If an executor (a thread or
+        process pool) is given, chunks of the list are verified on it.
+        """
+        start = time.perf_counter()
+        items = list(items)
+        if executor is None or len(items) <= VERIFY_CHUNK_SIZE:
+            results = _verify_chunk(items)
+        else:
+            chunks = [items[i:i + VERIFY_CHUNK_SIZE] for i in range(0, len(items), VERIFY_CHUNK_SIZE)]
+            results = [result for chunk in executor.map(_verify_chunk, chunks) for result in chunk]
+        VERIFY_MANY_SECONDS.observe(time.perf_counter() - start)
+        _record(results)
+        return results